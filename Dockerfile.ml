@@ -13,7 +13,9 @@ RUN pip install --no-cache-dir -r requirements.txt
 COPY ml-service/ .
 
 # Copy data-ingestion for models and features
-COPY data-ingestion/models/tuned/ /data-ingestion/models/tuned/
+# The whole models/ directory: the registry (active/shadow versions and their
+# scalers), the tuned fallback pickles and the pruned feature_set.json
+COPY data-ingestion/models/ /data-ingestion/models/
 COPY data-ingestion/data/processed/features_complete.csv /data-ingestion/data/processed/features_complete.csv
 COPY data-ingestion/src/ /data-ingestion/src/
 
@@ -0,0 +1,43 @@
+"""add entity daily stats summary table
+
+Revision ID: b7d41e2a9c13
+Revises: 687bc6da7b05
+Create Date: 2026-10-19 09:12:04.118302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d41e2a9c13'
+down_revision: Union[str, Sequence[str], None] = '687bc6da7b05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('entity_daily_stats',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('entity_type', sa.String(length=20), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('track_id', sa.Integer(), nullable=False),
+    sa.Column('stat_date', sa.Date(), nullable=False),
+    sa.Column('starts', sa.Integer(), nullable=False),
+    sa.Column('wins', sa.Integer(), nullable=False),
+    sa.Column('total_payoff', sa.Float(), nullable=False),
+    sa.Column('total_finish_position', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_entity_daily_stats')),
+    sa.UniqueConstraint('entity_type', 'entity_id', 'track_id', 'stat_date', name='uq_entity_daily_stats_entity_day'),
+    schema='racing'
+    )
+    op.create_index(op.f('ix_racing_entity_daily_stats_stat_date'), 'entity_daily_stats', ['stat_date'], unique=False, schema='racing')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_racing_entity_daily_stats_stat_date'), table_name='entity_daily_stats', schema='racing')
+    op.drop_table('entity_daily_stats', schema='racing')
@@ -0,0 +1,209 @@
+"""partition runners and runner_results by race date
+
+Revision ID: c52e8f0d4a61
+Revises: b7d41e2a9c13
+Create Date: 2026-10-19 11:40:27.503918
+
+"""
+from typing import Sequence, Union
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c52e8f0d4a61'
+down_revision: Union[str, Sequence[str], None] = 'b7d41e2a9c13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Months of empty partitions to create ahead of the newest data
+FUTURE_MONTHS = 3
+
+RUNNER_COLUMNS = [
+    'id', 'race_id', 'race_date', 'horse_id', 'jockey_id', 'trainer_id',
+    'program_number', 'program_number_stripped', 'post_position',
+    'morning_line_odds', 'morning_line_decimal', 'live_odds', 'live_odds_decimal',
+    'weight', 'claiming_price', 'equipment', 'medication',
+    'is_scratched', 'is_coupled', 'scratch_indicator',
+]
+
+RUNNER_RESULT_COLUMNS = [
+    'id', 'runner_id', 'race_date', 'race_result_id', 'finish_position',
+    'win_payoff', 'place_payoff', 'show_payoff',
+]
+
+RUNNERS_DDL = """
+CREATE TABLE racing.runners (
+    id INTEGER NOT NULL DEFAULT nextval('racing.runners_id_seq'),
+    race_id INTEGER NOT NULL,
+    race_date DATE NOT NULL,
+    horse_id INTEGER NOT NULL,
+    jockey_id INTEGER,
+    trainer_id INTEGER,
+    program_number VARCHAR(10) NOT NULL,
+    program_number_stripped INTEGER,
+    post_position VARCHAR(10),
+    morning_line_odds VARCHAR(20),
+    morning_line_decimal FLOAT,
+    live_odds VARCHAR(20),
+    live_odds_decimal FLOAT,
+    weight INTEGER,
+    claiming_price INTEGER,
+    equipment VARCHAR(100),
+    medication VARCHAR(50),
+    is_scratched BOOLEAN,
+    is_coupled BOOLEAN,
+    scratch_indicator VARCHAR(10),
+    CONSTRAINT pk_runners PRIMARY KEY (id, race_date),
+    CONSTRAINT fk_runners_race_id_races FOREIGN KEY (race_id) REFERENCES racing.races (id),
+    CONSTRAINT fk_runners_horse_id_horses FOREIGN KEY (horse_id) REFERENCES racing.horses (id),
+    CONSTRAINT fk_runners_jockey_id_jockeys FOREIGN KEY (jockey_id) REFERENCES racing.jockeys (id),
+    CONSTRAINT fk_runners_trainer_id_trainers FOREIGN KEY (trainer_id) REFERENCES racing.trainers (id)
+) PARTITION BY RANGE (race_date)
+"""
+
+RUNNER_RESULTS_DDL = """
+CREATE TABLE racing.runner_results (
+    id INTEGER NOT NULL DEFAULT nextval('racing.runner_results_id_seq'),
+    runner_id INTEGER NOT NULL,
+    race_date DATE NOT NULL,
+    race_result_id INTEGER NOT NULL,
+    finish_position INTEGER,
+    win_payoff FLOAT,
+    place_payoff FLOAT,
+    show_payoff FLOAT,
+    CONSTRAINT pk_runner_results PRIMARY KEY (id, race_date),
+    CONSTRAINT fk_runner_results_race_result_id_race_results
+        FOREIGN KEY (race_result_id) REFERENCES racing.race_results (id)
+) PARTITION BY RANGE (race_date)
+"""
+
+
+def _next_month(d: date) -> date:
+    return date(d.year + 1, 1, 1) if d.month == 12 else date(d.year, d.month + 1, 1)
+
+
+def _create_month_partitions(table: str, first: date, last: date) -> None:
+    """Create one partition per month from first through last, plus a default."""
+    month = first.replace(day=1)
+    while month <= last:
+        upper = _next_month(month)
+        op.execute(
+            f"CREATE TABLE racing.{table}_y{month.year}m{month.month:02d} "
+            f"PARTITION OF racing.{table} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+        )
+        month = upper
+
+    op.execute(f"CREATE TABLE racing.{table}_default PARTITION OF racing.{table} DEFAULT")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 1. Denormalize the meet date onto runner-level rows (partition key)
+    op.add_column('runners', sa.Column('race_date', sa.Date(), nullable=True), schema='racing')
+    op.add_column('runner_results', sa.Column('race_date', sa.Date(), nullable=True), schema='racing')
+    op.execute(
+        "UPDATE racing.runners ru SET race_date = m.date "
+        "FROM racing.races r JOIN racing.meets m ON m.id = r.meet_id "
+        "WHERE r.id = ru.race_id"
+    )
+    op.execute(
+        "UPDATE racing.runner_results rr SET race_date = ru.race_date "
+        "FROM racing.runners ru WHERE ru.id = rr.runner_id"
+    )
+
+    # 2. Move the plain tables aside, keeping their id sequences
+    op.drop_constraint('fk_runner_results_runner_id_runners', 'runner_results', schema='racing', type_='foreignkey')
+    op.rename_table('runners', 'runners_legacy', schema='racing')
+    op.rename_table('runner_results', 'runner_results_legacy', schema='racing')
+    op.execute("ALTER TABLE racing.runners_legacy RENAME CONSTRAINT pk_runners TO pk_runners_legacy")
+    op.execute("ALTER TABLE racing.runner_results_legacy RENAME CONSTRAINT pk_runner_results TO pk_runner_results_legacy")
+    op.execute("ALTER SEQUENCE racing.runners_id_seq OWNED BY NONE")
+    op.execute("ALTER SEQUENCE racing.runner_results_id_seq OWNED BY NONE")
+
+    # 3. Partitioned parents and monthly partitions covering existing data
+    op.execute(RUNNERS_DDL)
+    op.execute(RUNNER_RESULTS_DDL)
+
+    bounds = op.get_bind().execute(
+        sa.text("SELECT MIN(race_date), MAX(race_date) FROM racing.runners_legacy")
+    ).first()
+    first = bounds[0] or date.today()
+    last = bounds[1] or date.today()
+    for _ in range(FUTURE_MONTHS):
+        last = _next_month(last)
+
+    _create_month_partitions('runners', first, last)
+    _create_month_partitions('runner_results', first, last)
+
+    # 4. Copy rows across and drop the plain tables
+    runner_cols = ', '.join(RUNNER_COLUMNS)
+    result_cols = ', '.join(RUNNER_RESULT_COLUMNS)
+    op.execute(f"INSERT INTO racing.runners ({runner_cols}) SELECT {runner_cols} FROM racing.runners_legacy")
+    op.execute(f"INSERT INTO racing.runner_results ({result_cols}) SELECT {result_cols} FROM racing.runner_results_legacy")
+    op.drop_table('runner_results_legacy', schema='racing')
+    op.drop_table('runners_legacy', schema='racing')
+
+    op.execute("ALTER SEQUENCE racing.runners_id_seq OWNED BY racing.runners.id")
+    op.execute("ALTER SEQUENCE racing.runner_results_id_seq OWNED BY racing.runner_results.id")
+
+    # 5. Indexes (propagate to every partition) and the composite runner FK
+    op.create_index(op.f('ix_racing_runners_horse_id'), 'runners', ['horse_id'], unique=False, schema='racing')
+    op.create_index(op.f('ix_racing_runners_jockey_id'), 'runners', ['jockey_id'], unique=False, schema='racing')
+    op.create_index(op.f('ix_racing_runners_race_id'), 'runners', ['race_id'], unique=False, schema='racing')
+    op.create_index(op.f('ix_racing_runners_trainer_id'), 'runners', ['trainer_id'], unique=False, schema='racing')
+    op.create_index(op.f('ix_racing_runner_results_race_result_id'), 'runner_results', ['race_result_id'], unique=False, schema='racing')
+    op.create_index('ix_racing_runner_results_runner_id', 'runner_results', ['runner_id', 'race_date'], unique=True, schema='racing')
+    op.create_foreign_key(
+        'fk_runner_results_runner_id_runners', 'runner_results', 'runners',
+        ['runner_id', 'race_date'], ['id', 'race_date'],
+        source_schema='racing', referent_schema='racing'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Rebuild plain tables from the partitioned ones (archived partitions are not restored)
+    op.drop_constraint('fk_runner_results_runner_id_runners', 'runner_results', schema='racing', type_='foreignkey')
+    op.rename_table('runners', 'runners_partitioned', schema='racing')
+    op.rename_table('runner_results', 'runner_results_partitioned', schema='racing')
+    op.execute("ALTER TABLE racing.runners_partitioned RENAME CONSTRAINT pk_runners TO pk_runners_partitioned")
+    op.execute("ALTER TABLE racing.runner_results_partitioned RENAME CONSTRAINT pk_runner_results TO pk_runner_results_partitioned")
+    op.execute("ALTER SEQUENCE racing.runners_id_seq OWNED BY NONE")
+    op.execute("ALTER SEQUENCE racing.runner_results_id_seq OWNED BY NONE")
+
+    op.execute(
+        RUNNERS_DDL.replace(') PARTITION BY RANGE (race_date)', ')')
+        .replace('PRIMARY KEY (id, race_date)', 'PRIMARY KEY (id)')
+    )
+    op.execute(
+        RUNNER_RESULTS_DDL.replace(') PARTITION BY RANGE (race_date)', ')')
+        .replace('PRIMARY KEY (id, race_date)', 'PRIMARY KEY (id)')
+    )
+
+    runner_cols = ', '.join(RUNNER_COLUMNS)
+    result_cols = ', '.join(RUNNER_RESULT_COLUMNS)
+    op.execute(f"INSERT INTO racing.runners ({runner_cols}) SELECT {runner_cols} FROM racing.runners_partitioned")
+    op.execute(f"INSERT INTO racing.runner_results ({result_cols}) SELECT {result_cols} FROM racing.runner_results_partitioned")
+    op.drop_table('runner_results_partitioned', schema='racing')
+    op.drop_table('runners_partitioned', schema='racing')
+
+    op.execute("ALTER SEQUENCE racing.runners_id_seq OWNED BY racing.runners.id")
+    op.execute("ALTER SEQUENCE racing.runner_results_id_seq OWNED BY racing.runner_results.id")
+
+    op.create_index(op.f('ix_racing_runners_horse_id'), 'runners', ['horse_id'], unique=False, schema='racing')
+    op.create_index(op.f('ix_racing_runners_jockey_id'), 'runners', ['jockey_id'], unique=False, schema='racing')
+    op.create_index(op.f('ix_racing_runners_race_id'), 'runners', ['race_id'], unique=False, schema='racing')
+    op.create_index(op.f('ix_racing_runners_trainer_id'), 'runners', ['trainer_id'], unique=False, schema='racing')
+    op.create_index(op.f('ix_racing_runner_results_race_result_id'), 'runner_results', ['race_result_id'], unique=False, schema='racing')
+    op.create_index(op.f('ix_racing_runner_results_runner_id'), 'runner_results', ['runner_id'], unique=True, schema='racing')
+    op.create_foreign_key(
+        'fk_runner_results_runner_id_runners', 'runner_results', 'runners',
+        ['runner_id'], ['id'],
+        source_schema='racing', referent_schema='racing'
+    )
+    op.drop_column('runner_results', 'race_date', schema='racing')
+    op.drop_column('runners', 'race_date', schema='racing')
@@ -0,0 +1,46 @@
+"""add database stats snapshot table
+
+Revision ID: d3e9a71f5b28
+Revises: c52e8f0d4a61
+Create Date: 2026-10-19 13:05:51.672210
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3e9a71f5b28'
+down_revision: Union[str, Sequence[str], None] = 'c52e8f0d4a61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('database_stats',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tracks_count', sa.Integer(), nullable=False),
+    sa.Column('meets_count', sa.Integer(), nullable=False),
+    sa.Column('races_count', sa.Integer(), nullable=False),
+    sa.Column('horses_count', sa.Integer(), nullable=False),
+    sa.Column('jockeys_count', sa.Integer(), nullable=False),
+    sa.Column('trainers_count', sa.Integer(), nullable=False),
+    sa.Column('runners_count', sa.Integer(), nullable=False),
+    sa.Column('race_results_count', sa.Integer(), nullable=False),
+    sa.Column('payoffs_count', sa.Integer(), nullable=False),
+    sa.Column('avg_races_per_meet', sa.Float(), nullable=True),
+    sa.Column('avg_runners_per_race', sa.Float(), nullable=True),
+    sa.Column('first_meet_date', sa.Date(), nullable=True),
+    sa.Column('last_meet_date', sa.Date(), nullable=True),
+    sa.Column('refreshed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_database_stats')),
+    schema='racing'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('database_stats', schema='racing')
@@ -1,18 +1,60 @@
 """Core backtesting engine."""
+import sys
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from typing import Optional
-import joblib
+from typing import Dict, List, Optional
+from joblib import Parallel, delayed
 import logging
 
 from src.backtesting.betting_strategies import BettingStrategy
+from src.ml import data_preparation
+from src.ml.artifact_cache import ArtifactCache, code_version, file_fingerprint
 from src.ml.data_preparation import DataPreparation
+from src.ml.model_artifacts import load_model_file
 from sklearn.preprocessing import StandardScaler
 
 logger = logging.getLogger(__name__)
 
 
+def attach_race_dates(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Make sure feature rows carry their calendar day (race_date).
+
+    Feature files built before FeatureBuilder wrote race_date get it by
+    joining Meet.date on meet_id. Without a database the frame is returned
+    unchanged and callers fall back to meet_id.
+
+    Args:
+        df: Feature rows with meet_id (modified in place)
+
+    Returns:
+        The same DataFrame
+    """
+    if 'race_date' in df.columns or 'meet_id' not in df.columns:
+        return df
+
+    try:
+        from src.db.session import get_db_context
+        from src.db.models import Meet
+
+        meet_ids = [int(meet_id) for meet_id in pd.unique(df['meet_id'])]
+        with get_db_context() as db:
+            rows = db.query(Meet.id, Meet.date).filter(Meet.id.in_(meet_ids)).all()
+    except Exception as e:
+        logger.warning(f"Feature file has no race_date and meet dates could not be loaded: {e}")
+        return df
+
+    dates = {meet_id: meet_date.isoformat() for meet_id, meet_date in rows}
+    if len(dates) < len(meet_ids):
+        logger.warning(f"{len(meet_ids) - len(dates)} meets not found in the database - race dates not joined")
+        return df
+
+    df['race_date'] = df['meet_id'].map(dates)
+    logger.info(f"Joined race dates for {len(dates)} meets")
+    return df
+
+
 class BetResult:
     """Result of a single bet."""
 
@@ -58,144 +100,391 @@ class BetResult:
         }
 
 
+def build_bet_arrays(
+    test_df: pd.DataFrame,
+    win_probabilities: np.ndarray,
+    min_odds: float = 1.0,
+    max_odds: float = 50.0
+) -> dict:
+    """
+    Flatten test rows into the candidate-bet arrays the simulator works on.
+
+    Candidates are ordered by race (then original row order), which is
+    the order bets are settled in, and runners with missing or
+    out-of-range odds are dropped.
+
+    Args:
+        test_df: Test rows (race_id, runner_id, ml_odds_decimal, target_win
+            and optionally win_payoff, meet_id, race_date)
+        win_probabilities: Model probability per test row
+        min_odds: Skip odds at or below this
+        max_odds: Skip odds above this
+
+    Returns:
+        Dictionary of equal-length arrays: race_id, runner_id, prob, odds,
+        actual_win, win_payoff, multiplier (return per $1 staked) and
+        meet_id / race_date when available
+    """
+    race_ids = test_df['race_id'].to_numpy()
+    order = np.argsort(race_ids, kind='stable')
+
+    odds = test_df['ml_odds_decimal'].to_numpy(dtype=np.float64)[order]
+    eligible = (odds > min_odds) & (odds <= max_odds) & (odds != 0)
+    rows = order[eligible]
+
+    if 'win_payoff' in test_df.columns:
+        win_payoff = np.nan_to_num(test_df['win_payoff'].to_numpy(dtype=np.float64)[rows])
+    else:
+        win_payoff = np.zeros(len(rows))
+
+    odds = odds[eligible]
+    actual_win = test_df['target_win'].to_numpy()[rows].astype(np.int64)
+
+    arrays = {
+        'race_id': race_ids[rows],
+        'runner_id': test_df['runner_id'].to_numpy()[rows],
+        'prob': np.asarray(win_probabilities, dtype=np.float64)[rows],
+        'odds': odds,
+        'actual_win': actual_win,
+        'win_payoff': win_payoff,
+        'multiplier': payout_multipliers(actual_win, odds, win_payoff),
+    }
+
+    # Meet (track-day) and calendar day of each candidate, for day-level resampling
+    for col in ('meet_id', 'race_date'):
+        if col in test_df.columns:
+            arrays[col] = test_df[col].to_numpy()[rows]
+
+    return arrays
+
+
+def payout_multipliers(actual_win: np.ndarray, odds: np.ndarray, win_payoff: np.ndarray) -> np.ndarray:
+    """
+    Return per $1 staked (same rules as BetResult).
+
+    Winners collect the recorded $2 payoff scaled to the stake, or the
+    morning line odds when no payoff is recorded; losers get nothing.
+    """
+    won = actual_win == 1
+    return np.where(
+        won & (win_payoff > 0), win_payoff / 2.0,
+        np.where(won, odds + 1.0, 0.0)
+    )
+
+
+def simulate_strategy(
+    strategy: BettingStrategy,
+    prob: np.ndarray,
+    odds: np.ndarray,
+    multiplier: np.ndarray
+) -> tuple:
+    """
+    Simulate a strategy over candidate bets.
+
+    Strategies whose bet sizes don't depend on the bankroll are computed
+    with array operations: stakes from calculate_bets, then returns and a
+    cumulative-sum bankroll. That is exact as long as every bet stays
+    affordable; from the first bet the bankroll can't cover (and for
+    bankroll-dependent strategies like Kelly, from the start) the
+    simulation continues bet by bet.
+
+    Args:
+        strategy: Betting strategy (reset before simulating)
+        prob: Win probability per candidate
+        odds: Decimal odds per candidate
+        multiplier: Return per $1 staked per candidate
+
+    Returns:
+        Tuple of (stakes, bankroll after each candidate); stake 0 = no bet
+    """
+    strategy.reset()
+    n = len(prob)
+    stakes = np.zeros(n)
+    bankroll = np.full(n, float(strategy.initial_bankroll))
+    start = 0
+
+    if not strategy.bankroll_dependent:
+        stakes = strategy.calculate_bets(prob, odds, np.inf)
+        profit = stakes * multiplier - stakes
+        bankroll = strategy.initial_bankroll + np.cumsum(profit)
+
+        unaffordable = (stakes > 0) & (bankroll - profit < stakes)
+        if not unaffordable.any():
+            strategy.bankroll = float(bankroll[-1]) if n else strategy.initial_bankroll
+            return stakes, bankroll
+
+        start = int(np.argmax(unaffordable))
+        strategy.bankroll = float(bankroll[start] - profit[start])
+        stakes[start:] = 0.0
+
+    # Sequential fallback
+    current = strategy.bankroll
+    for i in range(start, n):
+        stake = strategy.calculate_bet(win_probability=float(prob[i]), odds_decimal=float(odds[i]))
+        if stake > 0:
+            stakes[i] = stake
+            current += stake * multiplier[i] - stake
+            strategy.bankroll = current
+        bankroll[i] = current
+
+    return stakes, bankroll
+
+
+def bets_to_frame(arrays: dict, stakes: np.ndarray, bankroll: np.ndarray) -> pd.DataFrame:
+    """
+    Backtest results table (one row per placed bet).
+
+    Args:
+        arrays: Output of build_bet_arrays
+        stakes: Stake per candidate
+        bankroll: Bankroll after each candidate
+
+    Returns:
+        DataFrame with the BetResult columns plus meet_id and race_date
+        (when available), bankroll, cumulative and running ROI columns
+    """
+    placed = stakes > 0
+    bet_amount = stakes[placed]
+    return_amount = bet_amount * arrays['multiplier'][placed]
+    profit = return_amount - bet_amount
+
+    results_df = pd.DataFrame({
+        'race_id': arrays['race_id'][placed],
+        'runner_id': arrays['runner_id'][placed],
+        'bet_amount': bet_amount,
+        'win_probability': arrays['prob'][placed],
+        'odds_decimal': arrays['odds'][placed],
+        'actual_win': arrays['actual_win'][placed],
+        'win_payoff': arrays['win_payoff'][placed],
+        'return_amount': return_amount,
+        'profit': profit,
+        'bankroll': bankroll[placed],
+    })
+    for position, col in enumerate(('meet_id', 'race_date'), start=1):
+        if col in arrays:
+            results_df.insert(position, col, arrays[col][placed])
+
+    results_df['cumulative_profit'] = np.cumsum(profit)
+    results_df['cumulative_bets'] = np.cumsum(bet_amount)
+    results_df['running_roi'] = (
+        results_df['cumulative_profit'] / results_df['cumulative_bets'] * 100
+    )
+
+    return results_df
+
+
+def _run_strategy(strategy: BettingStrategy, arrays: dict) -> tuple:
+    """
+    Simulate one strategy over shared candidate-bet arrays.
+
+    Module-level so it can run in a worker process; the strategy's final
+    bankroll is returned because a worker's copy is not the caller's.
+
+    Returns:
+        Tuple of (results DataFrame, final bankroll); empty if no bets placed
+    """
+    stakes, bankroll = simulate_strategy(
+        strategy, arrays['prob'], arrays['odds'], arrays['multiplier']
+    )
+
+    if not (stakes > 0).any():
+        return pd.DataFrame(), strategy.bankroll
+
+    return bets_to_frame(arrays, stakes, bankroll), strategy.bankroll
+
+
 class Backtester:
     """
     Core backtesting engine.
 
     IMPORTANT: Only tests on held-out data the model has never seen.
     Uses same 80/20 time-based split as model training.
+
+    Data loading, scaling and prediction happen once per Backtester; the
+    resulting candidate-bet arrays are shared by every strategy passed to
+    run_strategies, so each extra strategy only costs its simulation.
     """
 
     def __init__(
         self,
         model_path: Path,
         data_path: Path,
-        strategy: BettingStrategy,
+        strategy: Optional[BettingStrategy] = None,
         train_ratio: float = 0.8,
         min_odds: float = 1.0,
-        max_odds: float = 50.0
+        max_odds: float = 50.0,
+        cache: Optional[ArtifactCache] = None
     ):
         self.strategy = strategy
         self.min_odds = min_odds
         self.max_odds = max_odds
         self.train_ratio = train_ratio
+        self.model_path = Path(model_path)
+        self.cache = cache
+        self._model = None
+        self._bet_arrays = None
+
+        # Same default feature set the training scripts use
+        from src.features.feature_builder import resolve_feature_set
+        self.feature_set = resolve_feature_set()
+
+        # Split, scaler and predictions depend only on the data, the model
+        # file and this code, so strategies tested on the same inputs share them
+        split_key = ArtifactCache.key(
+            data=file_fingerprint(data_path),
+            code=code_version(sys.modules[__name__], data_preparation),
+            train_ratio=train_ratio,
+            feature_set=self.feature_set
+        )
+        self.predictions_key = ArtifactCache.key(
+            split=split_key,
+            model=file_fingerprint(self.model_path)
+        )
+
+        split = cache.get('backtest_split', split_key) if cache is not None else None
+        if split is None:
+            split = self._prepare_split(data_path, train_ratio)
+            if cache is not None:
+                cache.put('backtest_split', split_key, split)
+
+        self.feature_columns = split['feature_columns']
+        self.scaler = split['scaler']
+        self.test_df = split['test_df']
+        self.X_test_scaled = split['X_test_scaled']
 
-        # Load model
-        logger.info(f"Loading model from {model_path}")
-        self.model = joblib.load(model_path)
+        logger.info(f"Train samples: {split['n_train']} (model trained on these)")
+        logger.info(f"Test samples: {len(self.test_df)} (backtesting on these only)")
+        logger.info(f"  Test wins: {(self.test_df['target_win'] == 1).sum()}")
+        logger.info(f"  Test losses: {(self.test_df['target_win'] == 0).sum()}")
 
+    def _prepare_split(self, data_path: Path, train_ratio: float) -> dict:
+        """Load data, apply the training split and scale the test rows."""
         # Load and prepare data - USE SAME SPLIT AS TRAINING
         logger.info(f"Loading data from {data_path}")
-        self.data_prep = DataPreparation()
+        data_prep = DataPreparation(feature_set=self.feature_set)
 
-        raw_df = self.data_prep.load_data(data_path)
-        complete_df = self.data_prep.filter_complete_data(raw_df)
-        complete_df = self.data_prep.handle_missing_values(complete_df)
+        raw_df = attach_race_dates(data_prep.load_data(data_path))
+        complete_df = data_prep.filter_complete_data(raw_df)
+        complete_df = data_prep.handle_missing_values(complete_df)
 
-        self.feature_columns = self.data_prep.get_feature_columns(complete_df)
+        feature_columns = data_prep.get_feature_columns(complete_df)
 
         # Apply SAME time-based split as training
         # Train on first 80%, test on last 20%
-        train_df, test_df = self.data_prep.time_based_split(
+        train_df, test_df = data_prep.time_based_split(
             complete_df, train_ratio=train_ratio
         )
 
         # Fit scaler on TRAIN only, transform TEST only
-        X_train = train_df[self.feature_columns]
-        X_test = test_df[self.feature_columns]
+        X_train = train_df[feature_columns]
+        X_test = test_df[feature_columns]
 
-        self.scaler = StandardScaler()
-        self.scaler.fit(X_train)  # Fit on train only!
+        scaler = StandardScaler()
+        scaler.fit(X_train)  # Fit on train only!
 
-        # Backtest only on TEST set (model has never seen this)
-        self.test_df = test_df.copy()
-        self.X_test_scaled = pd.DataFrame(
-            self.scaler.transform(X_test),
-            columns=self.feature_columns,
+        # Backtest only on TEST set (model has never seen this);
+        # time_based_split already returned an independent frame
+        X_test_scaled = pd.DataFrame(
+            scaler.transform(X_test),
+            columns=feature_columns,
             index=test_df.index
         )
 
-        logger.info(f"Train samples: {len(train_df)} (model trained on these)")
-        logger.info(f"Test samples: {len(test_df)} (backtesting on these only)")
-        logger.info(f"  Test wins: {(test_df['target_win'] == 1).sum()}")
-        logger.info(f"  Test losses: {(test_df['target_win'] == 0).sum()}")
+        return {
+            'feature_columns': feature_columns,
+            'scaler': scaler,
+            'test_df': test_df,
+            'X_test_scaled': X_test_scaled,
+            'n_train': len(train_df),
+        }
+
+    @property
+    def model(self):
+        """Model, loaded on first use (not needed when predictions are cached)."""
+        if self._model is None:
+            logger.info(f"Loading model from {self.model_path}")
+            self._model = load_model_file(self.model_path)
+        return self._model
 
     def get_win_probabilities(self) -> np.ndarray:
         """Get win probabilities using properly scaled test data."""
-        return self.model.predict_proba(self.X_test_scaled)[:, 1]
-
-    def run(self) -> pd.DataFrame:
-        """Run backtest simulation on test set only."""
-        logger.info(f"\nRunning backtest with {self.strategy.name}")
-
-        self.strategy.reset()
-
-        # Get predictions on test set
-        win_probabilities = self.get_win_probabilities()
-        self.test_df = self.test_df.copy()
-        self.test_df['win_probability'] = win_probabilities
-
-        bet_results = []
-        bankroll_history = [self.strategy.bankroll]
-
-        # Group by race
-        races = self.test_df.groupby('race_id')
-
-        for race_id, race_df in races:
-            race_probs = race_df['win_probability'].values
-            race_odds = race_df['ml_odds_decimal'].values
-            race_wins = race_df['target_win'].values
-            race_runner_ids = race_df['runner_id'].values
-
-            for idx in range(len(race_df)):
-                odds = race_odds[idx]
-                win_prob = race_probs[idx]
-                actual_win = race_wins[idx]
-                runner_id = race_runner_ids[idx]
-
-                # Skip missing or out-of-range odds
-                if odds <= self.min_odds or odds > self.max_odds or odds == 0:
-                    continue
-
-                # Calculate bet
-                bet_amount = self.strategy.calculate_bet(
-                    win_probability=float(win_prob),
-                    odds_decimal=float(odds)
-                )
-
-                if bet_amount <= 0:
-                    continue
-
-                win_payoff = race_df.iloc[idx].get('win_payoff', 0.0) or 0.0
-
-                result = BetResult(
-                    race_id=race_id,
-                    runner_id=runner_id,
-                    bet_amount=bet_amount,
-                    win_probability=float(win_prob),
-                    odds_decimal=float(odds),
-                    actual_win=int(actual_win),
-                    win_payoff=float(win_payoff)
-                )
-
-                self.strategy.bankroll += result.profit
-                bet_results.append(result.to_dict())
-                bankroll_history.append(self.strategy.bankroll)
-
-        if not bet_results:
-            logger.warning("No bets placed!")
-            return pd.DataFrame()
-
-        results_df = pd.DataFrame(bet_results)
-        results_df['bankroll'] = bankroll_history[1:len(results_df) + 1]
-        results_df['cumulative_profit'] = results_df['profit'].cumsum()
-        results_df['cumulative_bets'] = results_df['bet_amount'].cumsum()
-        results_df['running_roi'] = (
-            results_df['cumulative_profit'] / results_df['cumulative_bets'] * 100
+        if self.cache is None:
+            return self.model.predict_proba(self.X_test_scaled)[:, 1]
+
+        return self.cache.get_or_compute(
+            'predictions',
+            self.predictions_key,
+            lambda: self.model.predict_proba(self.X_test_scaled)[:, 1]
         )
 
+    def get_bet_arrays(self) -> dict:
+        """Candidate-bet arrays for the test set (see build_bet_arrays), built once."""
+        if self._bet_arrays is None:
+            self._bet_arrays = build_bet_arrays(
+                self.test_df, self.get_win_probabilities(), self.min_odds, self.max_odds
+            )
+        return self._bet_arrays
+
+    def run(self, strategy: Optional[BettingStrategy] = None) -> pd.DataFrame:
+        """
+        Run backtest simulation on test set only.
+
+        Args:
+            strategy: Strategy to simulate (default: the one given at construction)
+
+        Returns:
+            Results DataFrame (empty if no bets placed)
+        """
+        strategy = strategy or self.strategy
+        if strategy is None:
+            raise ValueError("No betting strategy given")
+
+        return self.run_strategies([strategy])[strategy.name]
+
+    def run_strategies(
+        self,
+        strategies: List[BettingStrategy],
+        n_jobs: int = 1
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Simulate several strategies against the same predictions.
+
+        Args:
+            strategies: Strategies to test (names must be unique)
+            n_jobs: Worker processes (1 = in-process, -1 = all cores)
+
+        Returns:
+            Dictionary of {strategy name: results DataFrame}
+        """
+        names = [strategy.name for strategy in strategies]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Strategy names must be unique: {names}")
+
+        arrays = self.get_bet_arrays()
+
+        if n_jobs == 1:
+            outcomes = [_run_strategy(strategy, arrays) for strategy in strategies]
+        else:
+            outcomes = Parallel(n_jobs=n_jobs)(
+                delayed(_run_strategy)(strategy, arrays) for strategy in strategies
+            )
+
+        all_results = {}
+        for strategy, (results_df, final_bankroll) in zip(strategies, outcomes):
+            strategy.bankroll = final_bankroll
+            self._log_run(strategy, results_df)
+            all_results[strategy.name] = results_df
+
+        return all_results
+
+    def _log_run(self, strategy: BettingStrategy, results_df: pd.DataFrame):
+        """Log the outcome of one strategy."""
+        logger.info(f"\nBacktest with {strategy.name}")
+
+        if results_df.empty:
+            logger.warning("No bets placed!")
+            return
+
         logger.info(f"✓ Placed {len(results_df)} bets")
-        logger.info(f"  Final bankroll: ${self.strategy.bankroll:.2f}")
+        logger.info(f"  Final bankroll: ${strategy.bankroll:.2f}")
         logger.info(f"  Total profit: ${results_df['profit'].sum():.2f}")
-
-        return results_df
\ No newline at end of file
@@ -10,6 +10,10 @@ logger = logging.getLogger(__name__)
 class BettingStrategy(ABC):
     """Base class for all betting strategies."""
 
+    # Whether bet sizes depend on the evolving bankroll (beyond affording the
+    # bet). Such strategies are simulated bet by bet; the rest are vectorized.
+    bankroll_dependent = True
+
     def __init__(self, name: str, bankroll: float = 1000.0):
         """
         Initialize strategy.
@@ -41,6 +45,49 @@ class BettingStrategy(ABC):
         """
         pass
 
+    def calculate_bets(
+            self,
+            probs: np.ndarray,
+            odds: np.ndarray,
+            bankroll_state=None
+    ) -> np.ndarray:
+        """
+        Calculate bet amounts for many candidates at once.
+
+        The default calls calculate_bet per candidate; built-in strategies
+        override it with array operations.
+
+        Args:
+            probs: Predicted win probabilities
+            odds: Decimal odds
+            bankroll_state: Bankroll before each bet (scalar or array,
+                default: current bankroll)
+
+        Returns:
+            Array of bet amounts (0 = no bet)
+        """
+        probs = np.asarray(probs, dtype=np.float64)
+        odds = np.asarray(odds, dtype=np.float64)
+        bankroll = np.broadcast_to(
+            self.bankroll if bankroll_state is None else bankroll_state, probs.shape
+        )
+
+        saved_bankroll = self.bankroll
+        bets = np.zeros(len(probs))
+        try:
+            for i in range(len(probs)):
+                self.bankroll = float(bankroll[i])
+                bets[i] = self.calculate_bet(win_probability=float(probs[i]), odds_decimal=float(odds[i]))
+        finally:
+            self.bankroll = saved_bankroll
+
+        return bets
+
+    def _affordable(self, bets: np.ndarray, bankroll_state) -> np.ndarray:
+        """Zero out bets the bankroll cannot cover (vectorized can_bet)."""
+        bankroll = self.bankroll if bankroll_state is None else bankroll_state
+        return np.where((bankroll >= bets) & (bets > 0), bets, 0.0)
+
     def reset(self):
         """Reset bankroll to initial amount."""
         self.bankroll = self.initial_bankroll
@@ -61,6 +108,8 @@ class FlatBettingStrategy(BettingStrategy):
     Good for comparing models on equal footing.
     """
 
+    bankroll_dependent = False
+
     def __init__(self, bet_amount: float = 2.0, bankroll: float = 1000.0):
         """
         Initialize flat betting.
@@ -81,6 +130,11 @@ class FlatBettingStrategy(BettingStrategy):
         """Always bet fixed amount."""
         return self.bet_amount if self.can_bet(self.bet_amount) else 0.0
 
+    def calculate_bets(self, probs, odds, bankroll_state=None) -> np.ndarray:
+        """Fixed amount for every candidate."""
+        bets = np.full(len(probs), float(self.bet_amount))
+        return self._affordable(bets, bankroll_state)
+
 
 class KellyCriterionStrategy(BettingStrategy):
     """
@@ -153,6 +207,28 @@ class KellyCriterionStrategy(BettingStrategy):
 
         return bet_amount if self.can_bet(bet_amount) else 0.0
 
+    def calculate_bets(self, probs, odds, bankroll_state=None) -> np.ndarray:
+        """Kelly bets for many candidates, each sized from its own bankroll_state."""
+        probs = np.asarray(probs, dtype=np.float64)
+        odds = np.asarray(odds, dtype=np.float64)
+        bankroll = np.broadcast_to(
+            self.bankroll if bankroll_state is None else bankroll_state, probs.shape
+        ).astype(np.float64)
+
+        b = odds - 1
+        with np.errstate(divide='ignore', invalid='ignore'):
+            kelly = (b * probs - (1 - probs)) / b
+
+        # Only bet when positive expected value (and odds above evens)
+        positive = (odds > 1.0) & (kelly > 0)
+        fractional_kelly = np.minimum(np.where(positive, kelly, 0.0), 0.25) * self.fraction
+
+        bets = np.maximum(bankroll * fractional_kelly, self.min_bet)
+        bets = np.minimum(bets, np.minimum(bankroll * self.max_bet_fraction, 50.0))
+        bets = np.where(positive, bets, 0.0)
+
+        return self._affordable(bets, bankroll)
+
 
 class ValueBettingStrategy(BettingStrategy):
     """
@@ -165,6 +241,8 @@ class ValueBettingStrategy(BettingStrategy):
     by professional bettors.
     """
 
+    bankroll_dependent = False
+
     def __init__(
             self,
             min_edge: float = 0.05,
@@ -214,6 +292,16 @@ class ValueBettingStrategy(BettingStrategy):
 
         return self.bet_amount if self.can_bet(self.bet_amount) else 0.0
 
+    def calculate_bets(self, probs, odds, bankroll_state=None) -> np.ndarray:
+        """Fixed amount wherever the edge over the implied probability is large enough."""
+        probs = np.asarray(probs, dtype=np.float64)
+        odds = np.asarray(odds, dtype=np.float64)
+
+        edge = probs - 1.0 / (odds + 1.0)
+        bets = np.where((odds > 1.0) & (edge >= self.min_edge), float(self.bet_amount), 0.0)
+
+        return self._affordable(bets, bankroll_state)
+
 
 class ConfidenceBettingStrategy(BettingStrategy):
     """
@@ -223,6 +311,8 @@ class ConfidenceBettingStrategy(BettingStrategy):
     Higher probability = larger bet.
     """
 
+    bankroll_dependent = False
+
     def __init__(
             self,
             min_probability: float = 0.30,
@@ -273,6 +363,16 @@ class ConfidenceBettingStrategy(BettingStrategy):
 
         return bet_amount if self.can_bet(bet_amount) else 0.0
 
+    def calculate_bets(self, probs, odds, bankroll_state=None) -> np.ndarray:
+        """Bets scaled linearly with probability above the threshold."""
+        probs = np.asarray(probs, dtype=np.float64)
+
+        scale = np.minimum((probs - self.min_probability) / (0.60 - self.min_probability), 1.0)
+        bets = self.base_bet + scale * (self.max_bet - self.base_bet)
+        bets = np.where(probs >= self.min_probability, bets, 0.0)
+
+        return self._affordable(bets, bankroll_state)
+
 """
 IMPROVEMENT                    FILE TO EDIT                    DIFFICULTY
 ─────────────────────────────────────────────────────────────────────────
@@ -0,0 +1,572 @@
+"""Exotic wager (exacta/trifecta) probabilities and backtesting."""
+import argparse
+import re
+from pathlib import Path
+from typing import Dict, List, Sequence
+import numpy as np
+import pandas as pd
+import logging
+
+from src.backtesting.backtester import Backtester
+from src.backtesting.performance_metrics import PerformanceAnalyzer
+from src.ml.artifact_cache import ArtifactCache
+from src.ml.model_registry import resolve_model_path
+
+logger = logging.getLogger(__name__)
+
+# Payoff wager_type codes per wager, and how many finishers each one picks
+WAGER_TYPES = {
+    'exacta': ['EX', 'EXA', 'EXACTA'],
+    'trifecta': ['TRI', 'TR', 'TRIFECTA'],
+}
+WAGER_POSITIONS = {'exacta': 2, 'trifecta': 3}
+
+# Discount exponents for 2nd and 3rd place (Lo, Bacon-Shone & Busche's
+# power approximation of Henery's model); Harville uses 1.0 for both
+HENERY_DISCOUNTS = (0.76, 0.62)
+
+# Races whose ordering probabilities are held in memory at once
+CHUNK_RACES = 1024
+
+
+def field_matrix(race_ids: np.ndarray, values: np.ndarray) -> tuple:
+    """
+    Pad per-runner values into a (races x max field size) matrix.
+
+    Args:
+        race_ids: Race per runner
+        values: Value per runner
+
+    Returns:
+        Tuple of (matrix with 0.0 in empty slots, unique race ids,
+        race row per runner, slot per runner)
+    """
+    races, race_row = np.unique(race_ids, return_inverse=True)
+
+    # Slot = position of the runner within its race, in input order
+    order = np.argsort(race_row, kind='stable')
+    counts = np.bincount(race_row, minlength=len(races))
+    starts = np.cumsum(counts) - counts
+    slot = np.empty(len(race_row), dtype=np.int64)
+    slot[order] = np.arange(len(race_row)) - np.repeat(starts, counts)
+
+    matrix = np.zeros((len(races), counts.max()))
+    matrix[race_row, slot] = values
+    return matrix, races, race_row, slot
+
+
+def stage_strengths(
+        win_probabilities: np.ndarray,
+        n_positions: int,
+        model: str = 'harville',
+        discounts: Sequence[float] = HENERY_DISCOUNTS
+) -> List[np.ndarray]:
+    """
+    Per-finishing-position strengths of every runner.
+
+    Harville assumes the runners left after the winner finish second in
+    proportion to their win probabilities (and likewise for third);
+    Henery-style discounting flattens the later stages (p ** lambda,
+    renormalized), correcting Harville's overconfidence in favorites for
+    the minor placings.
+
+    Args:
+        win_probabilities: (races x slots) win probabilities, 0 in empty slots
+        n_positions: Finishing positions needed
+        model: 'harville' or 'henery'
+        discounts: Exponents for positions 2, 3 with 'henery'
+
+    Returns:
+        List of (races x slots) strength matrices, one per position
+    """
+    if model not in ('harville', 'henery'):
+        raise ValueError(f"Unknown ordering model: {model}")
+
+    totals = win_probabilities.sum(axis=1, keepdims=True)
+    p = np.divide(win_probabilities, totals, out=np.zeros_like(win_probabilities), where=totals > 0)
+
+    strengths = [p]
+    for position in range(1, n_positions):
+        if model == 'harville':
+            strengths.append(p)
+            continue
+
+        discounted = p ** discounts[position - 1]
+        strengths.append(discounted / discounted.sum(axis=1, keepdims=True))
+
+    return strengths
+
+
+def _conditional(numerator: np.ndarray, remaining: np.ndarray) -> np.ndarray:
+    """numerator / remaining, 0 where nothing is left to finish."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(remaining > 1e-12, numerator / remaining, 0.0)
+
+
+def exacta_probabilities(win_probabilities: np.ndarray, model: str = 'harville') -> np.ndarray:
+    """
+    Probability of every ordered (first, second) pair.
+
+    P(i, j) = s1_i * s2_j / (1 - s2_i)
+
+    Args:
+        win_probabilities: (races x slots) win probabilities
+        model: 'harville' or 'henery'
+
+    Returns:
+        (races x slots x slots) array, 0 on the diagonal and empty slots
+    """
+    s1, s2 = stage_strengths(win_probabilities, 2, model)
+
+    exacta = s1[:, :, None] * _conditional(s2[:, None, :], 1.0 - s2[:, :, None])
+    diagonal = np.arange(s1.shape[1])
+    exacta[:, diagonal, diagonal] = 0.0
+    return exacta
+
+
+def trifecta_probabilities(win_probabilities: np.ndarray, model: str = 'harville') -> np.ndarray:
+    """
+    Probability of every ordered (first, second, third) triple.
+
+    P(i, j, k) = s1_i * s2_j / (1 - s2_i) * s3_k / (1 - s3_i - s3_j)
+
+    Args:
+        win_probabilities: (races x slots) win probabilities
+        model: 'harville' or 'henery'
+
+    Returns:
+        (races x slots x slots x slots) array, 0 wherever positions repeat
+    """
+    s1, s2, s3 = stage_strengths(win_probabilities, 3, model)
+    n = s1.shape[1]
+
+    exacta = s1[:, :, None] * _conditional(s2[:, None, :], 1.0 - s2[:, :, None])
+    remaining = 1.0 - s3[:, :, None, None] - s3[:, None, :, None]
+    trifecta = exacta[..., None] * _conditional(s3[:, None, None, :], remaining)
+
+    i, j, k = np.ogrid[:n, :n, :n]
+    trifecta *= (i != j) & (i != k) & (j != k)
+    return trifecta
+
+
+def ordering_probabilities(win_probabilities: np.ndarray, wager: str, model: str = 'harville') -> np.ndarray:
+    """Exacta or trifecta probabilities (see exacta_probabilities / trifecta_probabilities)."""
+    if wager == 'exacta':
+        return exacta_probabilities(win_probabilities, model)
+    if wager == 'trifecta':
+        return trifecta_probabilities(win_probabilities, model)
+    raise ValueError(f"Unknown wager: {wager} (choose from {list(WAGER_POSITIONS)})")
+
+
+def parse_winning_numbers(winning_numbers: str) -> List[str]:
+    """Program numbers of a winning combination, e.g. '1-3/5' -> ['1', '3', '5']."""
+    return [n.strip().upper() for n in re.split(r'[-/, ]+', winning_numbers or '') if n.strip()]
+
+
+def load_exotic_payoffs(db, race_ids: Sequence[int], wager: str) -> pd.DataFrame:
+    """
+    Stored payoffs of one exotic wager for a set of races.
+
+    Args:
+        db: Database session
+        race_ids: Races to load
+        wager: 'exacta' or 'trifecta'
+
+    Returns:
+        DataFrame with race_id, winning_numbers, base_amount, payoff_amount
+    """
+    from src.db.models import Payoff
+
+    rows = db.query(
+        Payoff.race_id, Payoff.winning_numbers, Payoff.base_amount, Payoff.payoff_amount
+    ).filter(
+        Payoff.race_id.in_([int(r) for r in race_ids]),
+        Payoff.wager_type.in_(WAGER_TYPES[wager]),
+        Payoff.payoff_amount.isnot(None)
+    ).all()
+
+    return pd.DataFrame(rows, columns=['race_id', 'winning_numbers', 'base_amount', 'payoff_amount'])
+
+
+def load_program_numbers(db, runner_ids: Sequence[int]) -> pd.Series:
+    """
+    Program number of each runner (the numbers payoffs are keyed by).
+
+    Args:
+        db: Database session
+        runner_ids: Runners to look up
+
+    Returns:
+        Series of program numbers indexed by runner_id
+    """
+    from src.db.models import Runner
+
+    rows = db.query(Runner.id, Runner.program_number).filter(
+        Runner.id.in_([int(r) for r in runner_ids])
+    ).all()
+
+    return pd.Series(
+        {runner_id: str(number).strip().upper() for runner_id, number in rows},
+        name='program_number'
+    )
+
+
+class ExoticStrategy:
+    """
+    Flat-stake exotic betting on combinations the model rates above the market.
+
+    Combinations are priced twice with the same ordering model: once from
+    the model's win probabilities and once from the morning line. A
+    combination is bet when the model probability is at least
+    min_probability and exceeds the market's by min_edge (relative),
+    keeping at most max_combinations per race, most likely first.
+    """
+
+    def __init__(
+            self,
+            wager: str = 'exacta',
+            bet_amount: float = 2.0,
+            min_probability: float = 0.02,
+            min_edge: float = 0.20,
+            max_combinations: int = 6,
+            bankroll: float = 1000.0
+    ):
+        """
+        Initialize exotic strategy.
+
+        Args:
+            wager: 'exacta' or 'trifecta'
+            bet_amount: Stake per combination
+            min_probability: Minimum model probability of a combination
+            min_edge: Minimum model / market probability ratio minus 1
+            max_combinations: Most combinations bet per race
+            bankroll: Starting bankroll
+        """
+        if wager not in WAGER_POSITIONS:
+            raise ValueError(f"Unknown wager: {wager} (choose from {list(WAGER_POSITIONS)})")
+
+        self.name = f"{wager.title()} (edge {min_edge:.0%}, top {max_combinations})"
+        self.wager = wager
+        self.bet_amount = bet_amount
+        self.min_probability = min_probability
+        self.min_edge = min_edge
+        self.max_combinations = max_combinations
+        self.initial_bankroll = bankroll
+
+    def select(self, model_probs: np.ndarray, market_probs: np.ndarray) -> np.ndarray:
+        """
+        Combinations to bet in a chunk of races.
+
+        Args:
+            model_probs: (races x combinations) model probabilities
+            market_probs: (races x combinations) market probabilities
+
+        Returns:
+            Boolean (races x combinations) mask of bets
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            edge = np.where(market_probs > 0, model_probs / market_probs - 1.0, 0.0)
+
+        # No market price (e.g. a leg without a morning line) means no defined edge
+        eligible = (
+            (model_probs >= self.min_probability)
+            & (edge >= self.min_edge)
+            & (market_probs > 0)
+        )
+
+        # Keep the max_combinations most likely eligible combinations per race
+        k = min(self.max_combinations, model_probs.shape[1])
+        if k < model_probs.shape[1]:
+            top_k = np.argpartition(-np.where(eligible, model_probs, -1.0), k - 1, axis=1)[:, :k]
+            top = np.zeros_like(eligible)
+            np.put_along_axis(top, top_k, True, axis=1)
+            eligible &= top
+
+        return eligible
+
+
+class ExoticBacktester:
+    """
+    Backtest exotic strategies against stored exotic payoffs.
+
+    Win probabilities are padded into a (races x field) matrix once;
+    ordering probabilities are then computed a chunk of races at a time
+    as dense (races x N^k) arrays, bets are picked with array masks and
+    settled by joining against each race's winning combination(s).
+    Every race with a stored payoff for the wager is bet; races without
+    one are skipped. If a race's winning numbers don't all map to modeled
+    runners (e.g. a scratched or unmodeled horse ran in the money), no
+    selectable combination could have won, so its bets settle as losses.
+    """
+
+    def __init__(
+            self,
+            test_df: pd.DataFrame,
+            win_probabilities: np.ndarray,
+            payoffs: Dict[str, pd.DataFrame],
+            program_numbers: pd.Series,
+            model: str = 'harville',
+            chunk_races: int = CHUNK_RACES
+    ):
+        """
+        Initialize exotic backtester.
+
+        Args:
+            test_df: Test rows (race_id, runner_id, ml_odds_decimal)
+            win_probabilities: Model win probability per test row
+            payoffs: {wager: output of load_exotic_payoffs}
+            program_numbers: Program number per runner_id
+            model: Ordering model, 'harville' or 'henery'
+            chunk_races: Races per probability chunk
+        """
+        self.payoffs = payoffs
+        self.model = model
+        self.chunk_races = chunk_races
+
+        race_ids = test_df['race_id'].to_numpy()
+        odds = test_df['ml_odds_decimal'].to_numpy(dtype=np.float64)
+        market = np.where(odds > 0, 1.0 / (odds + 1.0), 0.0)
+
+        self.model_matrix, self.race_ids, race_row, slot = field_matrix(
+            race_ids, np.asarray(win_probabilities, dtype=np.float64)
+        )
+        self.market_matrix, _, _, _ = field_matrix(race_ids, np.nan_to_num(market))
+
+        runner_numbers = program_numbers.reindex(test_df['runner_id'].to_numpy()).to_numpy()
+        self.slots = pd.DataFrame({
+            'race_row': race_row,
+            'program_number': runner_numbers,
+            'slot': slot,
+        }).dropna(subset=['program_number'])
+
+        logger.info(f"Exotic backtest over {len(self.race_ids)} races "
+                    f"(max field {self.model_matrix.shape[1]}, {model} ordering)")
+
+    def payoff_races(self, wager: str) -> np.ndarray:
+        """
+        Race rows with a stored payoff for the wager (the races to bet).
+
+        Returns:
+            Sorted race_row indices
+        """
+        payoffs = self.payoffs.get(wager, pd.DataFrame())
+        if payoffs.empty:
+            return np.empty(0, dtype=np.int64)
+
+        race_rows = pd.Series(np.arange(len(self.race_ids)), index=self.race_ids)
+        race_ids = payoffs['race_id'][payoffs['race_id'].isin(race_rows.index)]
+        return np.unique(race_rows.reindex(race_ids).to_numpy()).astype(np.int64)
+
+    def winning_combinations(self, wager: str) -> pd.DataFrame:
+        """
+        Winning slot combination and payoff per $1 for each race whose
+        winning numbers all map to modeled runners.
+
+        Returns:
+            DataFrame with race_row, combination (flat index into the
+            N^k ordering array) and payoff_per_dollar
+        """
+        n_positions = WAGER_POSITIONS[wager]
+        n_slots = self.model_matrix.shape[1]
+
+        payoffs = self.payoffs.get(wager, pd.DataFrame())
+        if payoffs.empty:
+            return pd.DataFrame(columns=['race_row', 'combination', 'payoff_per_dollar'])
+
+        race_rows = pd.Series(np.arange(len(self.race_ids)), index=self.race_ids)
+        payoffs = payoffs[payoffs['race_id'].isin(race_rows.index)].copy()
+        payoffs['race_row'] = race_rows.reindex(payoffs['race_id']).to_numpy()
+        payoffs['payoff_per_dollar'] = payoffs['payoff_amount'] / payoffs['base_amount'].fillna(2.0)
+
+        # One row per (payoff, finishing position) -> slot of that program number
+        payoffs['numbers'] = payoffs['winning_numbers'].map(parse_winning_numbers)
+        payoffs = payoffs[payoffs['numbers'].str.len() == n_positions].reset_index(drop=True)
+        legs = payoffs[['race_row', 'numbers']].explode('numbers').rename(columns={'numbers': 'program_number'})
+        legs['payoff'] = legs.index
+        legs['position'] = legs.groupby('payoff').cumcount()
+        legs = legs.merge(self.slots, on=['race_row', 'program_number'], how='left')
+
+        # Every leg must resolve to a modeled runner
+        mapped = legs.groupby('payoff')['slot'].count() == n_positions
+        legs = legs[legs['payoff'].isin(mapped.index[mapped])]
+
+        weights = n_slots ** (n_positions - 1 - legs['position'].to_numpy())
+        legs = legs.assign(flat=legs['slot'].to_numpy().astype(np.int64) * weights)
+        combination = legs.groupby('payoff')['flat'].sum()
+
+        winners = payoffs.loc[combination.index, ['race_row', 'payoff_per_dollar']]
+        winners['combination'] = combination.to_numpy()
+
+        skipped = len(self.payoffs[wager]) - len(winners)
+        if skipped:
+            logger.info(f"  {skipped} {wager} payoffs could not be mapped to modeled runners "
+                        f"(their races settle as losses)")
+
+        return winners.reset_index(drop=True)
+
+    def run(self, strategy: ExoticStrategy) -> pd.DataFrame:
+        """
+        Simulate one exotic strategy.
+
+        Args:
+            strategy: Exotic strategy
+
+        Returns:
+            One row per bet with the columns PerformanceAnalyzer expects
+            (empty if no bets placed)
+        """
+        winners = self.winning_combinations(strategy.wager)
+        settleable = self.payoff_races(strategy.wager)
+        n_slots = self.model_matrix.shape[1]
+
+        bets = []
+        for start in range(0, len(settleable), self.chunk_races):
+            rows = settleable[start:start + self.chunk_races]
+
+            model_probs = ordering_probabilities(self.model_matrix[rows], strategy.wager, self.model)
+            market_probs = ordering_probabilities(self.market_matrix[rows], strategy.wager, self.model)
+            model_probs = model_probs.reshape(len(rows), -1)
+            market_probs = market_probs.reshape(len(rows), -1)
+
+            chunk_row, combination = np.nonzero(strategy.select(model_probs, market_probs))
+            probability = model_probs[chunk_row, combination]
+            market = market_probs[chunk_row, combination]
+
+            bets.append(pd.DataFrame({
+                'race_row': rows[chunk_row],
+                'combination': combination,
+                'win_probability': probability,
+                'odds_decimal': np.where(market > 0, 1.0 / market - 1.0, np.nan),
+            }))
+
+        if not bets or not sum(len(b) for b in bets):
+            logger.warning(f"No bets placed for {strategy.name}")
+            return pd.DataFrame()
+
+        results_df = pd.concat(bets, ignore_index=True)
+        results_df = results_df.merge(
+            winners[['race_row', 'combination', 'payoff_per_dollar']].drop_duplicates(
+                subset=['race_row', 'combination']
+            ),
+            on=['race_row', 'combination'],
+            how='left'
+        )
+
+        # Settle in race order, most likely combination first
+        results_df.sort_values(['race_row', 'win_probability'], ascending=[True, False],
+                               inplace=True, ignore_index=True)
+
+        bet_amount = float(strategy.bet_amount)
+        results_df['race_id'] = self.race_ids[results_df['race_row'].to_numpy()]
+        results_df['combination'] = self._format_combinations(
+            results_df['combination'].to_numpy(), n_slots, strategy.wager, results_df['race_row'].to_numpy()
+        )
+        results_df['actual_win'] = results_df['payoff_per_dollar'].notna().astype(np.int64)
+        results_df['bet_amount'] = bet_amount
+        results_df['return_amount'] = results_df['payoff_per_dollar'].fillna(0.0) * bet_amount
+        results_df['profit'] = results_df['return_amount'] - bet_amount
+        results_df['bankroll'] = strategy.initial_bankroll + results_df['profit'].cumsum()
+        results_df['cumulative_profit'] = results_df['profit'].cumsum()
+        results_df['cumulative_bets'] = results_df['bet_amount'].cumsum()
+        results_df['running_roi'] = results_df['cumulative_profit'] / results_df['cumulative_bets'] * 100
+
+        logger.info(f"✓ {strategy.name}: {len(results_df)} bets over "
+                    f"{results_df['race_id'].nunique()} races, {results_df['actual_win'].sum()} hits")
+
+        return results_df.drop(columns=['race_row', 'payoff_per_dollar'])
+
+    def _format_combinations(
+            self,
+            combinations: np.ndarray,
+            n_slots: int,
+            wager: str,
+            race_rows: np.ndarray
+    ) -> np.ndarray:
+        """Program numbers of each bet, e.g. '4-1-7'."""
+        slot_numbers = self.slots.set_index(['race_row', 'slot'])['program_number']
+        positions = np.unravel_index(combinations, (n_slots,) * WAGER_POSITIONS[wager])
+
+        legs = [
+            slot_numbers.reindex(pd.MultiIndex.from_arrays([race_rows, position])).fillna('?').to_numpy()
+            for position in positions
+        ]
+        return np.array(['-'.join(leg) for leg in zip(*legs)], dtype=object)
+
+    def run_strategies(self, strategies: List[ExoticStrategy]) -> Dict[str, pd.DataFrame]:
+        """Simulate several exotic strategies ({name: results DataFrame})."""
+        return {strategy.name: self.run(strategy) for strategy in strategies}
+
+
+def main():
+    """Main entry point."""
+    from src.db.session import get_db_context
+    from src.utils.logger import setup_logging
+
+    parser = argparse.ArgumentParser(description="Backtest exacta/trifecta strategies against stored payoffs")
+    parser.add_argument("--data", type=str, default="data/processed/features_complete.csv", help="Feature CSV")
+    parser.add_argument("--model", type=str, help="Model pickle (default: registry's active random_forest)")
+    parser.add_argument("--ordering", type=str, default="harville", choices=["harville", "henery"],
+                        help="Finishing-order model")
+    parser.add_argument("--wagers", nargs="+", default=["exacta", "trifecta"], choices=list(WAGER_POSITIONS))
+    parser.add_argument("--min-edge", type=float, nargs="+", default=[0.0, 0.2, 0.5],
+                        help="Edge thresholds to test")
+    parser.add_argument("--max-combinations", type=int, default=6, help="Combinations per race")
+    parser.add_argument("--bet-amount", type=float, default=2.0, help="Stake per combination")
+
+    args = parser.parse_args()
+    setup_logging("exotics_backtest")
+
+    model_path = Path(args.model) if args.model else resolve_model_path(
+        'random_forest', fallback=Path("models/tuned/random_forest_tuned.pkl")
+    )
+
+    backtester = Backtester(model_path=model_path, data_path=Path(args.data), cache=ArtifactCache())
+    test_df = backtester.test_df
+    race_ids = test_df['race_id'].unique()
+
+    with get_db_context() as db:
+        payoffs = {wager: load_exotic_payoffs(db, race_ids, wager) for wager in args.wagers}
+        program_numbers = load_program_numbers(db, test_df['runner_id'].unique())
+
+    exotic_backtester = ExoticBacktester(
+        test_df,
+        backtester.get_win_probabilities(),
+        payoffs,
+        program_numbers,
+        model=args.ordering
+    )
+
+    strategies = [
+        ExoticStrategy(
+            wager=wager,
+            bet_amount=args.bet_amount,
+            min_edge=min_edge,
+            max_combinations=args.max_combinations
+        )
+        for wager in args.wagers
+        for min_edge in args.min_edge
+    ]
+    strategy_results = exotic_backtester.run_strategies(strategies)
+
+    analyzer = PerformanceAnalyzer()
+    results = {name: df for name, df in strategy_results.items() if not df.empty}
+    bankrolls = {strategy.name: strategy.initial_bankroll for strategy in strategies}
+    metrics_df = analyzer.calculate_metrics_batch(results, bankrolls)
+
+    output_dir = Path("data/backtesting")
+    output_dir.mkdir(exist_ok=True, parents=True)
+
+    if not metrics_df.empty:
+        comparison_df = analyzer.compare_strategies(metrics_df.to_dict(orient='index'))
+        comparison_df.to_csv(output_dir / "exotics_comparison.csv")
+
+    for name, results_df in results.items():
+        safe_name = re.sub(r'[^a-z0-9]+', '_', name.lower()).strip('_')
+        results_df.to_csv(output_dir / f"exotics_{safe_name}.csv", index=False)
+
+    print("\n✓ Exotics backtest complete!")
+    print(f"  Results saved to: {output_dir}/")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+"""Monte Carlo bankroll simulation by block bootstrap over race days."""
+import argparse
+from pathlib import Path
+from typing import Dict
+import numpy as np
+import pandas as pd
+import logging
+
+from src.backtesting.backtester import Backtester
+from src.backtesting.betting_strategies import (
+    FlatBettingStrategy,
+    KellyCriterionStrategy,
+    ValueBettingStrategy,
+    ConfidenceBettingStrategy
+)
+from src.ml.artifact_cache import ArtifactCache
+from src.ml.model_registry import resolve_model_path
+
+logger = logging.getLogger(__name__)
+
+MONTE_CARLO_OUTPUT_PATH = Path("data/backtesting/monte_carlo_summary.csv")
+
+# Upper bound on the (paths x bets) matrices held at once
+MAX_CHUNK_BYTES = 256 * 1024 ** 2
+
+
+def day_blocks(results_df: pd.DataFrame, block_col: str = 'race_date') -> tuple:
+    """
+    Contiguous blocks of bets belonging to the same day.
+
+    Blocks are calendar days, so several tracks racing on one date are
+    resampled together; that keeps within-day dependence (one day's
+    bankroll swings, shared weather) intact.
+
+    Args:
+        results_df: Backtest results in settlement order
+        block_col: Column identifying the day (falls back to meet_id, then race_id)
+
+    Returns:
+        Tuple of (block start offsets, block lengths)
+    """
+    for fallback in ('meet_id', 'race_id'):
+        if block_col in results_df.columns:
+            break
+        logger.warning(f"No '{block_col}' column - resampling by {fallback} instead")
+        block_col = fallback
+
+    keys = results_df[block_col].to_numpy()
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    lengths = np.diff(np.r_[starts, len(keys)])
+    return starts, lengths
+
+
+def bootstrap_bet_indices(
+        starts: np.ndarray,
+        lengths: np.ndarray,
+        sampled: np.ndarray,
+        pad_index: int
+) -> tuple:
+    """
+    Bet indices of resampled paths, padded into a rectangle.
+
+    Built as one flat cumulative sum: +1 steps within a block and a jump
+    at each block boundary. Each path ends with a padding segment
+    counting up from pad_index, so callers append enough zeros
+    (len(starts) * lengths.max() covers any path) to keep it flat.
+
+    Args:
+        starts: Block start offsets
+        lengths: Block lengths
+        sampled: Block numbers drawn per path, shape (n_paths, n_blocks)
+        pad_index: First index past the real bets
+
+    Returns:
+        Tuple of (indices of shape (n_paths, longest path), bets per path)
+    """
+    n_paths = len(sampled)
+    path_lengths = lengths[sampled]
+    totals = path_lengths.sum(axis=1)
+    width = int(totals.max())
+
+    segment_lengths = np.column_stack([path_lengths, width - totals]).ravel()
+    segment_starts = np.column_stack([
+        starts[sampled], np.full(n_paths, pad_index)
+    ]).ravel()
+
+    # Empty padding segments would collide with the next path's first block
+    nonempty = segment_lengths > 0
+    segment_lengths = segment_lengths[nonempty]
+    segment_starts = segment_starts[nonempty]
+
+    offsets = np.cumsum(segment_lengths) - segment_lengths
+    ends = segment_starts + segment_lengths - 1
+
+    indices = np.ones(n_paths * width, dtype=np.int64)
+    indices[0] = segment_starts[0]
+    indices[offsets[1:]] = segment_starts[1:] - ends[:-1]
+    np.cumsum(indices, out=indices)
+
+    return indices.reshape(n_paths, width), totals
+
+
+class MonteCarloSimulator:
+    """
+    Resample a backtest's days and re-simulate the bankroll.
+
+    Each path draws as many days as the backtest covered, with
+    replacement, and replays their bets in the drawn order. Paths are
+    simulated together as (paths x bets) arrays, a chunk of paths at a
+    time so memory stays within max_chunk_bytes.
+
+    Flat-staking strategies replay their dollar profits; a path stops
+    betting (and stays flat) once its bankroll can no longer cover the
+    next stake or has fallen to the ruin level, so it never bets below
+    zero. Bankroll-sized strategies (Kelly) replay each bet's profit as a
+    fraction of the bankroll it was sized from, so stakes compound along
+    the new path.
+    """
+
+    def __init__(
+            self,
+            n_paths: int = 10000,
+            ruin_fraction: float = 0.0,
+            block_col: str = 'race_date',
+            max_chunk_bytes: int = MAX_CHUNK_BYTES,
+            random_state: int = 42
+    ):
+        """
+        Initialize simulator.
+
+        Args:
+            n_paths: Bootstrap paths per strategy
+            ruin_fraction: A path is ruined once the bankroll falls to this
+                fraction of the starting bankroll (0.0 = busted)
+            block_col: Column identifying a day of bets (see day_blocks)
+            max_chunk_bytes: Memory bound for one chunk of paths
+            random_state: Random seed
+        """
+        self.n_paths = n_paths
+        self.ruin_fraction = ruin_fraction
+        self.block_col = block_col
+        self.max_chunk_bytes = max_chunk_bytes
+        self.random_state = random_state
+
+    def simulate(
+            self,
+            results_df: pd.DataFrame,
+            initial_bankroll: float = 1000.0,
+            compounding: bool = False
+    ) -> Dict[str, np.ndarray]:
+        """
+        Simulate bootstrap bankroll paths.
+
+        Args:
+            results_df: Backtest results (one row per bet, settlement order)
+            initial_bankroll: Starting bankroll
+            compounding: Replay returns relative to the bankroll
+                (for bankroll-dependent strategies)
+
+        Returns:
+            Dictionary of per-path arrays: roi, final_bankroll,
+            max_drawdown, ruined, n_bets
+        """
+        rng = np.random.default_rng(self.random_state)
+        starts, lengths = day_blocks(results_df, self.block_col)
+
+        stake = results_df['bet_amount'].to_numpy(dtype=np.float64)
+        profit = results_df['profit'].to_numpy(dtype=np.float64)
+
+        if compounding:
+            bankroll_before = results_df['bankroll'].to_numpy(dtype=np.float64) - profit
+            stake = stake / bankroll_before
+            profit = profit / bankroll_before
+
+        # Padding after a path's last bet indexes trailing zeros, so it
+        # leaves the path flat
+        pad_index = len(profit)
+        padding = np.zeros(len(starts) * int(lengths.max()))
+        stake = np.concatenate([stake, padding])
+        profit = np.concatenate([profit, padding])
+
+        # Index, path, stake and pre-bet bankroll matrices are alive at once
+        # (plus slack for paths longer than the backtest)
+        chunk_paths = max(1, int(self.max_chunk_bytes // (pad_index * 8 * 5)))
+        ruin_level = self.ruin_fraction * initial_bankroll
+
+        out = {
+            'roi': np.empty(self.n_paths),
+            'final_bankroll': np.empty(self.n_paths),
+            'max_drawdown': np.empty(self.n_paths),
+            'ruined': np.empty(self.n_paths, dtype=bool),
+            'n_bets': np.empty(self.n_paths, dtype=np.int64),
+        }
+
+        for first in range(0, self.n_paths, chunk_paths):
+            chunk = slice(first, min(first + chunk_paths, self.n_paths))
+            n = chunk.stop - chunk.start
+
+            sampled = rng.integers(0, len(starts), size=(n, len(starts)))
+            indices, n_bets = bootstrap_bet_indices(starts, lengths, sampled, pad_index)
+
+            if compounding:
+                paths = np.log1p(profit)[indices]
+                np.cumsum(paths, axis=1, out=paths)
+                np.exp(paths, out=paths)
+                paths *= initial_bankroll
+
+                # Stake fractions apply to the bankroll before each bet
+                before = np.roll(paths, 1, axis=1)
+                before[:, 0] = initial_bankroll
+                before *= stake[indices]
+                wagered = before.sum(axis=1)
+                del before
+                total_profit = paths[:, -1] - initial_bankroll
+                stopped = np.zeros(n, dtype=bool)
+            else:
+                bets = stake[indices]
+                paths = profit[indices]
+                np.cumsum(paths, axis=1, out=paths)
+                paths += initial_bankroll
+
+                # Up to a path's first stop the free-running bankroll is
+                # the real one, so the stop can be found without a loop
+                before = np.roll(paths, 1, axis=1)
+                before[:, 0] = initial_bankroll
+                stop = (before < bets) | (before <= ruin_level)
+                stopped = stop.any(axis=1)
+                first_stop = np.where(stopped, stop.argmax(axis=1), paths.shape[1])
+                del stop
+
+                placed = np.arange(paths.shape[1]) < first_stop[:, None]
+                bets *= placed
+                wagered = bets.sum(axis=1)
+                del bets
+
+                # Stopped paths stay at the bankroll they stopped with
+                frozen = before[np.arange(n), np.minimum(first_stop, paths.shape[1] - 1)]
+                np.copyto(paths, frozen[:, None], where=~placed)
+                del before, placed
+
+                total_profit = paths[:, -1] - initial_bankroll
+                n_bets = np.minimum(n_bets, first_stop)
+            del indices
+
+            out['roi'][chunk] = np.divide(
+                total_profit, wagered, out=np.zeros(n), where=wagered > 0
+            ) * 100
+            out['final_bankroll'][chunk] = paths[:, -1]
+            out['ruined'][chunk] = stopped | (paths.min(axis=1) <= ruin_level)
+            out['n_bets'][chunk] = n_bets
+
+            # Drawdown relative to the running peak, computed in place
+            peak = np.maximum.accumulate(paths, axis=1)
+            np.divide(paths, peak, out=paths)
+            out['max_drawdown'][chunk] = (1.0 - paths.min(axis=1)) * 100
+
+        return out
+
+    def summarize(
+            self,
+            simulations: Dict[str, np.ndarray],
+            initial_bankroll: float = 1000.0,
+            confidence: float = 0.95
+    ) -> Dict[str, float]:
+        """
+        Distribution summary of simulated paths.
+
+        Args:
+            simulations: Output of simulate
+            initial_bankroll: Starting bankroll
+            confidence: Two-sided interval width for ROI and drawdown
+
+        Returns:
+            Dictionary of metrics: means, medians, confidence bounds,
+            risk of ruin and probability of a loss
+        """
+        tail = (1 - confidence) / 2 * 100
+        bounds = [tail, 50, 100 - tail]
+
+        roi_low, roi_median, roi_high = np.percentile(simulations['roi'], bounds)
+        dd_low, dd_median, dd_high = np.percentile(simulations['max_drawdown'], bounds)
+
+        return {
+            'roi_mean': float(simulations['roi'].mean()),
+            'roi_median': float(roi_median),
+            'roi_ci_low': float(roi_low),
+            'roi_ci_high': float(roi_high),
+            'max_drawdown_median': float(dd_median),
+            'max_drawdown_ci_low': float(dd_low),
+            'max_drawdown_ci_high': float(dd_high),
+            'final_bankroll_median': float(np.median(simulations['final_bankroll'])),
+            'risk_of_ruin': float(simulations['ruined'].mean() * 100),
+            'prob_loss': float((simulations['final_bankroll'] < initial_bankroll).mean() * 100),
+        }
+
+
+def print_summary(summary_df: pd.DataFrame, n_paths: int, confidence: float):
+    """Print distribution summaries per strategy."""
+    print("\n" + "=" * 80)
+    print(f"MONTE CARLO ({n_paths} block-bootstrap paths, {confidence:.0%} intervals)")
+    print("=" * 80)
+
+    for strategy_name, row in summary_df.iterrows():
+        print(f"\n📊 {strategy_name}")
+        print(f"  ROI:               {row['roi_median']:+.2f}% "
+              f"[{row['roi_ci_low']:+.2f}%, {row['roi_ci_high']:+.2f}%]")
+        print(f"  Max drawdown:      {row['max_drawdown_median']:.2f}% "
+              f"[{row['max_drawdown_ci_low']:.2f}%, {row['max_drawdown_ci_high']:.2f}%]")
+        print(f"  Final bankroll:    ${row['final_bankroll_median']:.2f} (median)")
+        print(f"  Risk of ruin:      {row['risk_of_ruin']:.2f}%")
+        print(f"  P(loss):           {row['prob_loss']:.2f}%")
+
+    print("=" * 80)
+
+
+def main():
+    """Main entry point."""
+    from src.utils.logger import setup_logging
+
+    parser = argparse.ArgumentParser(description="Monte Carlo bankroll simulation for backtest strategies")
+    parser.add_argument("--data", type=str, default="data/processed/features_complete.csv", help="Feature CSV")
+    parser.add_argument("--model", type=str, help="Model pickle (default: registry's active random_forest)")
+    parser.add_argument("--paths", type=int, default=10000, help="Bootstrap paths per strategy")
+    parser.add_argument("--confidence", type=float, default=0.95, help="Interval width")
+    parser.add_argument("--ruin-fraction", type=float, default=0.0,
+                        help="Ruin when the bankroll falls to this fraction of the start")
+    parser.add_argument("--bankroll", type=float, default=1000.0, help="Starting bankroll")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--output", type=str, default=str(MONTE_CARLO_OUTPUT_PATH), help="Summary CSV")
+
+    args = parser.parse_args()
+    setup_logging("monte_carlo")
+
+    model_path = Path(args.model) if args.model else resolve_model_path(
+        'random_forest', fallback=Path("models/tuned/random_forest_tuned.pkl")
+    )
+
+    strategies = [
+        FlatBettingStrategy(bet_amount=2.0, bankroll=args.bankroll),
+        KellyCriterionStrategy(fraction=0.25, bankroll=args.bankroll),
+        ValueBettingStrategy(min_edge=0.05, bet_amount=2.0, bankroll=args.bankroll),
+        ConfidenceBettingStrategy(min_probability=0.30, bankroll=args.bankroll)
+    ]
+
+    backtester = Backtester(
+        model_path=model_path,
+        data_path=Path(args.data),
+        min_odds=1.0,
+        max_odds=50.0,
+        cache=ArtifactCache()
+    )
+    strategy_results = backtester.run_strategies(strategies)
+
+    simulator = MonteCarloSimulator(
+        n_paths=args.paths,
+        ruin_fraction=args.ruin_fraction,
+        random_state=args.seed
+    )
+
+    summaries: Dict[str, dict] = {}
+    for strategy in strategies:
+        results_df = strategy_results[strategy.name]
+        if results_df.empty:
+            logger.warning(f"No bets placed for {strategy.name}")
+            continue
+
+        simulations = simulator.simulate(
+            results_df,
+            initial_bankroll=strategy.initial_bankroll,
+            compounding=strategy.bankroll_dependent
+        )
+        summaries[strategy.name] = simulator.summarize(
+            simulations, strategy.initial_bankroll, confidence=args.confidence
+        )
+
+    summary_df = pd.DataFrame(summaries).T
+    print_summary(summary_df, args.paths, args.confidence)
+
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    summary_df.to_csv(output_path)
+    print(f"\n✓ Saved summary to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,7 @@
 """Performance metrics for backtesting."""
+import json
+import math
+from pathlib import Path
 import pandas as pd
 import numpy as np
 from typing import Dict
@@ -6,9 +9,149 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Sharpe annualization (assuming ~10 bets per day)
+ANNUALIZATION = np.sqrt(252 * 10)
+
+
+def max_drawdown(bankroll: np.ndarray) -> float:
+    """
+    Largest peak-to-trough decline in bankroll, in percent.
+
+    Args:
+        bankroll: Bankroll after each bet
+
+    Returns:
+        Max drawdown (0 if the bankroll never falls below a previous peak)
+    """
+    bankroll = np.asarray(bankroll, dtype=np.float64)
+    if not len(bankroll):
+        return 0.0
+
+    peak = np.maximum.accumulate(bankroll)
+    return float(max(((peak - bankroll) / peak).max(), 0.0) * 100)
+
+
+def _segment_max_streak(flags: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """Longest run of consecutive True values in each segment of a concatenated flag array."""
+    n = len(flags)
+    result = np.zeros(len(starts), dtype=np.int64)
+    if not n:
+        return result
+
+    # Run starts: flag flips and segment starts
+    boundary = np.zeros(n, dtype=bool)
+    boundary[0] = True
+    boundary[1:] = flags[1:] != flags[:-1]
+    boundary[starts[starts < n]] = True
+
+    run_starts = np.flatnonzero(boundary)
+    run_lengths = np.diff(np.r_[run_starts, n])
+    run_segments = np.searchsorted(starts, run_starts, side='right') - 1
+
+    true_runs = flags[run_starts]
+    np.maximum.at(result, run_segments[true_runs], run_lengths[true_runs])
+    return result
+
+
+def _segment_metrics(
+        columns: Dict[str, np.ndarray],
+        starts: np.ndarray,
+        initial_bankroll: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """
+    All metrics for consecutive segments of concatenated result arrays.
+
+    Args:
+        columns: Concatenated bet_amount, profit, return_amount,
+            actual_win, odds_decimal, win_probability and bankroll
+        starts: Offset of each (non-empty) segment
+        initial_bankroll: Starting bankroll per segment
+
+    Returns:
+        Dictionary of {metric: array with one value per segment}
+    """
+    bet_amount = columns['bet_amount']
+    profit = columns['profit']
+    bankroll = columns['bankroll']
+    actual_win = columns['actual_win']
+
+    n_bets = np.diff(np.r_[starts, len(profit)])
+    segment = np.repeat(np.arange(len(starts)), n_bets)
+
+    def total(values):
+        return np.add.reduceat(values, starts)
+
+    m = {}
+
+    # Basic stats
+    m['total_bets'] = n_bets
+    m['total_wagered'] = total(bet_amount)
+    m['total_profit'] = total(profit)
+    m['total_returned'] = total(columns['return_amount'])
+
+    # Win stats
+    wins = actual_win == 1
+    m['winning_bets'] = total(wins.astype(np.int64))
+    m['losing_bets'] = n_bets - m['winning_bets']
+    m['win_rate'] = m['winning_bets'] / n_bets * 100
+
+    # ROI
+    m['roi'] = m['total_profit'] / m['total_wagered'] * 100
+
+    # Bankroll
+    m['final_bankroll'] = initial_bankroll + m['total_profit']
+    m['bankroll_growth'] = (m['final_bankroll'] - initial_bankroll) / initial_bankroll * 100
+
+    # Average metrics
+    m['avg_bet'] = m['total_wagered'] / n_bets
+    m['avg_odds'] = total(columns['odds_decimal']) / n_bets
+    m['avg_win_probability'] = total(columns['win_probability']) / n_bets
+
+    # Max drawdown: running peak within each segment
+    if len(starts) == 1:
+        peak = np.maximum.accumulate(bankroll)
+    else:
+        peak = pd.Series(bankroll).groupby(segment).cummax().to_numpy()
+    drawdown = np.maximum.reduceat((peak - bankroll) / peak, starts)
+    m['max_drawdown'] = np.maximum(drawdown, 0.0) * 100
+
+    # Sharpe ratio (population std, as np.std)
+    mean = m['total_profit'] / n_bets
+    std = np.sqrt(total((profit - mean[segment]) ** 2) / n_bets)
+    valid = (n_bets >= 2) & (std > 0)
+    m['sharpe_ratio'] = np.divide(
+        mean, std, out=np.zeros(len(starts)), where=valid
+    ) * ANNUALIZATION
+
+    # Profit factor: gross profit / gross loss
+    gross_profit = total(np.where(profit > 0, profit, 0.0))
+    gross_loss = -total(np.where(profit < 0, profit, 0.0))
+    m['profit_factor'] = np.divide(
+        gross_profit, gross_loss, out=np.full(len(starts), np.inf), where=gross_loss != 0
+    )
+
+    # Streak analysis
+    m['max_win_streak'] = _segment_max_streak(wins, starts)
+    m['max_loss_streak'] = _segment_max_streak(actual_win == 0, starts)
+
+    return m
+
+
+METRIC_COLUMNS = [
+    'bet_amount', 'profit', 'return_amount', 'actual_win',
+    'odds_decimal', 'win_probability', 'bankroll'
+]
+
 
 class PerformanceAnalyzer:
-    """Calculate comprehensive backtesting performance metrics."""
+    """
+    Calculate comprehensive backtesting performance metrics.
+
+    Metrics are computed with NumPy reductions (running max for
+    drawdown, run-length encoding for streaks) and nothing is printed;
+    call print_metrics to report them. calculate_metrics_batch scores
+    many result sets in one pass.
+    """
 
     def calculate_metrics(
             self,
@@ -22,136 +165,64 @@ class PerformanceAnalyzer:
         Args:
             results_df: DataFrame from backtester
             initial_bankroll: Starting bankroll
-            strategy_name: Name of strategy
+            strategy_name: Name of strategy (used in log messages)
 
         Returns:
             Dictionary of metrics
         """
         if results_df.empty:
-            logger.warning("No results to analyze")
+            logger.warning(f"No results to analyze for {strategy_name}")
             return {}
 
-        metrics = {}
-
-        # Basic stats
-        metrics['total_bets'] = len(results_df)
-        metrics['total_wagered'] = results_df['bet_amount'].sum()
-        metrics['total_profit'] = results_df['profit'].sum()
-        metrics['total_returned'] = results_df['return_amount'].sum()
-
-        # Win stats
-        wins = results_df[results_df['actual_win'] == 1]
-        metrics['winning_bets'] = len(wins)
-        metrics['losing_bets'] = len(results_df) - len(wins)
-        metrics['win_rate'] = len(wins) / len(results_df) * 100
-
-        # ROI
-        metrics['roi'] = (metrics['total_profit'] / metrics['total_wagered'] * 100)
-
-        # Bankroll
-        metrics['final_bankroll'] = initial_bankroll + metrics['total_profit']
-        metrics['bankroll_growth'] = (
-                (metrics['final_bankroll'] - initial_bankroll) / initial_bankroll * 100
-        )
-
-        # Average metrics
-        metrics['avg_bet'] = results_df['bet_amount'].mean()
-        metrics['avg_odds'] = results_df['odds_decimal'].mean()
-        metrics['avg_win_probability'] = results_df['win_probability'].mean()
-
-        # Risk metrics
-        metrics['max_drawdown'] = self._calculate_max_drawdown(results_df)
-        metrics['sharpe_ratio'] = self._calculate_sharpe_ratio(results_df)
-        metrics['profit_factor'] = self._calculate_profit_factor(results_df)
-
-        # Streak analysis
-        metrics['max_win_streak'] = self._calculate_max_streak(results_df, win=True)
-        metrics['max_loss_streak'] = self._calculate_max_streak(results_df, win=False)
-
-        self._print_metrics(metrics, strategy_name)
-
-        return metrics
-
-    def _calculate_max_drawdown(self, results_df: pd.DataFrame) -> float:
-        """
-        Calculate maximum drawdown.
-
-        Max drawdown = largest peak-to-trough decline in bankroll.
-        Lower is better.
-        """
-        bankroll = results_df['bankroll'].values
-
-        peak = bankroll[0]
-        max_drawdown = 0.0
-
-        for value in bankroll:
-            if value > peak:
-                peak = value
-            drawdown = (peak - value) / peak * 100
-            max_drawdown = max(max_drawdown, drawdown)
+        columns = {
+            col: results_df[col].to_numpy(dtype=np.float64) for col in METRIC_COLUMNS
+        }
+        metrics = _segment_metrics(columns, np.array([0]), np.array([float(initial_bankroll)]))
 
-        return max_drawdown
+        return {name: values[0].item() for name, values in metrics.items()}
 
-    def _calculate_sharpe_ratio(
+    def calculate_metrics_batch(
             self,
-            results_df: pd.DataFrame,
-            risk_free_rate: float = 0.02
-    ) -> float:
-        """
-        Calculate Sharpe ratio (risk-adjusted returns).
-
-        Higher is better. > 1.0 is good, > 2.0 is excellent.
+            results: Dict[str, pd.DataFrame],
+            initial_bankroll=1000.0
+    ) -> pd.DataFrame:
         """
-        profits = results_df['profit'].values
-
-        if len(profits) < 2:
-            return 0.0
-
-        mean_return = np.mean(profits)
-        std_return = np.std(profits)
-
-        if std_return == 0:
-            return 0.0
+        Calculate metrics for many result sets at once.
 
-        # Annualized (assuming ~10 bets per day)
-        sharpe = (mean_return / std_return) * np.sqrt(252 * 10)
+        The sets are concatenated and every metric is a segmented
+        reduction over the combined arrays, so the cost is one pass over
+        all bets rather than one Python call per set.
 
-        return sharpe
-
-    def _calculate_profit_factor(self, results_df: pd.DataFrame) -> float:
-        """
-        Calculate profit factor.
+        Args:
+            results: Dictionary of {name: results DataFrame}
+            initial_bankroll: Starting bankroll, shared or {name: bankroll}
 
-        Profit factor = gross profit / gross loss.
-        > 1.0 means profitable. > 1.5 is good.
+        Returns:
+            DataFrame with one row of metrics per non-empty result set
         """
-        gross_profit = results_df[results_df['profit'] > 0]['profit'].sum()
-        gross_loss = abs(results_df[results_df['profit'] < 0]['profit'].sum())
-
-        if gross_loss == 0:
-            return float('inf')
-
-        return gross_profit / gross_loss
-
-    def _calculate_max_streak(
-            self,
-            results_df: pd.DataFrame,
-            win: bool = True
-    ) -> int:
-        """Calculate maximum winning or losing streak."""
-        streak = 0
-        max_streak = 0
-
-        for actual_win in results_df['actual_win']:
-            if (win and actual_win == 1) or (not win and actual_win == 0):
-                streak += 1
-                max_streak = max(max_streak, streak)
-            else:
-                streak = 0
+        names = [name for name, df in results.items() if not df.empty]
+        skipped = len(results) - len(names)
+        if skipped:
+            logger.warning(f"Skipping {skipped} result sets with no bets")
+        if not names:
+            return pd.DataFrame()
+
+        lengths = np.array([len(results[name]) for name in names])
+        starts = np.cumsum(lengths) - lengths
+
+        columns = {
+            col: np.concatenate([results[name][col].to_numpy(dtype=np.float64) for name in names])
+            for col in METRIC_COLUMNS
+        }
+
+        if isinstance(initial_bankroll, dict):
+            bankrolls = np.array([initial_bankroll[name] for name in names], dtype=np.float64)
+        else:
+            bankrolls = np.full(len(names), float(initial_bankroll))
 
-        return max_streak
+        return pd.DataFrame(_segment_metrics(columns, starts, bankrolls), index=names)
 
-    def _print_metrics(self, metrics: Dict[str, float], strategy_name: str):
+    def print_metrics(self, metrics: Dict[str, float], strategy_name: str):
         """Print formatted metrics."""
         print(f"\n{'=' * 80}")
         print(f"PERFORMANCE METRICS: {strategy_name}")
@@ -227,4 +298,201 @@ class PerformanceAnalyzer:
         print(df.to_string())
         print("=" * 80)
 
-        return df
\ No newline at end of file
+        return df
+
+
+class OnlineMetrics:
+    """
+    Incrementally updated performance metrics for live bankroll tracking.
+
+    Each settled bet updates running totals, the bankroll peak and
+    drawdown, Welford mean/variance of profits (for Sharpe) and win/loss
+    streaks in O(1), so metrics after every race cost nothing regardless
+    of history length. metrics() returns the same keys and values as
+    PerformanceAnalyzer.calculate_metrics over the same bets.
+
+    snapshot() / restore() (and save / load) round-trip the full state
+    as a small JSON-serializable dict, so a live session can persist
+    after each race and resume exactly where it left off.
+    """
+
+    # State persisted by snapshot (everything update touches)
+    STATE_FIELDS = [
+        'initial_bankroll', 'bankroll', 'peak', 'max_drawdown',
+        'total_bets', 'winning_bets', 'losing_bets',
+        'total_wagered', 'total_returned', 'gross_profit', 'gross_loss',
+        'sum_odds', 'sum_win_probability', 'profit_mean', 'profit_m2',
+        'win_streak', 'loss_streak', 'max_win_streak', 'max_loss_streak',
+    ]
+
+    def __init__(self, initial_bankroll: float = 1000.0):
+        """
+        Initialize accumulator.
+
+        Args:
+            initial_bankroll: Starting bankroll
+        """
+        self.initial_bankroll = float(initial_bankroll)
+        self.bankroll = self.initial_bankroll
+        self.peak = None
+        self.max_drawdown = 0.0
+
+        self.total_bets = 0
+        self.winning_bets = 0
+        self.losing_bets = 0
+        self.total_wagered = 0.0
+        self.total_returned = 0.0
+        self.gross_profit = 0.0
+        self.gross_loss = 0.0
+        self.sum_odds = 0.0
+        self.sum_win_probability = 0.0
+
+        # Welford running mean and sum of squared deviations of profit
+        self.profit_mean = 0.0
+        self.profit_m2 = 0.0
+
+        self.win_streak = 0
+        self.loss_streak = 0
+        self.max_win_streak = 0
+        self.max_loss_streak = 0
+
+    def update(
+            self,
+            bet_amount: float,
+            return_amount: float,
+            actual_win: int,
+            odds_decimal: float = 0.0,
+            win_probability: float = 0.0
+    ):
+        """
+        Record one settled bet.
+
+        Args:
+            bet_amount: Stake
+            return_amount: Amount returned (0 for a loser)
+            actual_win: 1 if the bet won, 0 if it lost
+            odds_decimal: Decimal odds taken
+            win_probability: Model probability at bet time
+        """
+        profit = return_amount - bet_amount
+
+        self.total_bets += 1
+        self.total_wagered += bet_amount
+        self.total_returned += return_amount
+        self.sum_odds += odds_decimal
+        self.sum_win_probability += win_probability
+
+        if profit > 0:
+            self.gross_profit += profit
+        elif profit < 0:
+            self.gross_loss -= profit
+
+        # Welford update
+        delta = profit - self.profit_mean
+        self.profit_mean += delta / self.total_bets
+        self.profit_m2 += delta * (profit - self.profit_mean)
+
+        # Bankroll, peak and drawdown (peak starts at the first settled bet)
+        self.bankroll += profit
+        if self.peak is None or self.bankroll > self.peak:
+            self.peak = self.bankroll
+        self.max_drawdown = max(self.max_drawdown, (self.peak - self.bankroll) / self.peak * 100)
+
+        # Streaks
+        if actual_win == 1:
+            self.winning_bets += 1
+            self.win_streak += 1
+            self.loss_streak = 0
+            self.max_win_streak = max(self.max_win_streak, self.win_streak)
+        else:
+            self.losing_bets += 1
+            self.win_streak = 0
+            if actual_win == 0:
+                self.loss_streak += 1
+                self.max_loss_streak = max(self.max_loss_streak, self.loss_streak)
+            else:
+                self.loss_streak = 0
+
+    def update_from_frame(self, results_df: pd.DataFrame):
+        """Record every bet of a results DataFrame, in order."""
+        for row in results_df[['bet_amount', 'return_amount', 'actual_win',
+                               'odds_decimal', 'win_probability']].itertuples(index=False):
+            self.update(*row)
+
+    @property
+    def current_drawdown(self) -> float:
+        """Decline from the bankroll peak right now, in percent."""
+        if self.peak is None:
+            return 0.0
+        return (self.peak - self.bankroll) / self.peak * 100
+
+    def metrics(self) -> Dict[str, float]:
+        """
+        Current metrics (same keys as PerformanceAnalyzer.calculate_metrics).
+
+        Returns:
+            Dictionary of metrics (empty before the first bet)
+        """
+        n = self.total_bets
+        if n == 0:
+            return {}
+
+        total_profit = self.total_returned - self.total_wagered
+        std = math.sqrt(self.profit_m2 / n)
+
+        return {
+            'total_bets': n,
+            'total_wagered': self.total_wagered,
+            'total_profit': total_profit,
+            'total_returned': self.total_returned,
+            'winning_bets': self.winning_bets,
+            'losing_bets': self.losing_bets,
+            'win_rate': self.winning_bets / n * 100,
+            'roi': total_profit / self.total_wagered * 100 if self.total_wagered else 0.0,
+            'final_bankroll': self.initial_bankroll + total_profit,
+            'bankroll_growth': total_profit / self.initial_bankroll * 100,
+            'avg_bet': self.total_wagered / n,
+            'avg_odds': self.sum_odds / n,
+            'avg_win_probability': self.sum_win_probability / n,
+            'max_drawdown': self.max_drawdown,
+            'sharpe_ratio': self.profit_mean / std * ANNUALIZATION if n >= 2 and std > 0 else 0.0,
+            'profit_factor': self.gross_profit / self.gross_loss if self.gross_loss else float('inf'),
+            'max_win_streak': self.max_win_streak,
+            'max_loss_streak': self.max_loss_streak,
+        }
+
+    def snapshot(self) -> dict:
+        """Full accumulator state as a JSON-serializable dict."""
+        return {field: getattr(self, field) for field in self.STATE_FIELDS}
+
+    @classmethod
+    def restore(cls, state: dict) -> 'OnlineMetrics':
+        """
+        Rebuild an accumulator from a snapshot.
+
+        Args:
+            state: Output of snapshot
+
+        Returns:
+            Accumulator continuing from the snapshot
+        """
+        metrics = cls(state['initial_bankroll'])
+        for field in cls.STATE_FIELDS:
+            setattr(metrics, field, state[field])
+        return metrics
+
+    def save(self, filepath: Path):
+        """Write a snapshot to JSON (atomically, so a crash never leaves half a file)."""
+        filepath = Path(filepath)
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+
+        tmp_path = filepath.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.snapshot(), f, indent=2)
+        tmp_path.replace(filepath)
+
+    @classmethod
+    def load(cls, filepath: Path) -> 'OnlineMetrics':
+        """Resume from a snapshot written by save."""
+        with open(filepath) as f:
+            return cls.restore(json.load(f))
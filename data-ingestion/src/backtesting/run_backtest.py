@@ -10,22 +10,38 @@ from src.backtesting.betting_strategies import (
     ConfidenceBettingStrategy
 )
 from src.backtesting.performance_metrics import PerformanceAnalyzer
+from src.ml.artifact_cache import ArtifactCache
+from src.ml.model_registry import resolve_model_path
 from src.utils.logger import setup_logging
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-def run_complete_backtest():
-    """Run backtest with all strategies."""
+def run_complete_backtest(use_cache: bool = True, n_jobs: int = 1):
+    """
+    Run backtest with all strategies.
+
+    The test split is loaded and scored once; every strategy is then
+    simulated against the same prediction arrays.
+
+    Args:
+        use_cache: Reuse the prepared split and model predictions from
+            earlier runs via data/cache
+        n_jobs: Worker processes for the strategy simulations
+    """
     setup_logging("backtest")
+    cache = ArtifactCache() if use_cache else None
 
     print("\n" + "=" * 80)
     print("🏇 HORSE RACING AI - BACKTESTING ENGINE")
     print("=" * 80)
 
     # Paths
-    model_path = Path("models/tuned/random_forest_tuned.pkl")
+    # Same model as the ML service: the registry's active version if any
+    model_path = resolve_model_path(
+        'random_forest', fallback=Path("models/tuned/random_forest_tuned.pkl")
+    )
     data_path = Path("data/processed/features_complete.csv")
 
     # Check files exist
@@ -45,26 +61,29 @@ def run_complete_backtest():
         ConfidenceBettingStrategy(min_probability=0.30, bankroll=1000.0)
     ]
 
-    # Run backtest for each strategy
+    # Load data and predict once, then simulate every strategy on it
+    backtester = Backtester(
+        model_path=model_path,
+        data_path=data_path,
+        min_odds=1.0,
+        max_odds=50.0,
+        cache=cache
+    )
+    strategy_results = backtester.run_strategies(strategies, n_jobs=n_jobs)
+
     analyzer = PerformanceAnalyzer()
     all_results = {}
     all_metrics = {}
 
+    output_dir = Path("data/backtesting")
+    output_dir.mkdir(exist_ok=True, parents=True)
+
     for strategy in strategies:
         print(f"\n{'=' * 80}")
         print(f"📊 Testing: {strategy.name}")
         print(f"{'=' * 80}")
 
-        backtester = Backtester(
-            model_path=model_path,
-            data_path=data_path,
-            strategy=strategy,
-            min_odds=1.0,
-            max_odds=50.0
-        )
-
-        # Run simulation
-        results_df = backtester.run()
+        results_df = strategy_results[strategy.name]
 
         if results_df.empty:
             print(f"⚠️  No bets placed for {strategy.name}")
@@ -76,14 +95,12 @@ def run_complete_backtest():
             initial_bankroll=strategy.initial_bankroll,
             strategy_name=strategy.name
         )
+        analyzer.print_metrics(metrics, strategy.name)
 
         all_results[strategy.name] = results_df
         all_metrics[strategy.name] = metrics
 
         # Save individual results
-        output_dir = Path("data/backtesting")
-        output_dir.mkdir(exist_ok=True, parents=True)
-
         safe_name = strategy.name.lower().replace(' ', '_')
         results_df.to_csv(
             output_dir / f"backtest_{safe_name}.csv",
@@ -0,0 +1,322 @@
+"""Walk-forward backtesting with periodic retraining."""
+import argparse
+import sys
+from pathlib import Path
+from typing import List, Optional
+import numpy as np
+import joblib
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.preprocessing import StandardScaler
+from imblearn.over_sampling import SMOTE
+import logging
+
+from src.backtesting.backtester import Backtester, attach_race_dates
+from src.backtesting.betting_strategies import (
+    BettingStrategy,
+    FlatBettingStrategy,
+    KellyCriterionStrategy,
+    ValueBettingStrategy,
+    ConfidenceBettingStrategy
+)
+from src.backtesting.performance_metrics import PerformanceAnalyzer
+from src.ml import data_preparation
+from src.ml.artifact_cache import ArtifactCache, code_version, file_fingerprint
+from src.ml.cross_validation import _single_threaded
+from src.ml.data_preparation import DataPreparation
+from src.ml.model_registry import resolve_model_path
+
+logger = logging.getLogger(__name__)
+
+
+def walk_forward_windows(
+        day_keys: np.ndarray,
+        retrain_every: int,
+        min_train_days: int
+) -> List[dict]:
+    """
+    Expanding-window retraining schedule over time-sorted rows.
+
+    Days are distinct values of the chronological key (race_date, the
+    calendar day - every track racing that date). The first model trains on the first
+    min_train_days days; every retrain_every days the model is retrained
+    on everything seen so far and predicts the next retrain_every days.
+
+    Args:
+        day_keys: Day key per row, sorted ascending
+        retrain_every: Days predicted by each model
+        min_train_days: Days in the first training window
+
+    Returns:
+        List of windows: {'train_end', 'test_start', 'test_end'} row
+        offsets (train rows are [0, train_end)), plus first/last test day
+    """
+    days, day_starts = np.unique(day_keys, return_index=True)
+    if len(days) <= min_train_days:
+        raise ValueError(
+            f"Need more than {min_train_days} days for walk-forward, have {len(days)}"
+        )
+
+    day_starts = np.append(day_starts, len(day_keys))
+    # Plain Python values (dates are strings, meet IDs numbers)
+    days = days.tolist()
+    windows = []
+
+    for first_day in range(min_train_days, len(days), retrain_every):
+        last_day = min(first_day + retrain_every, len(days)) - 1
+        windows.append({
+            'train_end': int(day_starts[first_day]),
+            'test_start': int(day_starts[first_day]),
+            'test_end': int(day_starts[last_day + 1]),
+            'first_day': days[first_day],
+            'last_day': days[last_day],
+        })
+
+    return windows
+
+
+def _fit_window(
+        estimator,
+        X: np.ndarray,
+        y: np.ndarray,
+        window: dict,
+        use_smote: bool = False
+) -> dict:
+    """
+    Train on one window's history and predict its test days.
+
+    Returns:
+        Dictionary with the fitted 'model', 'scaler' and test 'probabilities'
+    """
+    X_train = X[:window['train_end']]
+    y_train = y[:window['train_end']]
+
+    scaler = StandardScaler().fit(X_train)
+    X_train = scaler.transform(X_train)
+    if use_smote:
+        X_train, y_train = SMOTE(random_state=42).fit_resample(X_train, y_train)
+
+    model = clone(estimator).fit(X_train, y_train)
+    X_test = scaler.transform(X[window['test_start']:window['test_end']])
+
+    return {
+        'model': model,
+        'scaler': scaler,
+        'probabilities': model.predict_proba(X_test)[:, 1],
+    }
+
+
+class WalkForwardBacktester(Backtester):
+    """
+    Backtest a model that is retrained as the season goes on.
+
+    Rows are sorted by race date; the chosen estimator is refit every
+    retrain_every days on all earlier data (expanding window) and
+    predicts the following days only, and the window predictions are
+    stitched into one out-of-sample test set. Window trainings run in
+    parallel, and each window's model, scaler and predictions are cached
+    by the data, estimator parameters and window bounds, so rerunning
+    with other strategies or odds filters retrains nothing.
+
+    Strategies run exactly as with Backtester (run, run_strategies).
+    """
+
+    def __init__(
+            self,
+            estimator,
+            data_path: Path,
+            strategy: Optional[BettingStrategy] = None,
+            retrain_every: int = 30,
+            min_train_days: int = 90,
+            min_odds: float = 1.0,
+            max_odds: float = 50.0,
+            use_smote: bool = False,
+            n_jobs: int = -1,
+            cache: Optional[ArtifactCache] = None
+    ):
+        """
+        Initialize walk-forward backtester.
+
+        Args:
+            estimator: Unfitted (or fitted - only its parameters are used) sklearn estimator
+            data_path: Feature CSV
+            strategy: Default strategy for run()
+            retrain_every: Days between retrains
+            min_train_days: Days in the first training window
+            min_odds: Skip odds at or below this
+            max_odds: Skip odds above this
+            use_smote: SMOTE-resample each window's training rows
+            n_jobs: Parallel window trainings (-1 = all cores)
+            cache: Reuse trained windows across runs
+        """
+        self.strategy = strategy
+        self.min_odds = min_odds
+        self.max_odds = max_odds
+        self.estimator = clone(estimator)
+        self.use_smote = use_smote
+        self.n_jobs = n_jobs
+        self.cache = cache
+        self._bet_arrays = None
+        self._probabilities = None
+
+        logger.info(f"Loading data from {data_path}")
+        # Same default feature set the training scripts use
+        from src.features.feature_builder import resolve_feature_set
+        data_prep = DataPreparation(feature_set=resolve_feature_set())
+
+        df = attach_race_dates(data_prep.load_data(data_path))
+        df = data_prep.filter_complete_data(df)
+        df = data_prep.handle_missing_values(df)
+
+        day_col = 'race_date'
+        if day_col not in df.columns:
+            logger.warning("No race dates available - using meet_id as the day key")
+            day_col = 'meet_id'
+
+        # Chronological order; races within a day by race_id
+        df = df.sort_values([day_col, 'race_id'], kind='stable', ignore_index=True)
+        self.feature_columns = data_prep.get_feature_columns(df)
+
+        self.X = np.ascontiguousarray(df[self.feature_columns].to_numpy(dtype=np.float64))
+        self.y = df['target_win'].to_numpy()
+        self.windows = walk_forward_windows(
+            df[day_col].to_numpy(), retrain_every, min_train_days
+        )
+
+        self.test_df = df.iloc[self.windows[0]['test_start']:]
+
+        self.window_key = dict(
+            data=file_fingerprint(data_path),
+            code=code_version(sys.modules[__name__], data_preparation),
+            estimator=type(self.estimator).__name__,
+            estimator_params=self.estimator.get_params(),
+            feature_columns=self.feature_columns,
+            use_smote=use_smote
+        )
+
+        logger.info(f"Walk-forward: {len(self.windows)} windows of {retrain_every} days, "
+                    f"first trained on {self.windows[0]['train_end']} rows")
+        logger.info(f"Test samples: {len(self.test_df)} (each predicted by a model trained before it)")
+
+    def _window_cache_key(self, window: dict) -> str:
+        return ArtifactCache.key(
+            **self.window_key,
+            train_end=window['train_end'],
+            test_start=window['test_start'],
+            test_end=window['test_end']
+        )
+
+    def train_windows(self) -> List[dict]:
+        """
+        Train (or load from cache) every window's model.
+
+        Returns:
+            One dictionary per window with 'model', 'scaler', 'probabilities'
+        """
+        results: List[Optional[dict]] = [None] * len(self.windows)
+        keys = [self._window_cache_key(window) for window in self.windows]
+
+        if self.cache is not None:
+            for i, key in enumerate(keys):
+                results[i] = self.cache.get('walk_forward_window', key)
+
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            logger.info(f"Training {len(missing)} of {len(self.windows)} windows")
+            base = _single_threaded(self.estimator, self.n_jobs)
+
+            trained = Parallel(n_jobs=self.n_jobs, verbose=1)(
+                delayed(_fit_window)(base, self.X, self.y, self.windows[i], self.use_smote)
+                for i in missing
+            )
+
+            for i, result in zip(missing, trained):
+                results[i] = result
+                if self.cache is not None:
+                    self.cache.put('walk_forward_window', keys[i], result)
+
+        return results
+
+    def get_win_probabilities(self) -> np.ndarray:
+        """Stitched out-of-sample probabilities for every test row."""
+        if self._probabilities is None:
+            self._probabilities = np.concatenate(
+                [result['probabilities'] for result in self.train_windows()]
+            )
+        return self._probabilities
+
+
+def main():
+    """Main entry point."""
+    from src.utils.logger import setup_logging
+
+    parser = argparse.ArgumentParser(description="Walk-forward backtest with periodic retraining")
+    parser.add_argument("--data", type=str, default="data/processed/features_complete.csv", help="Feature CSV")
+    parser.add_argument("--model", type=str,
+                        help="Model pickle whose estimator and parameters are retrained "
+                             "(default: registry's active random_forest)")
+    parser.add_argument("--retrain-every", type=int, default=30, help="Days between retrains")
+    parser.add_argument("--min-train-days", type=int, default=90, help="Days in the first training window")
+    parser.add_argument("--workers", type=int, default=-1, help="Parallel window trainings")
+    parser.add_argument("--smote", action="store_true", help="SMOTE-resample each training window")
+    parser.add_argument("--no-cache", action="store_true", help="Retrain every window")
+
+    args = parser.parse_args()
+    setup_logging("walk_forward_backtest")
+
+    model_path = Path(args.model) if args.model else resolve_model_path(
+        'random_forest', fallback=Path("models/tuned/random_forest_tuned.pkl")
+    )
+    estimator = joblib.load(model_path)
+
+    backtester = WalkForwardBacktester(
+        estimator,
+        data_path=Path(args.data),
+        retrain_every=args.retrain_every,
+        min_train_days=args.min_train_days,
+        use_smote=args.smote,
+        n_jobs=args.workers,
+        cache=None if args.no_cache else ArtifactCache()
+    )
+
+    strategies = [
+        FlatBettingStrategy(bet_amount=2.0, bankroll=1000.0),
+        KellyCriterionStrategy(fraction=0.25, bankroll=1000.0),
+        ValueBettingStrategy(min_edge=0.05, bet_amount=2.0, bankroll=1000.0),
+        ConfidenceBettingStrategy(min_probability=0.30, bankroll=1000.0)
+    ]
+    strategy_results = backtester.run_strategies(strategies)
+
+    analyzer = PerformanceAnalyzer()
+    all_metrics = {}
+
+    output_dir = Path("data/backtesting")
+    output_dir.mkdir(exist_ok=True, parents=True)
+
+    for strategy in strategies:
+        results_df = strategy_results[strategy.name]
+        if results_df.empty:
+            print(f"⚠️  No bets placed for {strategy.name}")
+            continue
+
+        strategy_name = f"{strategy.name} (walk-forward)"
+        all_metrics[strategy.name] = analyzer.calculate_metrics(
+            results_df,
+            initial_bankroll=strategy.initial_bankroll,
+            strategy_name=strategy_name
+        )
+        analyzer.print_metrics(all_metrics[strategy.name], strategy_name)
+
+        safe_name = strategy.name.lower().replace(' ', '_')
+        results_df.to_csv(output_dir / f"walk_forward_{safe_name}.csv", index=False)
+
+    if len(all_metrics) > 1:
+        comparison_df = analyzer.compare_strategies(all_metrics)
+        comparison_df.to_csv(output_dir / "walk_forward_comparison.csv")
+
+    print("\n✓ Walk-forward backtest complete!")
+    print(f"  Results saved to: {output_dir}/")
+
+
+if __name__ == "__main__":
+    main()
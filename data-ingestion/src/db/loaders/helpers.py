@@ -4,6 +4,7 @@ from typing import Optional
 import logging
 
 from src.db.models import Jockey, Trainer, Horse, Track
+from src.db.reference_cache import get_reference_cache
 
 logger = logging.getLogger(__name__)
 
@@ -26,23 +27,23 @@ def get_or_create_jockey(
     Returns:
         Jockey instance
     """
+    cache = get_reference_cache(db)
+
     # Try to find by API ID first
     if api_id:
-        jockey = db.query(Jockey).filter(Jockey.api_id == api_id).first()
+        jockey = cache.get(Jockey, 'api_id', api_id)
         if jockey:
             return jockey
 
     # Try to find by name
-    jockey = db.query(Jockey).filter(
-        Jockey.first_name == first_name,
-        Jockey.last_name == last_name
-    ).first()
+    jockey = cache.get(Jockey, 'name', (first_name, last_name))
 
     if jockey:
         # Update API ID if we have it
         if api_id and not jockey.api_id:
             jockey.api_id = api_id
             db.flush()
+            cache.add(jockey)
         return jockey
 
     # Create new jockey
@@ -53,6 +54,7 @@ def get_or_create_jockey(
     )
     db.add(jockey)
     db.flush()  # Get the ID
+    cache.add(jockey)
     logger.debug(f"Created new jockey: {first_name} {last_name}")
     return jockey
 
@@ -75,23 +77,23 @@ def get_or_create_trainer(
     Returns:
         Trainer instance
     """
+    cache = get_reference_cache(db)
+
     # Try to find by API ID first
     if api_id:
-        trainer = db.query(Trainer).filter(Trainer.api_id == api_id).first()
+        trainer = cache.get(Trainer, 'api_id', api_id)
         if trainer:
             return trainer
 
     # Try to find by name
-    trainer = db.query(Trainer).filter(
-        Trainer.first_name == first_name,
-        Trainer.last_name == last_name
-    ).first()
+    trainer = cache.get(Trainer, 'name', (first_name, last_name))
 
     if trainer:
         # Update API ID if we have it
         if api_id and not trainer.api_id:
             trainer.api_id = api_id
             db.flush()
+            cache.add(trainer)
         return trainer
 
     # Create new trainer
@@ -102,6 +104,7 @@ def get_or_create_trainer(
     )
     db.add(trainer)
     db.flush()
+    cache.add(trainer)
     logger.debug(f"Created new trainer: {first_name} {last_name}")
     return trainer
 
@@ -130,16 +133,16 @@ def get_or_create_horse(
     Returns:
         Horse instance
     """
+    cache = get_reference_cache(db)
+
     # Try to find by registration number
     if registration_number:
-        horse = db.query(Horse).filter(
-            Horse.registration_number == registration_number
-        ).first()
+        horse = cache.get(Horse, 'registration_number', registration_number)
         if horse:
             return horse
 
     # Try to find by name (horses can have same names, but we'll assume uniqueness for now)
-    horse = db.query(Horse).filter(Horse.name == name).first()
+    horse = cache.get(Horse, 'name', name)
 
     if horse:
         # Update additional info if we have it
@@ -154,6 +157,7 @@ def get_or_create_horse(
         if breed and not horse.breed:
             horse.breed = breed
         db.flush()
+        cache.add(horse)
         return horse
 
     # Create new horse
@@ -167,6 +171,7 @@ def get_or_create_horse(
     )
     db.add(horse)
     db.flush()
+    cache.add(horse)
     logger.debug(f"Created new horse: {name}")
     return horse
 
@@ -189,7 +194,8 @@ def get_or_create_track(
     Returns:
         Track instance
     """
-    track = db.query(Track).filter(Track.track_id == track_id).first()
+    cache = get_reference_cache(db)
+    track = cache.get(Track, 'track_id', track_id)
 
     if track:
         return track
@@ -202,6 +208,7 @@ def get_or_create_track(
     )
     db.add(track)
     db.flush()
+    cache.add(track)
     logger.info(f"Created new track: {track_name}")
     return track
 
@@ -15,6 +15,8 @@ from src.db.loaders.helpers import (
     parse_surface_type,
     parse_race_type
 )
+from src.db.reference_cache import get_reference_cache
+from src.db.queries import refresh_database_stats
 from src.config import settings
 
 logger = logging.getLogger(__name__)
@@ -98,7 +100,7 @@ def load_entries_from_json(json_path: Path, db: Session) -> int:
         logger.error(f"No meet_id found in {json_path.name}")
         return 0
 
-    meet = db.query(Meet).filter(Meet.meet_id == meet_id).first()
+    meet = get_reference_cache(db).get(Meet, 'meet_id', meet_id)
 
     if not meet:
         logger.error(f"Meet {meet_id} not found in database. Load meets first.")
@@ -210,6 +212,7 @@ def load_entries_from_json(json_path: Path, db: Session) -> int:
                     # Create runner
                     runner = Runner(
                         race_id=race.id,
+                        race_date=meet.date,
                         horse_id=horse.id,
                         jockey_id=jockey.id if jockey else None,
                         trainer_id=trainer.id if trainer else None,
@@ -281,6 +284,9 @@ def load_all_entries() -> int:
             # Continue to next file even if this one fails
             continue
 
+    with get_db_context() as db:
+        refresh_database_stats(db)
+
     logger.info(f"✓ Total races loaded: {total_loaded}")
     return total_loaded
 
@@ -10,6 +10,9 @@ from sqlalchemy.orm import Session
 from src.db.session import get_db_context
 from src.db.models import Meet, Track
 from src.db.loaders.helpers import get_or_create_track
+from src.db.partitions import ensure_partitions
+from src.db.reference_cache import get_reference_cache
+from src.db.queries import refresh_database_stats
 from src.config import settings
 
 logger = logging.getLogger(__name__)
@@ -33,6 +36,8 @@ def load_meets_from_json(json_path: Path, db: Session) -> int:
 
     meets_data = data.get('meets', [])
     loaded_count = 0
+    meet_dates = []
+    cache = get_reference_cache(db)
 
     for meet_data in meets_data:
         try:
@@ -45,9 +50,7 @@ def load_meets_from_json(json_path: Path, db: Session) -> int:
             )
 
             # Check if meet already exists
-            existing_meet = db.query(Meet).filter(
-                Meet.meet_id == meet_data['meet_id']
-            ).first()
+            existing_meet = cache.get(Meet, 'meet_id', meet_data['meet_id'])
 
             if existing_meet:
                 logger.debug(f"Meet {meet_data['meet_id']} already exists, skipping")
@@ -69,6 +72,8 @@ def load_meets_from_json(json_path: Path, db: Session) -> int:
             )
 
             db.add(meet)
+            cache.add(meet)
+            meet_dates.append(meet_date)
             loaded_count += 1
 
         except Exception as e:
@@ -76,6 +81,11 @@ def load_meets_from_json(json_path: Path, db: Session) -> int:
             continue
 
     db.flush()
+
+    # Runners for these meets must land in a month partition, not the default
+    if meet_dates:
+        ensure_partitions(db, min(meet_dates), max(meet_dates))
+
     logger.info(f"Loaded {loaded_count} new meets")
     return loaded_count
 
@@ -109,6 +119,8 @@ def load_all_meets() -> int:
                 logger.error(f"Error processing {json_file.name}: {e}")
                 continue
 
+        refresh_database_stats(db)
+
     logger.info(f"✓ Total meets loaded: {total_loaded}")
     return total_loaded
 
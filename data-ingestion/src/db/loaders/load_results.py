@@ -1,25 +1,34 @@
 """Load results data from JSON files."""
 import json
 from pathlib import Path
-from typing import Optional
+from datetime import date
+from typing import Optional, Set
 import logging
 
 from sqlalchemy.orm import Session
 
 from src.db.session import get_db_context
-from src.db.models import Race, Runner, RaceResult, RunnerResult, Payoff
+from src.db.models import Meet, Race, Runner, RaceResult, RunnerResult, Payoff
+from src.db.reference_cache import get_reference_cache
+from src.db.loaders.refresh_stats import refresh_entity_stats
+from src.db.queries import refresh_database_stats
 from src.config import settings
 
 logger = logging.getLogger(__name__)
 
 
-def load_results_from_json(json_path: Path, db: Session) -> int:
+def load_results_from_json(
+        json_path: Path,
+        db: Session,
+        affected_dates: Optional[Set[date]] = None
+) -> int:
     """
     Load results from a JSON file.
 
     Args:
         json_path: Path to JSON file
         db: Database session
+        affected_dates: Optional set that collects meet dates with new results
 
     Returns:
         Number of race results loaded
@@ -32,16 +41,15 @@ def load_results_from_json(json_path: Path, db: Session) -> int:
     meet_id = data['meet_id']
     races_data = data.get('races', [])
     loaded_count = 0
+    cache = get_reference_cache(db)
 
     for race_data in races_data:
         try:
             race_number = int(race_data['race_key']['race_number'])
 
             # Find the race in database (from entries)
-            # First get the meet
-            from src.db.models import Meet
-
-            meet = db.query(Meet).filter(Meet.meet_id == meet_id).first()
+            # First get the meet (cached after the first race)
+            meet = cache.get(Meet, 'meet_id', meet_id)
 
             if not meet:
                 logger.warning(f"Meet {meet_id} not found in database, skipping")
@@ -98,6 +106,7 @@ def load_results_from_json(json_path: Path, db: Session) -> int:
                 try:
                     # Find the runner by program number
                     runner = db.query(Runner).filter(
+                        Runner.race_date == meet.date,
                         Runner.race_id == race.id,
                         Runner.program_number == runner_data['program_number']
                     ).first()
@@ -113,6 +122,7 @@ def load_results_from_json(json_path: Path, db: Session) -> int:
                     # Create runner result
                     runner_result = RunnerResult(
                         runner_id=runner.id,
+                        race_date=runner.race_date,
                         race_result_id=race_result.id,
                         finish_position=finish_position,
                         win_payoff=runner_data.get('win_payoff'),
@@ -151,6 +161,9 @@ def load_results_from_json(json_path: Path, db: Session) -> int:
 
             loaded_count += 1
 
+            if affected_dates is not None:
+                affected_dates.add(meet.date)
+
         except Exception as e:
             logger.error(f"Error loading race result: {e}")
             continue
@@ -179,16 +192,21 @@ def load_all_results() -> int:
     logger.info(f"Found {len(results_files)} results files")
 
     total_loaded = 0
+    affected_dates = set()
 
     with get_db_context() as db:
         for json_file in results_files:
             try:
-                count = load_results_from_json(json_file, db)
+                count = load_results_from_json(json_file, db, affected_dates)
                 total_loaded += count
             except Exception as e:
                 logger.error(f"Error processing {json_file.name}: {e}")
                 continue
 
+        # Keep the entity stats summary in step with the new results
+        refresh_entity_stats(db, affected_dates)
+        refresh_database_stats(db)
+
     logger.info(f"✓ Total race results loaded: {total_loaded}")
     return total_loaded
 
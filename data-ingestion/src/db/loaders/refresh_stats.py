@@ -0,0 +1,167 @@
+"""Refresh pre-aggregated entity statistics after a results load."""
+import argparse
+from datetime import date
+from typing import Iterable, Optional, List
+import logging
+
+from sqlalchemy import select, insert, delete, func, case, literal, and_, Integer, String
+from sqlalchemy.orm import Session
+
+from src.db.session import get_db_context
+from src.db.models import Runner, Race, Meet, RunnerResult, EntityDailyStats
+
+logger = logging.getLogger(__name__)
+
+# (entity_type, runner column, break down by track)
+STAT_GROUPS = [
+    ('jockey', Runner.jockey_id, False),
+    ('jockey', Runner.jockey_id, True),
+    ('trainer', Runner.trainer_id, False),
+    ('trainer', Runner.trainer_id, True),
+    ('horse', Runner.horse_id, False),
+]
+
+
+def _daily_stats_select(entity_type: str, entity_col, by_track: bool, dates: Optional[List[date]]):
+    """
+    Build the aggregate SELECT for one entity grouping.
+
+    Args:
+        entity_type: 'jockey', 'trainer' or 'horse'
+        entity_col: Runner column holding the entity ID
+        by_track: Group by track as well as by day
+        dates: Only aggregate these meet dates (None = all)
+
+    Returns:
+        SQLAlchemy Select producing EntityDailyStats rows
+    """
+    track_col = Meet.track_id if by_track else literal(EntityDailyStats.ALL_TRACKS, Integer)
+
+    stmt = select(
+        literal(entity_type, String).label('entity_type'),
+        entity_col.label('entity_id'),
+        track_col.label('track_id'),
+        Meet.date.label('stat_date'),
+        func.count(RunnerResult.id).label('starts'),
+        func.sum(case((RunnerResult.finish_position == 1, 1), else_=0)).label('wins'),
+        func.coalesce(func.sum(RunnerResult.win_payoff), 0.0).label('total_payoff'),
+        func.sum(RunnerResult.finish_position).label('total_finish_position'),
+    ).select_from(RunnerResult).join(
+        Runner, and_(
+            RunnerResult.runner_id == Runner.id,
+            RunnerResult.race_date == Runner.race_date
+        )
+    ).join(
+        Race, Runner.race_id == Race.id
+    ).join(
+        Meet, Race.meet_id == Meet.id
+    ).where(
+        entity_col.isnot(None),
+        RunnerResult.finish_position.isnot(None)
+    )
+
+    if dates is not None:
+        # Filter on the partition key too so only the affected months are read
+        stmt = stmt.where(
+            Meet.date.in_(dates),
+            Runner.race_date.in_(dates),
+            RunnerResult.race_date.in_(dates)
+        )
+
+    group_cols = [entity_col, Meet.date]
+    if by_track:
+        group_cols.append(Meet.track_id)
+
+    return stmt.group_by(*group_cols)
+
+
+def refresh_entity_stats(db: Session, dates: Optional[Iterable[date]] = None) -> int:
+    """
+    Recompute EntityDailyStats rows for the given days.
+
+    Only the affected days are deleted and re-aggregated, so a nightly
+    results load costs a handful of grouped INSERT ... SELECTs instead of
+    a full rebuild.
+
+    Args:
+        db: Database session
+        dates: Meet dates to refresh (None = rebuild every day still in the
+            hot tables; rows for archived days, which can no longer be
+            re-aggregated, are kept - see src/db/partitions.py)
+
+    Returns:
+        Number of summary rows written
+    """
+    date_list = sorted(set(dates)) if dates is not None else None
+
+    if date_list is not None and not date_list:
+        logger.info("No affected days - entity stats unchanged")
+        return 0
+
+    # Clear the days we are about to recompute
+    clear_stmt = delete(EntityDailyStats)
+    if date_list is not None:
+        clear_stmt = clear_stmt.where(EntityDailyStats.stat_date.in_(date_list))
+    else:
+        first_hot_day = db.execute(select(func.min(RunnerResult.race_date))).scalar()
+        if first_hot_day is None:
+            logger.info("No results in the hot tables - entity stats unchanged")
+            return 0
+        clear_stmt = clear_stmt.where(EntityDailyStats.stat_date >= first_hot_day)
+    db.execute(clear_stmt)
+
+    columns = [
+        'entity_type', 'entity_id', 'track_id', 'stat_date',
+        'starts', 'wins', 'total_payoff', 'total_finish_position'
+    ]
+
+    written = 0
+    for entity_type, entity_col, by_track in STAT_GROUPS:
+        result = db.execute(
+            insert(EntityDailyStats).from_select(
+                columns,
+                _daily_stats_select(entity_type, entity_col, by_track, date_list)
+            )
+        )
+        written += result.rowcount or 0
+
+    db.flush()
+
+    scope = f"{len(date_list)} days" if date_list is not None else "all days"
+    logger.info(f"Refreshed entity stats for {scope} ({written} rows)")
+    return written
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Refresh pre-aggregated entity statistics")
+    parser.add_argument(
+        "--date",
+        type=str,
+        action="append",
+        help="Meet date to refresh (YYYY-MM-DD). Repeatable"
+    )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Rebuild statistics for every day"
+    )
+
+    args = parser.parse_args()
+
+    if not args.all and not args.date:
+        parser.error("Pass --date at least once, or --all")
+
+    dates = None if args.all else [date.fromisoformat(d) for d in args.date]
+
+    with get_db_context() as db:
+        count = refresh_entity_stats(db, dates)
+
+    print(f"\n✓ Wrote {count} entity stats rows")
+
+
+if __name__ == "__main__":
+    from src.utils.logger import setup_logging
+
+    setup_logging("refresh_stats")
+    main()
@@ -9,6 +9,8 @@ from src.db.models.runner import Runner
 from src.db.models.race_result import RaceResult
 from src.db.models.runner_result import RunnerResult
 from src.db.models.payoff import Payoff
+from src.db.models.entity_stats import EntityDailyStats
+from src.db.models.database_stats import DatabaseStats
 
 __all__ = [
     'Base',
@@ -26,4 +28,6 @@ __all__ = [
     'RaceResult',
     'RunnerResult',
     'Payoff',
+    'EntityDailyStats',
+    'DatabaseStats',
 ]
\ No newline at end of file
@@ -0,0 +1,42 @@
+"""Database statistics snapshot model."""
+from sqlalchemy import Column, Integer, Float, Date, DateTime
+from src.db.base import Base
+
+
+class DatabaseStats(Base):
+    """
+    Cached whole-database statistics.
+
+    Holds a single row (id = SNAPSHOT_ID) rewritten by the loaders after
+    each load, so dashboards can read the totals without scanning the
+    racing tables.
+    """
+
+    __tablename__ = "database_stats"
+    __table_args__ = {'schema': 'racing'}
+
+    SNAPSHOT_ID = 1
+
+    id = Column(Integer, primary_key=True)
+
+    # Record counts
+    tracks_count = Column(Integer, nullable=False, default=0)
+    meets_count = Column(Integer, nullable=False, default=0)
+    races_count = Column(Integer, nullable=False, default=0)
+    horses_count = Column(Integer, nullable=False, default=0)
+    jockeys_count = Column(Integer, nullable=False, default=0)
+    trainers_count = Column(Integer, nullable=False, default=0)
+    runners_count = Column(Integer, nullable=False, default=0)
+    race_results_count = Column(Integer, nullable=False, default=0)
+    payoffs_count = Column(Integer, nullable=False, default=0)
+
+    # Averages and coverage
+    avg_races_per_meet = Column(Float)
+    avg_runners_per_race = Column(Float)
+    first_meet_date = Column(Date)
+    last_meet_date = Column(Date)
+
+    refreshed_at = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<DatabaseStats(races={self.races_count}, refreshed_at='{self.refreshed_at}')>"
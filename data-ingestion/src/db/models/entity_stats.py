@@ -0,0 +1,42 @@
+"""Entity daily statistics summary model."""
+from sqlalchemy import Column, String, Integer, Float, Date, UniqueConstraint
+from src.db.base import Base
+
+
+class EntityDailyStats(Base):
+    """
+    Pre-aggregated daily results per jockey, trainer or horse.
+
+    One row per (entity_type, entity_id, track_id, stat_date). Rows with
+    track_id = 0 hold the all-tracks totals; rows with a real track_id hold
+    the jockey-track / trainer-track breakdown.
+    """
+
+    __tablename__ = "entity_daily_stats"
+    __table_args__ = (
+        UniqueConstraint(
+            'entity_type', 'entity_id', 'track_id', 'stat_date',
+            name='uq_entity_daily_stats_entity_day'
+        ),
+        {'schema': 'racing'}
+    )
+
+    ALL_TRACKS = 0
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    entity_type = Column(String(20), nullable=False)  # jockey, trainer, horse
+    entity_id = Column(Integer, nullable=False)
+    track_id = Column(Integer, nullable=False, default=0)
+    stat_date = Column(Date, nullable=False, index=True)
+
+    # Aggregates (only runners with a finish position)
+    starts = Column(Integer, nullable=False, default=0)
+    wins = Column(Integer, nullable=False, default=0)
+    total_payoff = Column(Float, nullable=False, default=0.0)
+    total_finish_position = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return (
+            f"<EntityDailyStats({self.entity_type}={self.entity_id}, "
+            f"track={self.track_id}, date='{self.stat_date}')>"
+        )
@@ -1,16 +1,27 @@
 """Runner model."""
-from sqlalchemy import Column, String, Integer, Float, ForeignKey, Boolean
+from sqlalchemy import Column, String, Integer, Float, Date, ForeignKey, Boolean
 from sqlalchemy.orm import relationship
 from src.db.base import Base
 
 
 class Runner(Base):
-    """Horse entry in a race."""
+    """
+    Horse entry in a race.
+
+    Range-partitioned by month on race_date (the meet date, denormalized
+    from Meet). The partition key is part of the primary key, so always set
+    race_date when creating a runner and filter on it where possible so
+    Postgres can prune to the relevant partitions.
+    """
 
     __tablename__ = "runners"
-    __table_args__ = {'schema': 'racing'}
+    __table_args__ = {
+        'schema': 'racing',
+        'postgresql_partition_by': 'RANGE (race_date)'
+    }
 
     id = Column(Integer, primary_key=True, autoincrement=True)
+    race_date = Column(Date, primary_key=True, nullable=False)  # Partition key
     race_id = Column(Integer, ForeignKey('racing.races.id'), nullable=False, index=True)
     horse_id = Column(Integer, ForeignKey('racing.horses.id'), nullable=False, index=True)
     jockey_id = Column(Integer, ForeignKey('racing.jockeys.id'), index=True)
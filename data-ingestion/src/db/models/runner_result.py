@@ -1,17 +1,33 @@
 """Runner result model."""
-from sqlalchemy import Column, Integer, Float, ForeignKey
+from sqlalchemy import Column, Integer, Float, Date, ForeignKey, ForeignKeyConstraint, Index
 from sqlalchemy.orm import relationship
 from src.db.base import Base
 
 
 class RunnerResult(Base):
-    """Individual runner's race result."""
+    """
+    Individual runner's race result.
+
+    Partitioned like Runner on race_date, which is copied from the runner.
+    """
 
     __tablename__ = "runner_results"
-    __table_args__ = {'schema': 'racing'}
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ['runner_id', 'race_date'],
+            ['racing.runners.id', 'racing.runners.race_date'],
+            name='fk_runner_results_runner_id_runners'
+        ),
+        Index('ix_racing_runner_results_runner_id', 'runner_id', 'race_date', unique=True),
+        {
+            'schema': 'racing',
+            'postgresql_partition_by': 'RANGE (race_date)'
+        }
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    runner_id = Column(Integer, ForeignKey('racing.runners.id'), nullable=False, unique=True, index=True)
+    race_date = Column(Date, primary_key=True, nullable=False)  # Partition key
+    runner_id = Column(Integer, nullable=False)
     race_result_id = Column(Integer, ForeignKey('racing.race_results.id'), nullable=False, index=True)
 
     # Finish Position
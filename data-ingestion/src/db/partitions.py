@@ -0,0 +1,280 @@
+"""Monthly range partition management for runner-level tables."""
+import re
+import argparse
+from datetime import date
+from typing import List
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from src.db.session import get_db_context
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = 'racing'
+ARCHIVE_SCHEMA = 'racing_archive'
+
+# Parent tables partitioned by RANGE (race_date). Order matters for
+# archiving: referencing tables must be detached before referenced ones.
+PARTITIONED_TABLES = ['runner_results', 'runners']
+
+# FK that runner_results partitions keep after being detached
+RUNNER_RESULTS_FK = 'fk_runner_results_runner_id_runners'
+
+PARTITION_NAME_RE = re.compile(r'_y(\d{4})m(\d{2})$')
+
+
+def month_start(d: date) -> date:
+    """First day of the month containing d."""
+    return d.replace(day=1)
+
+
+def next_month(d: date) -> date:
+    """First day of the month after d."""
+    if d.month == 12:
+        return date(d.year + 1, 1, 1)
+    return date(d.year, d.month + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    """Partition table name for a month, e.g. runners_y2026m02."""
+    return f"{table}_y{month.year}m{month.month:02d}"
+
+
+def _partition_exists(db: Session, name: str) -> bool:
+    return db.execute(
+        text("SELECT to_regclass(:name)"), {'name': f"{SCHEMA}.{name}"}
+    ).scalar() is not None
+
+
+def _create_month_partitions(db: Session, month: date) -> int:
+    """
+    Create the month's missing partitions, moving rows out of the default partition.
+
+    Postgres refuses to create a partition whose range the default
+    partition already holds rows for (loads that ran before the month
+    existed). Those months are staged: every row of the month is copied to
+    a temp table and deleted (runner_results before the runners they
+    reference), the partitions are created, and the rows are inserted
+    back through the parents so they route to the new month.
+
+    Returns:
+        Number of partitions created
+    """
+    missing = [
+        table for table in PARTITIONED_TABLES
+        if not _partition_exists(db, partition_name(table, month))
+    ]
+    if not missing:
+        return 0
+
+    bounds = {'lower': month, 'upper': next_month(month)}
+    in_month = "race_date >= :lower AND race_date < :upper"
+
+    needs_staging = any(
+        db.execute(text(
+            f"SELECT EXISTS (SELECT 1 FROM {SCHEMA}.{table}_default WHERE {in_month})"
+        ), bounds).scalar()
+        for table in missing
+    )
+
+    if needs_staging:
+        for table in PARTITIONED_TABLES:
+            db.execute(text(
+                f"CREATE TEMP TABLE staged_{table} AS "
+                f"SELECT * FROM {SCHEMA}.{table} WHERE {in_month}"
+            ), bounds)
+            db.execute(text(f"DELETE FROM {SCHEMA}.{table} WHERE {in_month}"), bounds)
+
+    for table in missing:
+        db.execute(text(
+            f"CREATE TABLE {SCHEMA}.{partition_name(table, month)} "
+            f"PARTITION OF {SCHEMA}.{table} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{bounds['upper'].isoformat()}')"
+        ))
+
+    if needs_staging:
+        moved = 0
+        for table in reversed(PARTITIONED_TABLES):
+            result = db.execute(text(f"INSERT INTO {SCHEMA}.{table} SELECT * FROM staged_{table}"))
+            moved += result.rowcount or 0
+            db.execute(text(f"DROP TABLE staged_{table}"))
+        logger.info(f"Moved {moved} rows for {month:%Y-%m} out of the default partitions")
+
+    return len(missing)
+
+
+def ensure_partitions(db: Session, start_date: date, end_date: date) -> int:
+    """
+    Create monthly partitions covering start_date..end_date if missing.
+
+    Call this before loading runners for new days (load_meets does), so
+    rows land in a month partition rather than the default partition.
+    Rows that already landed in the default partition are moved into the
+    new month.
+
+    Args:
+        db: Database session
+        start_date: First day that must be covered
+        end_date: Last day that must be covered
+
+    Returns:
+        Number of partitions created
+    """
+    created = 0
+    month = month_start(start_date)
+
+    while month <= end_date:
+        created += _create_month_partitions(db, month)
+        month = next_month(month)
+
+    logger.debug(f"Created {created} partitions for {start_date} to {end_date}")
+    return created
+
+
+def list_partitions(db: Session, table: str) -> List[str]:
+    """
+    List month partitions currently attached to a parent table.
+
+    Args:
+        db: Database session
+        table: Parent table name
+
+    Returns:
+        Partition table names (default partition excluded)
+    """
+    rows = db.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "JOIN pg_namespace n ON n.oid = p.relnamespace "
+        "WHERE n.nspname = :schema AND p.relname = :table "
+        "ORDER BY c.relname"
+    ), {'schema': SCHEMA, 'table': table}).fetchall()
+
+    return [row.relname for row in rows if PARTITION_NAME_RE.search(row.relname)]
+
+
+def summary_covers_month(db: Session, month: date) -> bool:
+    """
+    Whether entity_daily_stats has every result day of a month.
+
+    Archived rows no longer feed feature queries or refresh_entity_stats,
+    so their career totals survive only in the summary table.
+
+    Args:
+        db: Database session
+        month: First day of the month
+
+    Returns:
+        True if no result day of the month is missing from the summary
+    """
+    bounds = {'lower': month, 'upper': next_month(month)}
+    missing_days = db.execute(text(
+        f"SELECT COUNT(*) FROM ("
+        f"  SELECT DISTINCT race_date FROM {SCHEMA}.runner_results "
+        f"  WHERE race_date >= :lower AND race_date < :upper AND finish_position IS NOT NULL"
+        f"  EXCEPT"
+        f"  SELECT DISTINCT stat_date FROM {SCHEMA}.entity_daily_stats "
+        f"  WHERE stat_date >= :lower AND stat_date < :upper"
+        f") missing"
+    ), bounds).scalar()
+
+    return missing_days == 0
+
+
+def archive_partitions(db: Session, before_date: date) -> List[str]:
+    """
+    Detach whole months that end on or before before_date.
+
+    Detached partitions are moved to the racing_archive schema, so the hot
+    tables (and their indexes) only cover recent seasons. Archived rows no
+    longer feed live feature queries or refresh_entity_stats; career
+    totals keep counting them only through the entity_daily_stats rows
+    already aggregated for those days (a full refresh_entity_stats rebuild
+    leaves archived days' rows in place). Months whose result days are not
+    all in the summary yet are therefore skipped - run refresh_stats for
+    them first.
+
+    Args:
+        db: Database session
+        before_date: Archive months entirely before this date
+
+    Returns:
+        Names of archived partitions
+    """
+    db.execute(text(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}"))
+
+    months = sorted({
+        date(int(match.group(1)), int(match.group(2)), 1)
+        for table in PARTITIONED_TABLES
+        for match in map(PARTITION_NAME_RE.search, list_partitions(db, table))
+    })
+
+    archived = []
+    for month in months:
+        if next_month(month) > before_date:
+            continue
+
+        if not summary_covers_month(db, month):
+            logger.warning(
+                f"Not archiving {month:%Y-%m}: entity_daily_stats is missing some of its "
+                f"result days (run refresh_stats for them first)"
+            )
+            continue
+
+        for table in PARTITIONED_TABLES:
+            name = partition_name(table, month)
+            if not _partition_exists(db, name):
+                continue
+
+            db.execute(text(f"ALTER TABLE {SCHEMA}.{table} DETACH PARTITION {SCHEMA}.{name}"))
+
+            # Archived results must not pin rows in the hot runners table
+            if table == 'runner_results':
+                db.execute(text(
+                    f"ALTER TABLE {SCHEMA}.{name} DROP CONSTRAINT IF EXISTS {RUNNER_RESULTS_FK}"
+                ))
+
+            db.execute(text(f"ALTER TABLE {SCHEMA}.{name} SET SCHEMA {ARCHIVE_SCHEMA}"))
+            archived.append(name)
+            logger.info(f"Archived {SCHEMA}.{name} to {ARCHIVE_SCHEMA}")
+
+    return archived
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Manage runner table partitions")
+    parser.add_argument(
+        "--ensure-through",
+        type=str,
+        help="Create monthly partitions from this month through the given date (YYYY-MM-DD)"
+    )
+    parser.add_argument(
+        "--archive-before",
+        type=str,
+        help="Detach and archive months ending on or before this date (YYYY-MM-DD)"
+    )
+
+    args = parser.parse_args()
+
+    if not args.ensure_through and not args.archive_before:
+        parser.error("Pass --ensure-through and/or --archive-before")
+
+    with get_db_context() as db:
+        if args.ensure_through:
+            count = ensure_partitions(db, date.today(), date.fromisoformat(args.ensure_through))
+            print(f"✓ Created {count} partitions")
+
+        if args.archive_before:
+            archived = archive_partitions(db, date.fromisoformat(args.archive_before))
+            print(f"✓ Archived {len(archived)} partitions")
+
+
+if __name__ == "__main__":
+    from src.utils.logger import setup_logging
+
+    setup_logging("partitions")
+    main()
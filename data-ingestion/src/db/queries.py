@@ -1,79 +1,208 @@
 """Useful database queries."""
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
-from datetime import date
+from sqlalchemy import func, and_, select
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+import logging
 
 from src.db.session import get_db_context
 from src.db.models import (
     Track, Meet, Race, Runner, Horse, Jockey, Trainer,
-    RaceResult, RunnerResult, Payoff
+    RaceResult, RunnerResult, Payoff, DatabaseStats
 )
 
+logger = logging.getLogger(__name__)
 
-def get_database_stats():
+
+# Snapshot columns filled by count(*) over each table
+STAT_COUNTS = {
+    'tracks_count': Track,
+    'meets_count': Meet,
+    'races_count': Race,
+    'horses_count': Horse,
+    'jockeys_count': Jockey,
+    'trainers_count': Trainer,
+    'runners_count': Runner,
+    'race_results_count': RaceResult,
+    'payoffs_count': Payoff,
+}
+
+
+# Non-count snapshot columns
+STAT_FIELDS = [
+    'avg_races_per_meet', 'avg_runners_per_race',
+    'first_meet_date', 'last_meet_date', 'refreshed_at'
+]
+
+
+def _compute_stat_values(db: Session) -> Dict[str, Any]:
+    """
+    Compute raw snapshot values in a single round trip.
+
+    Every figure is a scalar subquery of one SELECT, and each table is
+    read once: the averages are derived from count(*) and
+    count(DISTINCT parent_id) rather than grouped subqueries, and the
+    date range comes from MIN/MAX instead of two ordered scans.
+
+    Args:
+        db: Database session
+
+    Returns:
+        Dictionary keyed by DatabaseStats column name
+    """
+    def scalar(*cols, model):
+        return select(*cols).select_from(model).scalar_subquery()
+
+    columns = [
+        scalar(func.count(), model=model).label(name)
+        for name, model in STAT_COUNTS.items()
+    ]
+    columns += [
+        scalar(func.count(func.distinct(Race.meet_id)), model=Race).label('meets_with_races'),
+        scalar(func.count(func.distinct(Runner.race_id)), model=Runner).label('races_with_runners'),
+        scalar(func.min(Meet.date), model=Meet).label('first_meet_date'),
+        scalar(func.max(Meet.date), model=Meet).label('last_meet_date'),
+    ]
+
+    row = db.execute(select(*columns)).one()
+
+    values = {name: row._mapping[name] or 0 for name in STAT_COUNTS}
+    values['avg_races_per_meet'] = (
+        row.races_count / row.meets_with_races if row.meets_with_races else None
+    )
+    values['avg_runners_per_race'] = (
+        row.runners_count / row.races_with_runners if row.races_with_runners else None
+    )
+    values['first_meet_date'] = row.first_meet_date
+    values['last_meet_date'] = row.last_meet_date
+    values['refreshed_at'] = datetime.utcnow()
+
+    return values
+
+
+def compute_database_stats(db: Session) -> Dict[str, Any]:
+    """
+    Compute database statistics live, bypassing the snapshot.
+
+    Args:
+        db: Database session
+
+    Returns:
+        Dictionary of statistics (see get_database_stats)
+    """
+    return _stats_dict(_compute_stat_values(db), source='live')
+
+
+def refresh_database_stats(db: Session) -> Dict[str, Any]:
+    """
+    Recompute statistics and store them in the DatabaseStats snapshot.
+
+    Called by the loaders after each load.
+
+    Args:
+        db: Database session
+
+    Returns:
+        Freshly computed statistics
+    """
+    values = _compute_stat_values(db)
+
+    snapshot = db.get(DatabaseStats, DatabaseStats.SNAPSHOT_ID)
+    if snapshot is None:
+        snapshot = DatabaseStats(id=DatabaseStats.SNAPSHOT_ID)
+        db.add(snapshot)
+
+    for name, value in values.items():
+        setattr(snapshot, name, value)
+
+    db.flush()
+    logger.info(f"Refreshed database stats snapshot ({values['races_count']:,} races)")
+    return _stats_dict(values, source='live')
+
+
+def get_database_stats(db: Optional[Session] = None, use_cache: bool = True) -> Dict[str, Any]:
+    """
+    Get database statistics.
+
+    Reads the DatabaseStats snapshot when use_cache is set and a snapshot
+    exists; otherwise computes the figures live.
+
+    Args:
+        db: Database session (None = open a new one)
+        use_cache: Prefer the cached snapshot
+
+    Returns:
+        Dictionary with counts, averages, date range and results completion
+    """
+    if db is None:
+        with get_db_context() as session:
+            return get_database_stats(session, use_cache)
+
+    if use_cache:
+        snapshot = db.get(DatabaseStats, DatabaseStats.SNAPSHOT_ID)
+        if snapshot is not None:
+            values = {
+                name: getattr(snapshot, name)
+                for name in [*STAT_COUNTS, *STAT_FIELDS]
+            }
+            return _stats_dict(values, source='cache')
+
+    return compute_database_stats(db)
+
+
+def _stats_dict(values: Dict[str, Any], source: str) -> Dict[str, Any]:
+    """Shape raw snapshot values into the statistics dictionary."""
+    races = values['races_count']
+    results = values['race_results_count']
+
+    return {
+        'counts': {
+            name.replace('_count', ''): values[name] for name in STAT_COUNTS
+        },
+        'avg_races_per_meet': values['avg_races_per_meet'],
+        'avg_runners_per_race': values['avg_runners_per_race'],
+        'first_meet_date': values['first_meet_date'],
+        'last_meet_date': values['last_meet_date'],
+        'results_completion_pct': (results / races * 100) if races > 0 else None,
+        'refreshed_at': values['refreshed_at'],
+        'source': source,
+    }
+
+
+def print_database_stats(use_cache: bool = False):
     """Print database statistics."""
-    with get_db_context() as db:
-        print("\n" + "=" * 60)
-        print("DATABASE STATISTICS")
-        print("=" * 60)
+    stats = get_database_stats(use_cache=use_cache)
+    counts = stats['counts']
 
-        # Count records
-        tracks_count = db.query(Track).count()
-        meets_count = db.query(Meet).count()
-        races_count = db.query(Race).count()
-        horses_count = db.query(Horse).count()
-        jockeys_count = db.query(Jockey).count()
-        trainers_count = db.query(Trainer).count()
-        runners_count = db.query(Runner).count()
-        results_count = db.query(RaceResult).count()
-        payoffs_count = db.query(Payoff).count()
-
-        print(f"\nTracks:         {tracks_count:,}")
-        print(f"Meets:          {meets_count:,}")
-        print(f"Races:          {races_count:,}")
-        print(f"Horses:         {horses_count:,}")
-        print(f"Jockeys:        {jockeys_count:,}")
-        print(f"Trainers:       {trainers_count:,}")
-        print(f"Runners:        {runners_count:,}")
-        print(f"Race Results:   {results_count:,}")
-        print(f"Payoffs:        {payoffs_count:,}")
-
-        # Calculate averages using subquery approach
-        # Average races per meet
-        from sqlalchemy import select
-        subq = select(
-            Meet.id,
-            func.count(Race.id).label('race_count')
-        ).join(Race).group_by(Meet.id).subquery()
-
-        avg_races = db.query(func.avg(subq.c.race_count)).scalar()
-
-        # Average runners per race
-        subq2 = select(
-            Race.id,
-            func.count(Runner.id).label('runner_count')
-        ).join(Runner).group_by(Race.id).subquery()
-
-        avg_runners = db.query(func.avg(subq2.c.runner_count)).scalar()
-
-        if avg_races:
-            print(f"\nAvg Races per Meet:    {avg_races:.1f}")
-        if avg_runners:
-            print(f"Avg Runners per Race:  {avg_runners:.1f}")
-
-        # Date range
-        first_meet = db.query(Meet).order_by(Meet.date.asc()).first()
-        last_meet = db.query(Meet).order_by(Meet.date.desc()).first()
-
-        if first_meet and last_meet:
-            print(f"\nDate Range: {first_meet.date} to {last_meet.date}")
-
-        # Completion percentage
-        if races_count > 0:
-            completion_pct = (results_count / races_count) * 100
-            print(f"Results Completion: {completion_pct:.1f}% ({results_count}/{races_count})")
+    print("\n" + "=" * 60)
+    print("DATABASE STATISTICS")
+    print("=" * 60)
 
-        print("=" * 60)
+    print(f"\nTracks:         {counts['tracks']:,}")
+    print(f"Meets:          {counts['meets']:,}")
+    print(f"Races:          {counts['races']:,}")
+    print(f"Horses:         {counts['horses']:,}")
+    print(f"Jockeys:        {counts['jockeys']:,}")
+    print(f"Trainers:       {counts['trainers']:,}")
+    print(f"Runners:        {counts['runners']:,}")
+    print(f"Race Results:   {counts['race_results']:,}")
+    print(f"Payoffs:        {counts['payoffs']:,}")
+
+    if stats['avg_races_per_meet']:
+        print(f"\nAvg Races per Meet:    {stats['avg_races_per_meet']:.1f}")
+    if stats['avg_runners_per_race']:
+        print(f"Avg Runners per Race:  {stats['avg_runners_per_race']:.1f}")
+
+    if stats['first_meet_date'] and stats['last_meet_date']:
+        print(f"\nDate Range: {stats['first_meet_date']} to {stats['last_meet_date']}")
+
+    if stats['results_completion_pct'] is not None:
+        print(
+            f"Results Completion: {stats['results_completion_pct']:.1f}% "
+            f"({counts['race_results']}/{counts['races']})"
+        )
+
+    print("=" * 60)
 
 
 def show_recent_races(limit: int = 10):
@@ -137,6 +266,6 @@ def show_top_jockeys(limit: int = 10):
 
 
 if __name__ == "__main__":
-    get_database_stats()
+    print_database_stats()
     show_recent_races(5)
     show_top_jockeys(10)
\ No newline at end of file
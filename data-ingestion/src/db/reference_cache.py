@@ -0,0 +1,180 @@
+"""Session-scoped read-through cache for reference entities."""
+from typing import Any, Dict, Optional, Tuple, Type
+import logging
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.db.models import Track, Meet, Jockey, Trainer, Horse
+
+logger = logging.getLogger(__name__)
+
+# Lookup keys per model: key name -> columns making up the key
+CACHE_KEYS: Dict[Type, Dict[str, Tuple[str, ...]]] = {
+    Track: {
+        'id': ('id',),
+        'track_id': ('track_id',),
+    },
+    Meet: {
+        'id': ('id',),
+        'meet_id': ('meet_id',),
+    },
+    Jockey: {
+        'id': ('id',),
+        'api_id': ('api_id',),
+        'name': ('first_name', 'last_name'),
+    },
+    Trainer: {
+        'id': ('id',),
+        'api_id': ('api_id',),
+        'name': ('first_name', 'last_name'),
+    },
+    Horse: {
+        'id': ('id',),
+        'registration_number': ('registration_number',),
+        'name': ('name',),
+    },
+}
+
+# Small tables loaded in full on first use; the rest are read-through only
+PRELOADED_MODELS = (Track, Jockey, Trainer)
+
+SESSION_INFO_KEY = 'reference_cache'
+
+
+class ReferenceCache:
+    """
+    Read-through cache of Track, Meet, Jockey, Trainer and Horse rows.
+
+    Lives for the lifetime of one database session (see
+    get_reference_cache), so cached instances are always attached to the
+    session that uses them. Preloaded tables (PRELOADED_MODELS) are held in
+    full, so a miss on them returns None without a query; for the others
+    misses fall through to the database and the result is cached. Callers
+    that insert new rows register them with add() so later lookups find
+    them without a query.
+    """
+
+    def __init__(self, db: Session):
+        """
+        Initialize reference cache.
+
+        Args:
+            db: Database session the cached rows belong to
+        """
+        self.db = db
+        self._index: Dict[Type, Dict[str, Dict[Any, Any]]] = {}
+        self._preloaded = set()
+        self.hits = 0
+        self.misses = 0
+        self.invalidate()
+
+    def get(self, model: Type, key: str, value: Any):
+        """
+        Look up a reference entity by one of its cache keys.
+
+        Args:
+            model: Model class (Track, Meet, Jockey, Trainer or Horse)
+            key: Key name from CACHE_KEYS, e.g. 'id' or 'api_id'
+            value: Key value (a tuple for multi-column keys such as 'name')
+
+        Returns:
+            Model instance or None if not found
+        """
+        if value is None:
+            return None
+
+        self._ensure_preloaded(model)
+
+        index = self._index[model][key]
+        if value in index:
+            self.hits += 1
+            return index[value]
+
+        self.misses += 1
+
+        # The whole table is in the index - a miss means the row doesn't
+        # exist (rows inserted in this session are registered via add())
+        if model in self._preloaded:
+            return None
+
+        columns = CACHE_KEYS[model][key]
+        values = value if len(columns) > 1 else (value,)
+
+        instance = self.db.query(model).filter(
+            *[getattr(model, col) == val for col, val in zip(columns, values)]
+        ).first()
+
+        if instance is not None:
+            self.add(instance)
+
+        return instance
+
+    def add(self, instance) -> None:
+        """
+        Register a (new or updated) instance under all of its keys.
+
+        Call after inserting or re-keying a row, e.g. after setting a
+        jockey's api_id. Keys whose columns are all still None are skipped.
+
+        Args:
+            instance: Model instance
+        """
+        model = type(instance)
+        if model not in self._index:
+            return
+
+        for key, columns in CACHE_KEYS[model].items():
+            values = tuple(getattr(instance, col) for col in columns)
+            if all(v is None for v in values):
+                continue
+            cache_value = values if len(columns) > 1 else values[0]
+            self._index[model][key].setdefault(cache_value, instance)
+
+    def invalidate(self, model: Optional[Type] = None) -> None:
+        """
+        Drop cached rows.
+
+        Args:
+            model: Model class to clear (None = everything)
+        """
+        models = [model] if model is not None else list(CACHE_KEYS)
+
+        for m in models:
+            self._index[m] = {key: {} for key in CACHE_KEYS[m]}
+            self._preloaded.discard(m)
+
+    def _ensure_preloaded(self, model: Type) -> None:
+        """Load small reference tables in a single query on first use."""
+        if model not in PRELOADED_MODELS or model in self._preloaded:
+            return
+
+        rows = self.db.query(model).all()
+        for row in rows:
+            self.add(row)
+
+        self._preloaded.add(model)
+        logger.debug(f"Preloaded {len(rows)} {model.__name__} rows")
+
+
+def get_reference_cache(db: Session) -> ReferenceCache:
+    """
+    Get the reference cache attached to a session, creating it if needed.
+
+    The cache is stored in Session.info and cleared on rollback, since
+    rolled-back inserts would otherwise stay cached.
+
+    Args:
+        db: Database session
+
+    Returns:
+        ReferenceCache for this session
+    """
+    cache = db.info.get(SESSION_INFO_KEY)
+
+    if cache is None:
+        cache = ReferenceCache(db)
+        db.info[SESSION_INFO_KEY] = cache
+        event.listen(db, 'after_rollback', lambda session: cache.invalidate())
+
+    return cache
@@ -2,26 +2,68 @@
 from typing import Dict, Any, List, Optional
 from datetime import date, timedelta
 import pandas as pd
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from decimal import Decimal
 
 from src.db.models import (
     Race, Runner, Horse, Jockey, Trainer,
-    RaceResult, RunnerResult, Meet
+    RaceResult, RunnerResult, Meet, EntityDailyStats
 )
 
 
 class FeatureCalculator:
     """Base class for feature calculation."""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, use_summary_stats: bool = False):
         """
         Initialize feature calculator.
 
         Args:
             db: Database session
+            use_summary_stats: Read career stats from entity_daily_stats
+                instead of aggregating runner_results live
         """
         self.db = db
+        self.use_summary_stats = use_summary_stats
+
+    def get_summary_stats(
+            self,
+            entity_type: str,
+            entity_id: int,
+            before_date: date,
+            track_id: int = EntityDailyStats.ALL_TRACKS,
+            start_date: Optional[date] = None
+    ):
+        """
+        Sum pre-aggregated daily stats for an entity before a date.
+
+        Args:
+            entity_type: 'jockey', 'trainer' or 'horse'
+            entity_id: Entity ID
+            before_date: Only include days before this date
+            track_id: Track ID (0 = all tracks)
+            start_date: Optional first day to include
+
+        Returns:
+            Row with total, wins, total_returned and total_finish
+        """
+        query = self.db.query(
+            func.sum(EntityDailyStats.starts).label('total'),
+            func.sum(EntityDailyStats.wins).label('wins'),
+            func.sum(EntityDailyStats.total_payoff).label('total_returned'),
+            func.sum(EntityDailyStats.total_finish_position).label('total_finish')
+        ).filter(
+            EntityDailyStats.entity_type == entity_type,
+            EntityDailyStats.entity_id == entity_id,
+            EntityDailyStats.track_id == track_id,
+            EntityDailyStats.stat_date < before_date
+        )
+
+        if start_date:
+            query = query.filter(EntityDailyStats.stat_date >= start_date)
+
+        return query.first()
 
     def calculate_win_rate(
             self,
@@ -1,17 +1,24 @@
 """Build complete feature matrix with all available data."""
+import argparse
 import sys
 from pathlib import Path
 from datetime import date
+from typing import Iterable, Optional
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from src.db.session import get_db_context
-from src.features.feature_builder import FeatureBuilder
+from src.features.feature_builder import FeatureBuilder, resolve_feature_set
 from src.utils.logger import setup_logging
 
 
-def build_complete_features():
-    """Build features for all dates with results."""
+def build_complete_features(feature_set: Optional[Iterable[str]] = None):
+    """
+    Build features for all dates with results.
+
+    Args:
+        feature_set: Only build these features (None = all, see resolve_feature_set)
+    """
     setup_logging("build_features")
 
     print("\n" + "=" * 80)
@@ -19,7 +26,7 @@ def build_complete_features():
     print("=" * 80)
 
     with get_db_context() as db:
-        builder = FeatureBuilder(db)
+        builder = FeatureBuilder(db, feature_set=feature_set)
 
         # Build features for Feb 1-7, 2026
         # Using broad date range to capture all available data
@@ -48,5 +55,18 @@ def build_complete_features():
         return df
 
 
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Build the complete feature matrix")
+    parser.add_argument("--feature-set", type=str,
+                        help="Feature set JSON (default: models/feature_set.json if it exists)")
+    parser.add_argument("--all-features", action="store_true", help="Build every feature, ignoring any feature set")
+
+    args = parser.parse_args()
+    build_complete_features(resolve_feature_set(
+        Path(args.feature_set) if args.feature_set else None, args.all_features
+    ))
+
+
 if __name__ == "__main__":
-    build_complete_features()
\ No newline at end of file
+    main()
\ No newline at end of file
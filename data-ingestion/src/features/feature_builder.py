@@ -1,41 +1,130 @@
 """Master feature builder - combines all feature calculators."""
-from typing import Dict, List, Optional
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
 from datetime import date
 import pandas as pd
 from sqlalchemy.orm import Session
 
 from src.db.models import Runner, Race, Meet, Track, RaceResult, RunnerResult
+from src.db.reference_cache import get_reference_cache
 from src.features.jockey_features import JockeyFeatureCalculator
 from src.features.trainer_features import TrainerFeatureCalculator
 from src.features.horse_features import HorseFeatureCalculator
 from src.features.race_features import RaceFeatureCalculator
 from src.features.value_features import ValueFeatureCalculator
+from src.features.registry import FEATURE_REGISTRY, FeatureContext, FeatureRegistry
+
+logger = logging.getLogger(__name__)
+
+
+# Features per group (jockey, trainer, horse, race, value), in column order
+FEATURE_GROUPS = FEATURE_REGISTRY.groups()
+
+# Pruned feature set written by src/ml/feature_selection.py
+FEATURE_SET_PATH = Path("models/feature_set.json")
+
+
+def load_feature_set(filepath: Path) -> List[str]:
+    """
+    Load a pruned feature set written by src/ml/feature_selection.py.
+
+    Args:
+        filepath: Feature set JSON
+
+    Returns:
+        List of feature names
+    """
+    with open(filepath) as f:
+        return json.load(f)['features']
+
+
+def resolve_feature_set(
+        filepath: Optional[Path] = None,
+        all_features: bool = False
+) -> Optional[List[str]]:
+    """
+    Feature set for a feature build or training run.
+
+    Args:
+        filepath: Feature set JSON (None = FEATURE_SET_PATH if it exists)
+        all_features: Ignore any feature set and use every feature
+
+    Returns:
+        List of feature names, or None for all features
+    """
+    if all_features:
+        return None
+    if filepath is not None:
+        return load_feature_set(filepath)
+    if FEATURE_SET_PATH.exists():
+        logger.info(f"Using pruned feature set {FEATURE_SET_PATH}")
+        return load_feature_set(FEATURE_SET_PATH)
+    return None
 
 
 class FeatureBuilder:
     """Build complete feature matrix for ML."""
 
-    def __init__(self, db: Session):
+    def __init__(
+            self,
+            db: Session,
+            use_summary_stats: bool = False,
+            feature_set: Optional[Iterable[str]] = None,
+            registry: FeatureRegistry = FEATURE_REGISTRY
+    ):
         """
         Initialize feature builder.
 
         Args:
             db: Database session
+            use_summary_stats: Read jockey/trainer/horse career stats from the
+                entity_daily_stats summary table (see db/loaders/refresh_stats.py)
+            feature_set: Only produce these features, e.g. a model's feature
+                columns (None = all); data no requested feature depends on
+                is never loaded (see load_feature_set)
+            registry: Feature registry (see src/features/registry.py)
         """
         self.db = db
+        self.registry = registry
+        # Meets and tracks repeat across races - look them up once per session
+        self.reference_cache = get_reference_cache(db)
+
+        self.feature_set = set(feature_set) if feature_set is not None else None
+        self.specs, self.sources = registry.resolve(self.feature_set)
+        self.active_groups = list(dict.fromkeys(spec.group for spec in self.specs))
+
+        logger.info(
+            f"Feature builder: {len(self.specs)} features from {len(self.sources)} data sources "
+            f"({', '.join(self.active_groups) or 'none'})"
+        )
+
+        # Cumulative compute time and calls per feature group
+        self.group_timings = {group: 0.0 for group in FEATURE_GROUPS}
+        self.group_calls = {group: 0 for group in FEATURE_GROUPS}
 
-        # Initialize feature calculators
-        self.jockey_calc = JockeyFeatureCalculator(db)
-        self.trainer_calc = TrainerFeatureCalculator(db)
-        self.horse_calc = HorseFeatureCalculator(db)
+        # Initialize feature calculators (used by the registry's data sources)
+        self.jockey_calc = JockeyFeatureCalculator(db, use_summary_stats)
+        self.trainer_calc = TrainerFeatureCalculator(db, use_summary_stats)
+        self.horse_calc = HorseFeatureCalculator(db, use_summary_stats)
         self.race_calc = RaceFeatureCalculator(db)
         self.value_calc = ValueFeatureCalculator(db)
 
+        self.calculators = {
+            'jockey': self.jockey_calc,
+            'trainer': self.trainer_calc,
+            'horse': self.horse_calc,
+            'race': self.race_calc,
+            'value': self.value_calc,
+        }
+
     def build_features_for_runner(
             self,
             runner: Runner,
             race: Race,
-            meet: Meet
+            meet: Meet,
+            race_data: Optional[dict] = None
     ) -> Dict[str, float]:
         """
         Build complete feature set for a single runner.
@@ -44,6 +133,8 @@ class FeatureBuilder:
             runner: Runner object
             race: Race object
             meet: Meet object
+            race_data: Race-scoped intermediate data shared with the
+                other runners of the race (see build_features_for_race)
 
         Returns:
             Dictionary of all features
@@ -54,45 +145,20 @@ class FeatureBuilder:
         features['runner_id'] = float(runner.id)
         features['race_id'] = float(race.id)
         features['meet_id'] = float(meet.id)
+        # Calendar day - a date has one meet per track, so meet_id is not a day
+        features['race_date'] = meet.date.isoformat()
 
-        # Jockey features
-        if runner.jockey_id:
-            jockey_features = self.jockey_calc.calculate_jockey_features(
-                runner.jockey_id,
-                meet.date,
-                meet.track_id
-            )
-            features.update(jockey_features)
-        else:
-            # Fill with defaults if no jockey
-            features.update(self._get_default_jockey_features())
-
-        # Trainer features
-        if runner.trainer_id:
-            trainer_features = self.trainer_calc.calculate_trainer_features(
-                runner.trainer_id,
-                meet.date,
-                meet.track_id
-            )
-            features.update(trainer_features)
-        else:
-            # Fill with defaults if no trainer
-            features.update(self._get_default_trainer_features())
-
-        # Horse features
-        horse_features = self.horse_calc.calculate_horse_features(
-            runner.horse_id,
-            meet.date
+        ctx = FeatureContext(
+            self.registry, self.calculators, runner, race, meet,
+            race_data=race_data, timings=self.group_timings
         )
-        features.update(horse_features)
 
-        # Race context features
-        race_features = self.race_calc.calculate_race_features(race, runner)
-        features.update(race_features)
+        # Data source loads (the queries) are timed per group by the context
+        for spec in self.specs:
+            features[spec.name] = ctx.compute(spec)
 
-        # Value features (odds)
-        value_features = self.value_calc.calculate_value_features(runner, race)
-        features.update(value_features)
+        for group in self.active_groups:
+            self.group_calls[group] += 1
 
         # Target variable (if available)
         features['target_win'] = self._get_target_win(runner, race)
@@ -100,6 +166,19 @@ class FeatureBuilder:
 
         return features
 
+    def get_group_costs(self) -> Dict[str, float]:
+        """
+        Average seconds per runner spent in each feature group so far.
+
+        Returns:
+            Dictionary of {group: seconds per call}
+        """
+        return {
+            group: self.group_timings[group] / self.group_calls[group]
+            for group in FEATURE_GROUPS
+            if self.group_calls[group]
+        }
+
     def build_features_for_race(
             self,
             race: Race,
@@ -116,17 +195,44 @@ class FeatureBuilder:
             DataFrame with one row per runner
         """
         runners = self.db.query(Runner).filter(
+            Runner.race_date == meet.date,
             Runner.race_id == race.id,
             Runner.is_scratched == False
         ).all()
 
+        # Race-scoped data (e.g. the field) is loaded once for all runners
+        race_data = {}
         features_list = []
 
         for runner in runners:
-            features = self.build_features_for_runner(runner, race, meet)
+            features = self.build_features_for_runner(runner, race, meet, race_data)
             features_list.append(features)
 
-        return pd.DataFrame(features_list)
+        df = pd.DataFrame(features_list)
+        if df.empty:
+            return df
+
+        return df.astype({spec.name: spec.dtype for spec in self.specs})
+
+    def build_features_for_race_id(self, race_id: int) -> pd.DataFrame:
+        """
+        Build features for all runners in a race, looked up by ID.
+
+        Args:
+            race_id: Database race ID
+
+        Returns:
+            DataFrame with one row per runner
+
+        Raises:
+            ValueError: If the race doesn't exist
+        """
+        race = self.db.query(Race).filter(Race.id == race_id).first()
+        if not race:
+            raise ValueError(f"Race {race_id} not found")
+
+        meet = self.reference_cache.get(Meet, 'id', race.meet_id)
+        return self.build_features_for_race(race, meet)
 
     def build_features_for_date_range(
             self,
@@ -145,8 +251,8 @@ class FeatureBuilder:
         Returns:
             DataFrame with all features
         """
-        # Query races in date range
-        query = self.db.query(Race, Meet).join(
+        # Query races in date range; each meet is loaded once via the cache
+        query = self.db.query(Race).join(
             Meet, Race.meet_id == Meet.id
         ).filter(
             Meet.date >= start_date,
@@ -156,11 +262,12 @@ class FeatureBuilder:
         if only_with_results:
             query = query.filter(Race.has_results == True)
 
-        races_and_meets = query.all()
+        races = query.all()
 
         all_features = []
 
-        for race, meet in races_and_meets:
+        for race in races:
+            meet = self.reference_cache.get(Meet, 'id', race.meet_id)
             race_features = self.build_features_for_race(race, meet)
             all_features.append(race_features)
 
@@ -188,6 +295,7 @@ class FeatureBuilder:
 
         # Race has results - check if this runner won
         runner_result = self.db.query(RunnerResult).filter(
+            RunnerResult.race_date == runner.race_date,
             RunnerResult.runner_id == runner.id,
             RunnerResult.race_result_id == race_result.id
         ).first()
@@ -207,6 +315,7 @@ class FeatureBuilder:
             return -1.0
 
         runner_result = self.db.query(RunnerResult).filter(
+            RunnerResult.race_date == runner.race_date,
             RunnerResult.runner_id == runner.id,
             RunnerResult.race_result_id == race_result.id
         ).first()
@@ -215,35 +324,3 @@ class FeatureBuilder:
             return float(runner_result.finish_position)
         else:
             return -1.0  # Unknown finish position
-
-    def _get_default_jockey_features(self) -> Dict[str, float]:
-        """Get default jockey features when jockey is unknown."""
-        return {
-            'jockey_win_rate': 0.1,
-            'jockey_total_races': 0.0,
-            'jockey_roi': 0.0,
-            'jockey_track_win_rate': 0.1,
-            'jockey_track_races': 0.0,
-            'jockey_win_rate_7d': 0.1,
-            'jockey_races_7d': 0.0,
-            'jockey_win_rate_30d': 0.1,
-            'jockey_races_30d': 0.0,
-            'jockey_win_rate_90d': 0.1,
-            'jockey_races_90d': 0.0,
-        }
-
-    def _get_default_trainer_features(self) -> Dict[str, float]:
-        """Get default trainer features when trainer is unknown."""
-        return {
-            'trainer_win_rate': 0.1,
-            'trainer_total_races': 0.0,
-            'trainer_roi': 0.0,
-            'trainer_track_win_rate': 0.1,
-            'trainer_track_races': 0.0,
-            'trainer_win_rate_7d': 0.1,
-            'trainer_races_7d': 0.0,
-            'trainer_win_rate_30d': 0.1,
-            'trainer_races_30d': 0.0,
-            'trainer_win_rate_90d': 0.1,
-            'trainer_races_90d': 0.0,
-        }
\ No newline at end of file
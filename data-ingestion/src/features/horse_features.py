@@ -52,29 +52,41 @@ class HorseFeatureCalculator(FeatureCalculator):
         before_date: date
     ) -> Dict[str, float]:
         """Get overall horse statistics."""
-        results = self.db.query(
-            func.count(RunnerResult.id).label('total'),
-            func.sum(
-                case((RunnerResult.finish_position == 1, 1), else_=0)
-            ).label('wins'),
-            func.avg(RunnerResult.finish_position).label('avg_finish'),
-            func.sum(RunnerResult.win_payoff).label('earnings')
-        ).join(
-            Runner, RunnerResult.runner_id == Runner.id
-        ).join(
-            Race, Runner.race_id == Race.id
-        ).join(
-            Meet, Race.meet_id == Meet.id
-        ).filter(
-            Runner.horse_id == horse_id,
-            Meet.date < before_date,
-            RunnerResult.finish_position.isnot(None)
-        ).first()
-
-        total_races = results.total or 0
-        wins = results.wins or 0
-        avg_finish = float(results.avg_finish or 5.0)
-        earnings = float(results.earnings or 0)
+        if self.use_summary_stats:
+            results = self.get_summary_stats('horse', horse_id, before_date)
+
+            total_races = results.total or 0
+            wins = results.wins or 0
+            avg_finish = (
+                float(results.total_finish) / total_races if total_races else 5.0
+            )
+            earnings = float(results.total_returned or 0)
+        else:
+            results = self.db.query(
+                func.count(RunnerResult.id).label('total'),
+                func.sum(
+                    case((RunnerResult.finish_position == 1, 1), else_=0)
+                ).label('wins'),
+                func.avg(RunnerResult.finish_position).label('avg_finish'),
+                func.sum(RunnerResult.win_payoff).label('earnings')
+            ).join(
+                Runner, RunnerResult.runner_id == Runner.id
+            ).join(
+                Race, Runner.race_id == Race.id
+            ).join(
+                Meet, Race.meet_id == Meet.id
+            ).filter(
+                Runner.horse_id == horse_id,
+                Meet.date < before_date,
+                Runner.race_date < before_date,
+                RunnerResult.race_date < before_date,
+                RunnerResult.finish_position.isnot(None)
+            ).first()
+
+            total_races = results.total or 0
+            wins = results.wins or 0
+            avg_finish = float(results.avg_finish or 5.0)
+            earnings = float(results.earnings or 0)
 
         return {
             'win_rate': self.calculate_win_rate(wins, total_races),
@@ -104,7 +116,8 @@ class HorseFeatureCalculator(FeatureCalculator):
             Runner, Runner.race_id == Race.id
         ).filter(
             Runner.horse_id == horse_id,
-            Meet.date < current_date
+            Meet.date < current_date,
+            Runner.race_date < current_date
         ).order_by(Meet.date.desc()).first()
 
         if not last_race:
@@ -0,0 +1,402 @@
+"""Declarative feature registry with shared intermediate data."""
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import logging
+
+from src.db.models import Runner, Race, Meet
+
+logger = logging.getLogger(__name__)
+
+ODDS_CATEGORIES = [
+    'heavy_favorite', 'favorite', 'second_tier',
+    'mid_price', 'longshot', 'extreme_longshot', 'unknown'
+]
+
+
+class DataSource:
+    """
+    Intermediate data shared by several features.
+
+    A source is loaded at most once per runner (scope='runner') or once
+    per race (scope='race'), and only if a requested feature needs it.
+    Loaders return None when the data does not exist (e.g. a runner with
+    no jockey); features depending on it then take their default.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            group: str,
+            load: Callable[['FeatureContext'], Any],
+            scope: str = 'runner',
+            depends_on: Tuple[str, ...] = ()
+    ):
+        """
+        Initialize data source.
+
+        Args:
+            name: Source name
+            group: Feature group its cost is attributed to
+            load: Function of the FeatureContext returning the data
+            scope: 'runner' or 'race'
+            depends_on: Sources the loader reads through the context
+        """
+        if scope not in ('runner', 'race'):
+            raise ValueError(f"Unknown scope for {name}: {scope}")
+
+        self.name = name
+        self.group = group
+        self.load = load
+        self.scope = scope
+        self.depends_on = tuple(depends_on)
+
+
+class FeatureSpec:
+    """One model input column and how to compute it."""
+
+    def __init__(
+            self,
+            name: str,
+            group: str,
+            calculator: Callable[['FeatureContext'], Any],
+            dtype: str = 'float64',
+            default: float = 0.0,
+            depends_on: Tuple[str, ...] = ()
+    ):
+        """
+        Initialize feature spec.
+
+        Args:
+            name: Column name
+            group: Feature group (jockey, trainer, horse, race, value)
+            calculator: Function of the FeatureContext returning the value
+            dtype: Column dtype in the feature matrix
+            default: Value used when a dependency is missing
+            depends_on: Data sources the calculator reads
+        """
+        self.name = name
+        self.group = group
+        self.calculator = calculator
+        self.dtype = dtype
+        self.default = default
+        self.depends_on = tuple(depends_on)
+
+
+class FeatureRegistry:
+    """All known features and the data sources behind them."""
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self.sources: Dict[str, DataSource] = {}
+        self.features: Dict[str, FeatureSpec] = {}
+
+    def add_source(self, name: str, group: str, load: Callable, scope: str = 'runner',
+                   depends_on: Tuple[str, ...] = ()):
+        """Register a data source (see DataSource)."""
+        for dep in depends_on:
+            if dep not in self.sources:
+                raise ValueError(f"Source {name} depends on unknown source {dep}")
+        self.sources[name] = DataSource(name, group, load, scope, depends_on)
+
+    def add_feature(self, name: str, group: str, calculator: Callable, dtype: str = 'float64',
+                    default: float = 0.0, depends_on: Tuple[str, ...] = ()):
+        """Register a feature (see FeatureSpec). Registration order is column order."""
+        for dep in depends_on:
+            if dep not in self.sources:
+                raise ValueError(f"Feature {name} depends on unknown source {dep}")
+        self.features[name] = FeatureSpec(name, group, calculator, dtype, default, depends_on)
+
+    def groups(self) -> Dict[str, List[str]]:
+        """Feature names per group, in column order."""
+        groups: Dict[str, List[str]] = {}
+        for spec in self.features.values():
+            groups.setdefault(spec.group, []).append(spec.name)
+        return groups
+
+    def resolve(self, names: Optional[Iterable[str]] = None) -> Tuple[List[FeatureSpec], List[DataSource]]:
+        """
+        Work out what has to be computed for a set of features.
+
+        Args:
+            names: Requested feature names (None = all)
+
+        Returns:
+            Tuple of (feature specs in column order, data sources they need)
+        """
+        if names is None:
+            specs = list(self.features.values())
+        else:
+            requested = set(names)
+            unknown = requested.difference(self.features)
+            if unknown:
+                logger.warning(f"Ignoring {len(unknown)} unregistered features: {sorted(unknown)[:5]}")
+            specs = [spec for spec in self.features.values() if spec.name in requested]
+
+        needed = set()
+        stack = [dep for spec in specs for dep in spec.depends_on]
+        while stack:
+            name = stack.pop()
+            if name not in needed:
+                needed.add(name)
+                stack.extend(self.sources[name].depends_on)
+
+        # Registration order is a valid dependency order
+        sources = [source for name, source in self.sources.items() if name in needed]
+        return specs, sources
+
+
+class FeatureContext:
+    """
+    Evaluation state for one runner.
+
+    Runner-scoped source data lives here; race-scoped data is kept in a
+    dictionary shared by every runner of the race, so e.g. the field
+    query runs once per race instead of once per runner and feature.
+    """
+
+    def __init__(
+            self,
+            registry: FeatureRegistry,
+            calculators: Dict[str, Any],
+            runner: Runner,
+            race: Race,
+            meet: Meet,
+            race_data: Optional[dict] = None,
+            timings: Optional[Dict[str, float]] = None
+    ):
+        """
+        Initialize context.
+
+        Args:
+            registry: Feature registry
+            calculators: FeatureCalculator per group
+            runner: Runner object
+            race: Race object
+            meet: Meet object
+            race_data: Race-scoped source cache (shared across the race's runners)
+            timings: Seconds per group, accumulated by source loads
+        """
+        self.registry = registry
+        self.calculators = calculators
+        self.runner = runner
+        self.race = race
+        self.meet = meet
+        self.race_data = race_data if race_data is not None else {}
+        self.runner_data = {}
+        self.timings = timings if timings is not None else {}
+
+    def get(self, name: str) -> Any:
+        """Load (or reuse) a data source."""
+        source = self.registry.sources[name]
+        cache = self.race_data if source.scope == 'race' else self.runner_data
+
+        if name not in cache:
+            # Resolve dependencies first so their time is attributed to them
+            for dep in source.depends_on:
+                self.get(dep)
+
+            start = time.perf_counter()
+            cache[name] = source.load(self)
+            self.timings[source.group] = self.timings.get(source.group, 0.0) + time.perf_counter() - start
+
+        return cache[name]
+
+    def compute(self, spec: FeatureSpec) -> float:
+        """Compute one feature, falling back to its default."""
+        if any(self.get(dep) is None for dep in spec.depends_on):
+            return spec.default
+
+        value = spec.calculator(self)
+        return spec.default if value is None else value
+
+
+# ---------------------------------------------------------------------------
+# Source loaders
+# ---------------------------------------------------------------------------
+
+def _entity_id(ctx: FeatureContext, entity: str) -> Optional[int]:
+    return getattr(ctx.runner, f'{entity}_id')
+
+
+def _entity_overall(entity: str) -> Callable:
+    def load(ctx: FeatureContext):
+        entity_id = _entity_id(ctx, entity)
+        if not entity_id:
+            return None
+        return ctx.calculators[entity]._get_overall_stats(entity_id, ctx.meet.date)
+    return load
+
+
+def _entity_track(entity: str) -> Callable:
+    def load(ctx: FeatureContext):
+        entity_id = _entity_id(ctx, entity)
+        if not entity_id:
+            return None
+        if not ctx.meet.track_id:
+            # No track - fall back to overall win rate
+            return {'win_rate': ctx.get(f'{entity}_overall')['win_rate'], 'total_races': 0}
+        return ctx.calculators[entity]._get_track_stats(entity_id, ctx.meet.date, ctx.meet.track_id)
+    return load
+
+
+def _entity_form(entity: str) -> Callable:
+    def load(ctx: FeatureContext):
+        entity_id = _entity_id(ctx, entity)
+        if not entity_id:
+            return None
+        return ctx.calculators[entity]._get_recent_form(entity_id, ctx.meet.date)
+    return load
+
+
+def _load_race_field(ctx: FeatureContext) -> List[Tuple[int, Optional[float]]]:
+    """(runner id, morning line) of every active runner, shortest odds first."""
+    return ctx.calculators['race'].db.query(
+        Runner.id, Runner.morning_line_decimal
+    ).filter(
+        Runner.race_date == ctx.meet.date,
+        Runner.race_id == ctx.race.id,
+        Runner.is_scratched == False
+    ).order_by(Runner.morning_line_decimal.asc().nulls_last()).all()
+
+
+def _load_odds_rank(ctx: FeatureContext) -> int:
+    """Odds rank of the runner in the field (1 = favorite, 99 = unknown)."""
+    priced = [runner_id for runner_id, odds in ctx.get('race_field') if odds is not None]
+    for rank, runner_id in enumerate(priced, 1):
+        if runner_id == ctx.runner.id:
+            return rank
+    return 99
+
+
+def _post_position(runner: Runner) -> int:
+    try:
+        return int(runner.post_position) if runner.post_position else 0
+    except ValueError:
+        return 0
+
+
+def _ml_odds(ctx: FeatureContext) -> float:
+    return ctx.runner.morning_line_decimal or 0.0
+
+
+# ---------------------------------------------------------------------------
+# Registry definition
+# ---------------------------------------------------------------------------
+
+def _register_entity_features(registry: FeatureRegistry, entity: str):
+    """Jockey and trainer features are identical apart from the prefix."""
+    overall, track, form = f'{entity}_overall', f'{entity}_track', f'{entity}_form'
+
+    registry.add_source(overall, entity, _entity_overall(entity))
+    registry.add_source(track, entity, _entity_track(entity), depends_on=(overall,))
+    registry.add_source(form, entity, _entity_form(entity))
+
+    registry.add_feature(f'{entity}_win_rate', entity, lambda ctx: ctx.get(overall)['win_rate'],
+                         default=0.1, depends_on=(overall,))
+    registry.add_feature(f'{entity}_total_races', entity, lambda ctx: ctx.get(overall)['total_races'],
+                         dtype='int64', depends_on=(overall,))
+    registry.add_feature(f'{entity}_roi', entity, lambda ctx: ctx.get(overall)['roi'],
+                         depends_on=(overall,))
+    registry.add_feature(f'{entity}_track_win_rate', entity, lambda ctx: ctx.get(track)['win_rate'],
+                         default=0.1, depends_on=(track,))
+    registry.add_feature(f'{entity}_track_races', entity, lambda ctx: ctx.get(track)['total_races'],
+                         dtype='int64', depends_on=(track,))
+
+    for days in [7, 30, 90]:
+        win_rate, races = f'{entity}_win_rate_{days}d', f'{entity}_races_{days}d'
+        registry.add_feature(win_rate, entity, lambda ctx, key=win_rate: ctx.get(form)[key],
+                             default=0.1, depends_on=(form,))
+        registry.add_feature(races, entity, lambda ctx, key=races: ctx.get(form)[key],
+                             dtype='int64', depends_on=(form,))
+
+
+def build_default_registry() -> FeatureRegistry:
+    """
+    Build the registry of every feature the pipeline produces.
+
+    Returns:
+        FeatureRegistry (column order matches the original feature matrix)
+    """
+    registry = FeatureRegistry()
+
+    # Jockey / trainer
+    _register_entity_features(registry, 'jockey')
+    _register_entity_features(registry, 'trainer')
+
+    # Horse
+    registry.add_source(
+        'horse_overall', 'horse',
+        lambda ctx: ctx.calculators['horse']._get_overall_stats(ctx.runner.horse_id, ctx.meet.date)
+    )
+    registry.add_source(
+        'horse_last_race', 'horse',
+        lambda ctx: ctx.calculators['horse']._get_days_since_last_race(ctx.runner.horse_id, ctx.meet.date)
+    )
+    registry.add_feature('horse_win_rate', 'horse', lambda ctx: ctx.get('horse_overall')['win_rate'],
+                         default=0.1, depends_on=('horse_overall',))
+    registry.add_feature('horse_total_races', 'horse', lambda ctx: ctx.get('horse_overall')['total_races'],
+                         dtype='int64', depends_on=('horse_overall',))
+    registry.add_feature('horse_avg_finish', 'horse', lambda ctx: ctx.get('horse_overall')['avg_finish'],
+                         default=5.0, depends_on=('horse_overall',))
+    registry.add_feature('horse_days_since_last_race', 'horse', lambda ctx: ctx.get('horse_last_race'),
+                         dtype='int64', default=999, depends_on=('horse_last_race',))
+    registry.add_feature('horse_career_earnings', 'horse', lambda ctx: ctx.get('horse_overall')['earnings'],
+                         depends_on=('horse_overall',))
+
+    # Race context (attributes of the already-loaded race and runner, plus one field query per race)
+    registry.add_source('race_field', 'race', _load_race_field, scope='race')
+
+    def surface(ctx):
+        return ctx.race.surface.value if ctx.race.surface else 'Unknown'
+
+    def race_type(ctx):
+        return ctx.race.race_type.value if ctx.race.race_type else 'Unknown'
+
+    registry.add_feature('race_distance', 'race', lambda ctx: float(ctx.race.distance_value or 0))
+    registry.add_feature(
+        'race_distance_furlongs', 'race',
+        lambda ctx: ctx.calculators['race']._convert_to_furlongs(ctx.race.distance_value, ctx.race.distance_unit)
+    )
+    for name, value in [('dirt', 'Dirt'), ('turf', 'Turf'), ('synthetic', 'Synthetic')]:
+        registry.add_feature(f'surface_{name}', 'race',
+                             lambda ctx, value=value: 1.0 if surface(ctx) == value else 0.0)
+    for name, value in [('maiden', 'Maiden'), ('claiming', 'Claiming'),
+                        ('allowance', 'Allowance'), ('stakes', 'Stakes')]:
+        registry.add_feature(f'race_type_{name}', 'race',
+                             lambda ctx, value=value: 1.0 if race_type(ctx) == value else 0.0)
+    registry.add_feature('race_purse', 'race', lambda ctx: float(ctx.race.purse or 0))
+    registry.add_feature('race_min_claim_price', 'race', lambda ctx: float(ctx.race.min_claim_price or 0))
+    registry.add_feature('race_max_claim_price', 'race', lambda ctx: float(ctx.race.max_claim_price or 0))
+    registry.add_feature('is_graded_stakes', 'race',
+                         lambda ctx: 1.0 if ctx.race.grade and ctx.race.grade.startswith('G') else 0.0)
+    registry.add_feature('field_size', 'race', lambda ctx: float(len(ctx.get('race_field'))),
+                         depends_on=('race_field',))
+    registry.add_feature('post_position', 'race', lambda ctx: float(_post_position(ctx.runner)))
+    registry.add_feature(
+        'post_position_normalized', 'race',
+        lambda ctx: _post_position(ctx.runner) / len(ctx.get('race_field')) if ctx.get('race_field') else 0.0,
+        depends_on=('race_field',)
+    )
+    registry.add_feature('weight_carried', 'race', lambda ctx: float(ctx.runner.weight or 120), default=120.0)
+
+    # Value (odds)
+    registry.add_source('odds_rank', 'value', _load_odds_rank, depends_on=('race_field',))
+    registry.add_source('odds_category', 'value',
+                        lambda ctx: ctx.calculators['value']._categorize_odds(_ml_odds(ctx)))
+
+    registry.add_feature('ml_odds_decimal', 'value', _ml_odds)
+    registry.add_feature('ml_odds_prob', 'value',
+                         lambda ctx: ctx.calculators['value'].normalize_odds(_ml_odds(ctx)), default=0.05)
+    registry.add_feature('ml_odds_rank', 'value', lambda ctx: ctx.get('odds_rank'),
+                         dtype='int64', default=99, depends_on=('odds_rank',))
+    registry.add_feature('is_favorite', 'value', lambda ctx: 1.0 if ctx.get('odds_rank') == 1 else 0.0,
+                         depends_on=('odds_rank',))
+    for category in ODDS_CATEGORIES:
+        name = f'odds_category_{category}'
+        registry.add_feature(name, 'value', lambda ctx, key=name: ctx.get('odds_category')[key],
+                             depends_on=('odds_category',))
+
+    return registry
+
+
+FEATURE_REGISTRY = build_default_registry()
@@ -58,23 +58,28 @@ class TrainerFeatureCalculator(FeatureCalculator):
         before_date: date
     ) -> Dict[str, float]:
         """Get overall trainer statistics."""
-        results = self.db.query(
-            func.count(RunnerResult.id).label('total'),
-            func.sum(
-                case((RunnerResult.finish_position == 1, 1), else_=0)
-            ).label('wins'),
-            func.sum(RunnerResult.win_payoff).label('total_returned')
-        ).join(
-            Runner, RunnerResult.runner_id == Runner.id
-        ).join(
-            Race, Runner.race_id == Race.id
-        ).join(
-            Meet, Race.meet_id == Meet.id
-        ).filter(
-            Runner.trainer_id == trainer_id,
-            Meet.date < before_date,
-            RunnerResult.finish_position.isnot(None)
-        ).first()
+        if self.use_summary_stats:
+            results = self.get_summary_stats('trainer', trainer_id, before_date)
+        else:
+            results = self.db.query(
+                func.count(RunnerResult.id).label('total'),
+                func.sum(
+                    case((RunnerResult.finish_position == 1, 1), else_=0)
+                ).label('wins'),
+                func.sum(RunnerResult.win_payoff).label('total_returned')
+            ).join(
+                Runner, RunnerResult.runner_id == Runner.id
+            ).join(
+                Race, Runner.race_id == Race.id
+            ).join(
+                Meet, Race.meet_id == Meet.id
+            ).filter(
+                Runner.trainer_id == trainer_id,
+                Meet.date < before_date,
+                Runner.race_date < before_date,
+                RunnerResult.race_date < before_date,
+                RunnerResult.finish_position.isnot(None)
+            ).first()
 
         total_races = results.total or 0
         wins = results.wins or 0
@@ -94,23 +99,30 @@ class TrainerFeatureCalculator(FeatureCalculator):
         track_id: int
     ) -> Dict[str, float]:
         """Get trainer statistics at specific track."""
-        results = self.db.query(
-            func.count(RunnerResult.id).label('total'),
-            func.sum(
-                case((RunnerResult.finish_position == 1, 1), else_=0)
-            ).label('wins')
-        ).join(
-            Runner, RunnerResult.runner_id == Runner.id
-        ).join(
-            Race, Runner.race_id == Race.id
-        ).join(
-            Meet, Race.meet_id == Meet.id
-        ).filter(
-            Runner.trainer_id == trainer_id,
-            Meet.track_id == track_id,
-            Meet.date < before_date,
-            RunnerResult.finish_position.isnot(None)
-        ).first()
+        if self.use_summary_stats:
+            results = self.get_summary_stats(
+                'trainer', trainer_id, before_date, track_id=track_id
+            )
+        else:
+            results = self.db.query(
+                func.count(RunnerResult.id).label('total'),
+                func.sum(
+                    case((RunnerResult.finish_position == 1, 1), else_=0)
+                ).label('wins')
+            ).join(
+                Runner, RunnerResult.runner_id == Runner.id
+            ).join(
+                Race, Runner.race_id == Race.id
+            ).join(
+                Meet, Race.meet_id == Meet.id
+            ).filter(
+                Runner.trainer_id == trainer_id,
+                Meet.track_id == track_id,
+                Meet.date < before_date,
+                Runner.race_date < before_date,
+                RunnerResult.race_date < before_date,
+                RunnerResult.finish_position.isnot(None)
+            ).first()
 
         total_races = results.total or 0
         wins = results.wins or 0
@@ -131,23 +143,32 @@ class TrainerFeatureCalculator(FeatureCalculator):
         for days in [7, 30, 90]:
             start_date = before_date - timedelta(days=days)
 
-            results = self.db.query(
-                func.count(RunnerResult.id).label('total'),
-                func.sum(
-                    case((RunnerResult.finish_position == 1, 1), else_=0)
-                ).label('wins')
-            ).join(
-                Runner, RunnerResult.runner_id == Runner.id
-            ).join(
-                Race, Runner.race_id == Race.id
-            ).join(
-                Meet, Race.meet_id == Meet.id
-            ).filter(
-                Runner.trainer_id == trainer_id,
-                Meet.date >= start_date,
-                Meet.date < before_date,
-                RunnerResult.finish_position.isnot(None)
-            ).first()
+            if self.use_summary_stats:
+                results = self.get_summary_stats(
+                    'trainer', trainer_id, before_date, start_date=start_date
+                )
+            else:
+                results = self.db.query(
+                    func.count(RunnerResult.id).label('total'),
+                    func.sum(
+                        case((RunnerResult.finish_position == 1, 1), else_=0)
+                    ).label('wins')
+                ).join(
+                    Runner, RunnerResult.runner_id == Runner.id
+                ).join(
+                    Race, Runner.race_id == Race.id
+                ).join(
+                    Meet, Race.meet_id == Meet.id
+                ).filter(
+                    Runner.trainer_id == trainer_id,
+                    Meet.date >= start_date,
+                    Runner.race_date >= start_date,
+                    RunnerResult.race_date >= start_date,
+                    Meet.date < before_date,
+                    Runner.race_date < before_date,
+                    RunnerResult.race_date < before_date,
+                    RunnerResult.finish_position.isnot(None)
+                ).first()
 
             total_races = results.total or 0
             wins = results.wins or 0
@@ -0,0 +1,278 @@
+"""Content-addressed cache for training artifacts."""
+import argparse
+import hashlib
+import os
+import shutil
+import time
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, Dict, Optional, Tuple
+import joblib
+import logging
+
+from src.ml.model_registry import hash_file
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = Path("data/cache")
+MAX_CACHE_BYTES = 5 * 1024 ** 3
+ENTRY_SUFFIX = '.joblib'
+
+# (path, mtime, size) -> sha256, so large inputs are hashed once per process
+_fingerprints: Dict[Tuple[str, int, int], str] = {}
+
+
+def file_fingerprint(filepath: Path) -> str:
+    """
+    Content hash of an input file, memoized on path, mtime and size.
+
+    Args:
+        filepath: Data or model file
+
+    Returns:
+        SHA-256 hex digest
+    """
+    filepath = Path(filepath)
+    stat = filepath.stat()
+    memo_key = (str(filepath.resolve()), stat.st_mtime_ns, stat.st_size)
+
+    if memo_key not in _fingerprints:
+        _fingerprints[memo_key] = hash_file(filepath)
+
+    return _fingerprints[memo_key]
+
+
+def code_version(*modules: ModuleType) -> str:
+    """
+    Hash of the source of the modules that produce an artifact.
+
+    Editing any of them changes the version, so stale artifacts are
+    never reused after a code change.
+
+    Args:
+        modules: Imported modules
+
+    Returns:
+        Short hex digest
+    """
+    digest = hashlib.sha256()
+    for module in modules:
+        digest.update(Path(module.__file__).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+class ArtifactCache:
+    """
+    On-disk cache of prepared splits, scalers, models and predictions.
+
+    Entries are addressed by a hash of everything that determines them
+    (input data hash, code version, parameters), so a hit is always safe
+    to reuse and nothing ever needs explicit invalidation. Layout:
+
+        <root>/<kind>/<key>.joblib
+
+    The cache is bounded by total size; when it grows past max_bytes the
+    least recently used entries (by file mtime, refreshed on every hit)
+    are evicted.
+    """
+
+    def __init__(self, root: Path = CACHE_DIR, max_bytes: int = MAX_CACHE_BYTES):
+        """
+        Initialize cache.
+
+        Args:
+            root: Cache directory
+            max_bytes: Size bound enforced after every write
+        """
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(**parts) -> str:
+        """
+        Content address of an artifact.
+
+        Args:
+            parts: Everything the artifact depends on (hashes, versions, params)
+
+        Returns:
+            Hex digest
+        """
+        return joblib.hash(parts)
+
+    def _entry_path(self, kind: str, key: str) -> Path:
+        return self.root / kind / f"{key}{ENTRY_SUFFIX}"
+
+    def get(self, kind: str, key: str, default: Any = None) -> Any:
+        """
+        Look up an artifact.
+
+        Args:
+            kind: Artifact kind, e.g. 'split', 'model', 'predictions'
+            key: Content address (see key)
+            default: Returned on a miss
+
+        Returns:
+            Cached value or default
+        """
+        path = self._entry_path(kind, key)
+
+        try:
+            value = joblib.load(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return default
+        except Exception as e:
+            # Truncated or incompatible entry - drop it and recompute
+            logger.warning(f"Discarding unreadable cache entry {path}: {e}")
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return default
+
+        # Refresh recency for LRU eviction
+        os.utime(path)
+        self.hits += 1
+        logger.info(f"Cache hit: {kind}/{key[:12]}")
+        return value
+
+    def put(self, kind: str, key: str, value: Any) -> Path:
+        """
+        Store an artifact (atomically) and enforce the size bound.
+
+        Args:
+            kind: Artifact kind
+            key: Content address
+            value: Picklable value
+
+        Returns:
+            Entry path
+        """
+        path = self._entry_path(kind, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        tmp_path = path.with_suffix('.tmp')
+        joblib.dump(value, tmp_path)
+        tmp_path.replace(path)
+
+        logger.info(f"Cached {kind}/{key[:12]} ({path.stat().st_size / 1024 ** 2:.1f} MB)")
+        self.evict()
+        return path
+
+    def get_or_compute(self, kind: str, key: str, compute: Callable[[], Any]) -> Any:
+        """
+        Return a cached artifact, computing and storing it on a miss.
+
+        Args:
+            kind: Artifact kind
+            key: Content address
+            compute: Produces the value on a miss
+
+        Returns:
+            Artifact
+        """
+        missing = object()
+        value = self.get(kind, key, default=missing)
+
+        if value is missing:
+            value = compute()
+            self.put(kind, key, value)
+
+        return value
+
+    def _entries(self) -> list:
+        if not self.root.exists():
+            return []
+        return [
+            (path, path.stat())
+            for path in self.root.glob(f"*/*{ENTRY_SUFFIX}")
+        ]
+
+    def size_bytes(self) -> int:
+        """Total size of all entries."""
+        return sum(stat.st_size for _, stat in self._entries())
+
+    def evict(self) -> int:
+        """
+        Remove least recently used entries until the cache fits max_bytes.
+
+        Returns:
+            Number of entries removed
+        """
+        entries = sorted(self._entries(), key=lambda entry: entry[1].st_mtime)
+        total = sum(stat.st_size for _, stat in entries)
+        removed = 0
+
+        for path, stat in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= stat.st_size
+            removed += 1
+
+        if removed:
+            logger.info(f"Evicted {removed} cache entries (now {total / 1024 ** 2:.1f} MB)")
+
+        return removed
+
+    def clear(self):
+        """Delete every entry."""
+        if self.root.exists():
+            shutil.rmtree(self.root)
+        logger.info(f"Cleared cache {self.root}")
+
+    def stats(self) -> Dict[str, dict]:
+        """
+        Entry count, size and age of the oldest entry per kind.
+
+        Returns:
+            Dictionary of {kind: {'entries', 'mb', 'oldest_hours'}}
+        """
+        now = time.time()
+        stats = {}
+
+        for path, stat in self._entries():
+            kind = stats.setdefault(path.parent.name, {'entries': 0, 'mb': 0.0, 'oldest_hours': 0.0})
+            kind['entries'] += 1
+            kind['mb'] += stat.st_size / 1024 ** 2
+            kind['oldest_hours'] = max(kind['oldest_hours'], (now - stat.st_mtime) / 3600)
+
+        return stats
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Inspect or clear the training artifact cache")
+    parser.add_argument("--root", type=str, default=str(CACHE_DIR), help="Cache directory")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("stats", help="Show entries per artifact kind")
+    subparsers.add_parser("clear", help="Delete all entries")
+
+    evict_parser = subparsers.add_parser("evict", help="Evict down to a size bound")
+    evict_parser.add_argument("--max-gb", type=float, default=MAX_CACHE_BYTES / 1024 ** 3)
+
+    args = parser.parse_args()
+    cache = ArtifactCache(Path(args.root))
+
+    if args.command == "stats":
+        stats = cache.stats()
+        for kind, info in sorted(stats.items()):
+            print(f"{kind:16s} {info['entries']:6d} entries {info['mb']:10.1f} MB  "
+                  f"oldest {info['oldest_hours']:.1f}h")
+        print(f"{'total':16s} {sum(i['entries'] for i in stats.values()):6d} entries "
+              f"{cache.size_bytes() / 1024 ** 2:10.1f} MB")
+
+    elif args.command == "clear":
+        cache.clear()
+        print(f"✓ Cleared {cache.root}")
+
+    elif args.command == "evict":
+        cache.max_bytes = int(args.max_gb * 1024 ** 3)
+        removed = cache.evict()
+        print(f"✓ Evicted {removed} entries")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
 """Compare all models."""
+import argparse
+import sys
 from pathlib import Path
+from typing import Iterable, Optional
 import pandas as pd
 from src.utils.logger import setup_logging
 
+from src.ml.artifact_cache import ArtifactCache, code_version
 from src.ml.data_preparation import DataPreparation
 from src.ml.baseline_model import BaselineModel
 from src.ml.random_forest_model import RandomForestModel
@@ -10,18 +14,60 @@ from src.ml.xgboost_model import XGBoostModel
 from src.ml.evaluation import ModelEvaluator
 
 
-def compare_all_models():
-    """Train and compare all models."""
+def train_cached(cache: ArtifactCache, data_key: str, model, X_train, y_train):
+    """
+    Train a model wrapper, or reuse the one trained on the same split and parameters.
+
+    Args:
+        cache: Artifact cache
+        data_key: Prepared split key (DataPreparation.data_key)
+        model: Untrained BaselineModel / RandomForestModel / XGBoostModel
+        X_train: Training features
+        y_train: Training targets
+
+    Returns:
+        Trained model wrapper
+    """
+    key = ArtifactCache.key(
+        data=data_key,
+        model=type(model).__name__,
+        params=model.model.get_params(),
+        use_smote=model.use_smote,
+        code=code_version(sys.modules[type(model).__module__])
+    )
+
+    def train():
+        model.train(X_train, y_train)
+        return model
+
+    return cache.get_or_compute('model', key, train)
+
+
+def compare_all_models(use_cache: bool = True, feature_set: Optional[Iterable[str]] = None):
+    """
+    Train and compare all models.
+
+    Args:
+        use_cache: Reuse prepared data and trained models from data/cache
+        feature_set: Train on these features only (None = all, see resolve_feature_set)
+    """
     setup_logging("model_comparison")
+    cache = ArtifactCache() if use_cache else None
 
     # Prepare data
     print("\n" + "=" * 80)
     print("PREPARING DATA")
     print("=" * 80)
 
-    data_prep = DataPreparation()
+    data_prep = DataPreparation(feature_set=feature_set)
     data_path = Path("data/processed/features_complete.csv")
-    data = data_prep.prepare_ml_data(data_path, train_ratio=0.8, scale=True)
+    data = data_prep.prepare_ml_data(data_path, train_ratio=0.8, scale=True, cache=cache)
+
+    def fit(model):
+        if cache is None:
+            model.train(data['X_train'], data['y_train'])
+            return model
+        return train_cached(cache, data_prep.data_key, model, data['X_train'], data['y_train'])
 
     results = {}
 
@@ -30,8 +76,7 @@ def compare_all_models():
     print("1. TRAINING LOGISTIC REGRESSION")
     print("=" * 80)
 
-    lr_model = BaselineModel(use_smote=True, class_weight='balanced')
-    lr_model.train(data['X_train'], data['y_train'])
+    lr_model = fit(BaselineModel(use_smote=True, class_weight='balanced'))
     results['Logistic Regression'] = lr_model.evaluate(data['X_test'], data['y_test'])
 
     # 2. Random Forest
@@ -39,13 +84,12 @@ def compare_all_models():
     print("2. TRAINING RANDOM FOREST")
     print("=" * 80)
 
-    rf_model = RandomForestModel(
+    rf_model = fit(RandomForestModel(
         n_estimators=100,
         max_depth=10,
         use_smote=True,
         class_weight='balanced'
-    )
-    rf_model.train(data['X_train'], data['y_train'])
+    ))
     results['Random Forest'] = rf_model.evaluate(data['X_test'], data['y_test'])
 
     # 3. XGBoost
@@ -53,13 +97,12 @@ def compare_all_models():
     print("3. TRAINING XGBOOST")
     print("=" * 80)
 
-    xgb_model = XGBoostModel(
+    xgb_model = fit(XGBoostModel(
         n_estimators=100,
         max_depth=6,
         learning_rate=0.1,
         use_smote=True
-    )
-    xgb_model.train(data['X_train'], data['y_train'])
+    ))
     results['XGBoost'] = xgb_model.evaluate(data['X_test'], data['y_test'])
 
     # Compare models
@@ -85,5 +128,24 @@ def compare_all_models():
     return results, comparison_df
 
 
+def main():
+    """Main entry point."""
+    from src.features.feature_builder import resolve_feature_set
+
+    parser = argparse.ArgumentParser(description="Train and compare all models")
+    parser.add_argument("--feature-set", type=str,
+                        help="Feature set JSON (default: models/feature_set.json if it exists)")
+    parser.add_argument("--all-features", action="store_true", help="Train on every feature, ignoring any feature set")
+    parser.add_argument("--no-cache", action="store_true", help="Retrain everything")
+
+    args = parser.parse_args()
+    compare_all_models(
+        use_cache=not args.no_cache,
+        feature_set=resolve_feature_set(
+            Path(args.feature_set) if args.feature_set else None, args.all_features
+        )
+    )
+
+
 if __name__ == "__main__":
-    compare_all_models()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,453 @@
+"""Walk-forward cross-validation for time-ordered race data."""
+import math
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import roc_auc_score
+from sklearn.preprocessing import StandardScaler
+from imblearn.over_sampling import SMOTE
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class WalkForwardSplit:
+    """
+    Walk-forward splitter grouped by race.
+
+    Races are ordered by their order key (meet date, or meet_id as a
+    chronological proxy) and cut into n_splits + 1 contiguous blocks.
+    Fold k validates on block k + 1 and trains on the blocks before it,
+    so no runner from a race is ever split across train and validation
+    and no fold trains on the future.
+    """
+
+    def __init__(
+            self,
+            n_splits: int = 5,
+            window: str = 'expanding',
+            max_train_blocks: Optional[int] = None,
+            gap: int = 0
+    ):
+        """
+        Initialize splitter.
+
+        Args:
+            n_splits: Number of folds
+            window: 'expanding' (all earlier blocks) or 'sliding'
+            max_train_blocks: Blocks in a sliding training window (default 2)
+            gap: Blocks skipped between training and validation
+        """
+        if window not in ('expanding', 'sliding'):
+            raise ValueError(f"Unknown window: {window}")
+
+        self.n_splits = n_splits
+        self.window = window
+        self.max_train_blocks = max_train_blocks or 2
+        self.gap = gap
+
+    def get_n_splits(self, X=None, y=None, groups=None) -> int:
+        """Number of folds."""
+        return self.n_splits
+
+    def split(
+            self,
+            X,
+            y=None,
+            groups: Optional[np.ndarray] = None,
+            order: Optional[np.ndarray] = None
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Generate train/validation row indices.
+
+        Args:
+            X: Features (only the length is used)
+            y: Unused
+            groups: Race ID per row (default: every row is its own group)
+            order: Chronological key per row (default: groups)
+
+        Yields:
+            Tuples of (train_idx, val_idx), train_idx in chronological order
+        """
+        n_rows = len(X)
+        groups = np.arange(n_rows) if groups is None else np.asarray(groups)
+        order = groups if order is None else np.asarray(order)
+
+        # Order races by (order key, race) and map every row to its race's rank
+        race_frame = pd.DataFrame({'group': groups, 'order': order})
+        race_order = race_frame.groupby('group')['order'].min().reset_index()
+        race_order = race_order.sort_values(['order', 'group'])
+
+        n_blocks = self.n_splits + 1 + self.gap
+        if len(race_order) < n_blocks:
+            raise ValueError(
+                f"Cannot make {self.n_splits} folds from {len(race_order)} races"
+            )
+
+        race_rank = pd.Series(np.arange(len(race_order)), index=race_order['group'].values)
+        row_rank = race_rank.reindex(groups).values
+        row_block = row_rank * n_blocks // len(race_order)
+
+        for k in range(self.n_splits):
+            val_block = k + 1 + self.gap
+            train_end = k + 1
+            train_start = 0 if self.window == 'expanding' else max(0, train_end - self.max_train_blocks)
+
+            train_idx = np.flatnonzero((row_block >= train_start) & (row_block < train_end))
+            val_idx = np.flatnonzero(row_block == val_block)
+
+            # Chronological row order, so callers can slice off recent data
+            train_idx = train_idx[np.argsort(row_rank[train_idx], kind='stable')]
+
+            yield train_idx, val_idx
+
+
+class FoldCache:
+    """
+    Preprocessed walk-forward folds, built once and shared by every
+    candidate parameter set.
+
+    Each fold's scaler is fit on its training rows only. Training views
+    (the full window, or its most recent fraction with an optional
+    early-stopping tail) are SMOTE-resampled on first request and then
+    memoized. Arrays are contiguous numpy buffers so joblib can
+    memory-map them into workers.
+    """
+
+    def __init__(
+            self,
+            X,
+            y,
+            splitter: WalkForwardSplit,
+            groups: Optional[np.ndarray] = None,
+            order: Optional[np.ndarray] = None,
+            scale: bool = True,
+            use_smote: bool = False,
+            random_state: int = 42
+    ):
+        """
+        Build and cache fold data.
+
+        Args:
+            X: Training features
+            y: Training targets
+            splitter: WalkForwardSplit instance
+            groups: Race ID per row
+            order: Chronological key per row
+            scale: Fit a StandardScaler per fold
+            use_smote: Apply SMOTE to each fold's training rows
+            random_state: Random seed for SMOTE
+        """
+        # Keep float32 input (lean DataPreparation) as float32
+        X = np.asarray(X)
+        X = np.ascontiguousarray(X, dtype=X.dtype if X.dtype == np.float32 else np.float64)
+        y = np.asarray(y)
+
+        self.use_smote = use_smote
+        self.random_state = random_state
+
+        # Scaled, still time-ordered fold arrays
+        self._base: List[Dict[str, np.ndarray]] = []
+        self._views: Dict[Tuple[int, float, float], Dict[str, np.ndarray]] = {}
+
+        for train_idx, val_idx in splitter.split(X, y, groups=groups, order=order):
+            X_train, y_train = X[train_idx], y[train_idx]
+            X_val, y_val = X[val_idx], y[val_idx]
+
+            if scale:
+                scaler = StandardScaler().fit(X_train)
+                X_train = scaler.transform(X_train)
+                X_val = scaler.transform(X_val)
+
+            self._base.append({
+                'X_train': np.ascontiguousarray(X_train),
+                'y_train': y_train,
+                'X_val': np.ascontiguousarray(X_val),
+                'y_val': y_val,
+            })
+
+        logger.info(
+            f"Prepared {len(self._base)} walk-forward folds "
+            f"(train sizes: {[len(f['y_train']) for f in self._base]})"
+        )
+
+    def __len__(self) -> int:
+        return len(self._base)
+
+    def get(
+            self,
+            fold: int,
+            fraction: float = 1.0,
+            early_stopping_fraction: float = 0.0
+    ) -> Dict[str, np.ndarray]:
+        """
+        Get a (memoized) training view of one fold.
+
+        Args:
+            fold: Fold index
+            fraction: Keep only the most recent fraction of training rows
+            early_stopping_fraction: Hold out the latest share of those
+                rows as X_es/y_es for boosting early stopping
+
+        Returns:
+            Dictionary with X_train, y_train, X_val, y_val (and X_es, y_es)
+        """
+        key = (fold, round(fraction, 6), round(early_stopping_fraction, 6))
+        if key in self._views:
+            return self._views[key]
+
+        base = self._base[fold]
+        X_train, y_train = base['X_train'], base['y_train']
+
+        # Rows are time-ordered, so the tail is the most recent data
+        start = len(y_train) - max(1, int(len(y_train) * fraction))
+        X_train, y_train = X_train[start:], y_train[start:]
+
+        view = {'X_val': base['X_val'], 'y_val': base['y_val']}
+
+        if early_stopping_fraction > 0:
+            split = len(y_train) - max(1, int(len(y_train) * early_stopping_fraction))
+            view['X_es'] = np.ascontiguousarray(X_train[split:])
+            view['y_es'] = y_train[split:]
+            X_train, y_train = X_train[:split], y_train[:split]
+
+        if self.use_smote:
+            X_train, y_train = SMOTE(random_state=self.random_state).fit_resample(X_train, y_train)
+
+        view['X_train'] = np.ascontiguousarray(X_train)
+        view['y_train'] = np.asarray(y_train)
+
+        self._views[key] = view
+        return view
+
+
+def _fit_and_score(
+        estimator,
+        params: dict,
+        fold: Dict[str, np.ndarray],
+        early_stopping_rounds: Optional[int] = None
+) -> Tuple[float, float, Optional[int]]:
+    """
+    Fit one candidate on one cached fold.
+
+    Returns:
+        Tuple of (validation ROC-AUC, fit seconds, best boosting iteration)
+    """
+    model = clone(estimator).set_params(**params)
+
+    start = time.perf_counter()
+    if early_stopping_rounds and 'X_es' in fold:
+        model.set_params(early_stopping_rounds=early_stopping_rounds)
+        model.fit(
+            fold['X_train'], fold['y_train'],
+            eval_set=[(fold['X_es'], fold['y_es'])],
+            verbose=False
+        )
+    else:
+        model.fit(fold['X_train'], fold['y_train'])
+    fit_time = time.perf_counter() - start
+
+    best_iteration = getattr(model, 'best_iteration', None) if early_stopping_rounds else None
+
+    y_val = fold['y_val']
+    if len(np.unique(y_val)) < 2:
+        return np.nan, fit_time, best_iteration
+
+    score = roc_auc_score(y_val, model.predict_proba(fold['X_val'])[:, 1])
+    return score, fit_time, best_iteration
+
+
+def _single_threaded(estimator, n_jobs: int):
+    """Clone estimator, forcing n_jobs=1 when the search itself runs in parallel."""
+    base = clone(estimator)
+    if n_jobs != 1 and 'n_jobs' in base.get_params():
+        base.set_params(n_jobs=1)
+    return base
+
+
+def walk_forward_search(
+        estimator,
+        candidates: List[dict],
+        folds: FoldCache,
+        n_jobs: int = -1,
+        verbose: int = 1
+) -> dict:
+    """
+    Score every candidate on every cached fold.
+
+    (candidate, fold) pairs run in parallel. When running more than one
+    job, estimators that expose n_jobs are fitted single-threaded so the
+    workers do not oversubscribe the CPU.
+
+    Args:
+        estimator: Unfitted base estimator
+        candidates: Parameter dictionaries to evaluate
+        folds: Preprocessed folds
+        n_jobs: Parallel jobs (-1 = all cores)
+        verbose: joblib verbosity
+
+    Returns:
+        cv_results dictionary in the GridSearchCV layout, plus
+        'best_index', 'best_params' and 'best_score'
+
+    Raises:
+        ValueError: If no candidate could be scored on any fold
+    """
+    base = _single_threaded(estimator, n_jobs)
+
+    tasks = [(c, f) for c in range(len(candidates)) for f in range(len(folds))]
+
+    outputs = Parallel(n_jobs=n_jobs, verbose=verbose)(
+        delayed(_fit_and_score)(base, candidates[c], folds.get(f))
+        for c, f in tasks
+    )
+
+    scores = np.full((len(candidates), len(folds)), np.nan)
+    fit_times = np.zeros((len(candidates), len(folds)))
+    for (c, f), (score, fit_time, _) in zip(tasks, outputs):
+        scores[c, f] = score
+        fit_times[c, f] = fit_time
+
+    mean_scores = np.nanmean(scores, axis=1)
+    ranking = pd.Series(mean_scores).rank(ascending=False, method='min', na_option='bottom')
+
+    cv_results = {
+        'params': candidates,
+        'mean_test_score': mean_scores,
+        'std_test_score': np.nanstd(scores, axis=1),
+        'rank_test_score': ranking.astype(int).values,
+        'mean_fit_time': fit_times.mean(axis=1),
+    }
+    for f in range(len(folds)):
+        cv_results[f'split{f}_test_score'] = scores[:, f]
+
+    if np.all(np.isnan(mean_scores)):
+        # Every validation window held a single class, so ROC-AUC is undefined
+        raise ValueError(
+            f"No fold produced a score: all {len(folds)} validation windows "
+            f"contain a single class; use fewer folds or a wider time range"
+        )
+
+    best_index = int(np.nanargmax(mean_scores))
+    cv_results['best_index'] = best_index
+    cv_results['best_params'] = candidates[best_index]
+    cv_results['best_score'] = mean_scores[best_index]
+
+    return cv_results
+
+
+def successive_halving_search(
+        estimator,
+        candidates: List[dict],
+        folds: FoldCache,
+        eta: int = 3,
+        min_fraction: Optional[float] = None,
+        resource_param: Optional[str] = 'n_estimators',
+        early_stopping_rounds: Optional[int] = None,
+        early_stopping_fraction: float = 0.1,
+        n_jobs: int = -1,
+        verbose: int = 1
+) -> dict:
+    """
+    Successive-halving search over the walk-forward folds.
+
+    Every candidate starts on the most recent min_fraction of each fold's
+    training rows; after each rung only the best 1/eta survive and the
+    budget grows eta-fold until the last rung uses the full window.
+    Without early stopping, resource_param (tree count) is scaled by the
+    same budget. With early_stopping_rounds, boosting rounds are cut by
+    early stopping on the latest early_stopping_fraction of the training
+    window instead, and the best candidate's n_estimators is set to the
+    mean stopping iteration of its final rung.
+
+    Args:
+        estimator: Unfitted base estimator
+        candidates: Parameter dictionaries to evaluate
+        folds: Preprocessed folds
+        eta: Halving rate
+        min_fraction: Budget of the first rung (default eta^-(rungs-1))
+        resource_param: Estimator parameter scaled with the budget (None = data only)
+        early_stopping_rounds: Boosting early-stopping patience (XGBoost)
+        early_stopping_fraction: Share of each training window used for early stopping
+        n_jobs: Parallel jobs (-1 = all cores)
+        verbose: joblib verbosity
+
+    Returns:
+        Dictionary with 'rungs' (per-rung candidates, budget and mean
+        scores), 'best_params', 'best_score' and 'n_fits'
+    """
+    base = _single_threaded(estimator, n_jobs)
+    base_params = base.get_params()
+
+    n_rungs = int(math.floor(math.log(max(len(candidates), 1), eta))) + 1
+    if min_fraction is None:
+        min_fraction = float(eta) ** -(n_rungs - 1)
+
+    es_fraction = early_stopping_fraction if early_stopping_rounds else 0.0
+    scale_resource = (
+        resource_param is not None
+        and resource_param in base_params
+        and not early_stopping_rounds
+    )
+
+    survivors = list(range(len(candidates)))
+    rungs = []
+    n_fits = 0
+
+    for rung in range(n_rungs):
+        fraction = 1.0 if rung == n_rungs - 1 else min(1.0, min_fraction * eta ** rung)
+
+        rung_params = []
+        for c in survivors:
+            params = dict(candidates[c])
+            if scale_resource:
+                full = params.get(resource_param, base_params[resource_param])
+                params[resource_param] = max(10, int(round(full * fraction)))
+            rung_params.append(params)
+
+        tasks = [(i, f) for i in range(len(survivors)) for f in range(len(folds))]
+        outputs = Parallel(n_jobs=n_jobs, verbose=verbose)(
+            delayed(_fit_and_score)(
+                base, rung_params[i], folds.get(f, fraction, es_fraction), early_stopping_rounds
+            )
+            for i, f in tasks
+        )
+        n_fits += len(tasks)
+
+        scores = np.full((len(survivors), len(folds)), np.nan)
+        iterations = np.full((len(survivors), len(folds)), np.nan)
+        for (i, f), (score, _, best_iteration) in zip(tasks, outputs):
+            scores[i, f] = score
+            if best_iteration is not None:
+                iterations[i, f] = best_iteration
+
+        mean_scores = np.nan_to_num(np.nanmean(scores, axis=1), nan=-np.inf)
+        rungs.append({
+            'fraction': fraction,
+            'candidates': [candidates[c] for c in survivors],
+            'mean_test_score': mean_scores,
+        })
+        logger.info(
+            f"Rung {rung}: {len(survivors)} candidates on {fraction:.0%} of data, "
+            f"best ROC-AUC {mean_scores.max():.4f}"
+        )
+
+        keep = max(1, int(math.ceil(len(survivors) / eta)))
+        ranked = np.argsort(-mean_scores, kind='stable')
+        best_i = int(ranked[0])
+        best_iterations = iterations[best_i]
+        survivors = [survivors[i] for i in ranked[:keep]]
+
+    best_params = dict(candidates[survivors[0]])
+    if early_stopping_rounds and not np.all(np.isnan(best_iterations)):
+        best_params['n_estimators'] = int(np.nanmean(best_iterations)) + 1
+
+    return {
+        'rungs': rungs,
+        'best_params': best_params,
+        'best_score': float(rungs[-1]['mean_test_score'][best_i]),
+        'n_fits': n_fits,
+    }
@@ -1,24 +1,62 @@
 """Data preparation for ML models."""
+import sys
 import pandas as pd
 import numpy as np
 from datetime import date
 from pathlib import Path
-from typing import Tuple, List, Optional
+from typing import Iterable, Tuple, List, Optional
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 import logging
 
+from src.ml.artifact_cache import ArtifactCache, code_version, file_fingerprint
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
 logger = logging.getLogger(__name__)
 
+# Identifier and target columns (never features, never downcast)
+NON_FEATURE_COLUMNS = [
+    'runner_id', 'race_id', 'meet_id', 'race_date',
+    'target_win', 'target_finish_position'
+]
+
+# Column dtypes treated as features (float32/uint8 come from lean mode)
+FEATURE_DTYPES = ['float64', 'int64', 'float32', 'uint8']
+
+
+def peak_memory_mb() -> Optional[float]:
+    """Peak resident memory of this process in MB (None if unavailable)."""
+    if resource is None:
+        return None
+    # ru_maxrss is in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
 
 class DataPreparation:
     """Prepare data for ML models."""
 
-    def __init__(self):
-        """Initialize data preparation."""
-        self.scaler = StandardScaler()
+    def __init__(self, feature_set: Optional[Iterable[str]] = None, lean: bool = False):
+        """
+        Initialize data preparation.
+
+        Args:
+            feature_set: Restrict features to this pruned set (None = all)
+            lean: Memory-lean mode - features are read as float32 (0/1
+                flags as uint8), rows are filtered and sorted in place,
+                splits are row views and scaling happens in place. Tree
+                models train on float32 internally, so results match.
+        """
+        self.lean = lean
+        self.scaler = StandardScaler(copy=not lean)
         self.feature_columns = None
         self.target_column = 'target_win'
+        self.feature_set = set(feature_set) if feature_set is not None else None
+        self.memory_report = {}
+        self.data_key = None
 
     def load_data(self, filepath: Path) -> pd.DataFrame:
         """
@@ -31,8 +69,47 @@ class DataPreparation:
             DataFrame with features
         """
         logger.info(f"Loading data from {filepath}")
-        df = pd.read_csv(filepath)
-        logger.info(f"Loaded {len(df)} rows, {len(df.columns)} columns")
+
+        if self.lean:
+            df = pd.read_csv(filepath, dtype=self._lean_dtypes(filepath))
+            df = self.downcast_flags(df)
+        else:
+            df = pd.read_csv(filepath)
+
+        logger.info(f"Loaded {len(df)} rows, {len(df.columns)} columns "
+                    f"({df.memory_usage().sum() / 1024 ** 2:.1f} MB)")
+        return df
+
+    def _lean_dtypes(self, filepath: Path, sample_rows: int = 1000) -> dict:
+        """float32 for every numeric feature column, inferred from a sample."""
+        sample = pd.read_csv(filepath, nrows=sample_rows)
+        return {
+            col: np.float32 for col in sample.columns
+            if col not in NON_FEATURE_COLUMNS and pd.api.types.is_numeric_dtype(sample[col])
+        }
+
+    def downcast_flags(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Store 0/1 feature columns (one-hot encodings, flags) as uint8.
+
+        Args:
+            df: DataFrame (modified in place)
+
+        Returns:
+            The same DataFrame
+        """
+        flags = []
+        for col in df.columns:
+            if col in NON_FEATURE_COLUMNS or df[col].dtype != np.float32:
+                continue
+            values = df[col].values
+            if not np.isnan(values).any() and np.isin(values, (0.0, 1.0)).all():
+                flags.append(col)
+
+        if flags:
+            df[flags] = df[flags].astype(np.uint8)
+            logger.info(f"Stored {len(flags)} flag columns as uint8")
+
         return df
 
     def filter_complete_data(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -46,7 +123,12 @@ class DataPreparation:
             DataFrame with only complete data (target_win >= 0)
         """
         # Remove rows without results (target_win = -1)
-        complete_df = df[df['target_win'] >= 0].copy()
+        if self.lean:
+            # Drop in place instead of keeping a filtered copy alongside
+            df.drop(index=df.index[df['target_win'] < 0], inplace=True)
+            complete_df = df
+        else:
+            complete_df = df[df['target_win'] >= 0].copy()
 
         logger.info(f"Filtered to {len(complete_df)} runners with results")
         logger.info(f"  Wins: {(complete_df['target_win'] == 1).sum()}")
@@ -64,18 +146,15 @@ class DataPreparation:
         Returns:
             List of feature column names
         """
-        # Columns to exclude
-        exclude_cols = [
-            'runner_id', 'race_id', 'meet_id',
-            'target_win', 'target_finish_position'
-        ]
-
-        # Get all numeric columns except excluded ones
+        # Get all numeric columns except IDs and targets
         feature_cols = [
             col for col in df.columns
-            if col not in exclude_cols and df[col].dtype in ['float64', 'int64']
+            if col not in NON_FEATURE_COLUMNS and df[col].dtype in FEATURE_DTYPES
         ]
 
+        if self.feature_set is not None:
+            feature_cols = [col for col in feature_cols if col in self.feature_set]
+
         logger.info(f"Selected {len(feature_cols)} feature columns")
         return feature_cols
 
@@ -89,14 +168,19 @@ class DataPreparation:
         Returns:
             DataFrame with missing values handled
         """
-        # Fill numeric missing values with median
-        numeric_cols = df.select_dtypes(include=['float64', 'int64']).columns
+        # Fill numeric missing values with median (one pass over all columns)
+        numeric_cols = df.select_dtypes(include=FEATURE_DTYPES).columns
+        missing = df[numeric_cols].isnull().any()
+        missing_cols = missing.index[missing]
+
+        if len(missing_cols) == 0:
+            return df
 
-        for col in numeric_cols:
-            if df[col].isnull().sum() > 0:
-                median_val = df[col].median()
-                df[col].fillna(median_val, inplace=True)
-                logger.info(f"Filled {col} missing values with median: {median_val:.4f}")
+        medians = df[missing_cols].median()
+        df.fillna(medians, inplace=True)
+
+        for col, median_val in medians.items():
+            logger.info(f"Filled {col} missing values with median: {median_val:.4f}")
 
         return df
 
@@ -119,13 +203,22 @@ class DataPreparation:
             Tuple of (train_df, test_df)
         """
         # Sort by race_id (which is chronological from database)
-        df_sorted = df.sort_values('race_id').reset_index(drop=True)
+        if self.lean:
+            df.sort_values('race_id', inplace=True, ignore_index=True)
+            df_sorted = df
+        else:
+            df_sorted = df.sort_values('race_id').reset_index(drop=True)
 
         # Calculate split point
         split_idx = int(len(df_sorted) * train_ratio)
 
-        train_df = df_sorted.iloc[:split_idx].copy()
-        test_df = df_sorted.iloc[split_idx:].copy()
+        if self.lean:
+            # Row views of the sorted frame - treat as read-only
+            train_df = df_sorted.iloc[:split_idx]
+            test_df = df_sorted.iloc[split_idx:]
+        else:
+            train_df = df_sorted.iloc[:split_idx].copy()
+            test_df = df_sorted.iloc[split_idx:].copy()
 
         logger.info(f"Time-based split:")
         logger.info(f"  Training set: {len(train_df)} runners")
@@ -152,6 +245,20 @@ class DataPreparation:
         Returns:
             Tuple of (X, y)
         """
+        if self.lean:
+            # One float32 matrix; later scaling reuses it in place
+            X = pd.DataFrame(
+                df[feature_columns].to_numpy(dtype=np.float32),
+                columns=feature_columns,
+                index=df.index
+            )
+            y = pd.Series(
+                df['target_win'].to_numpy(dtype=np.int8),
+                index=df.index,
+                name='target_win'
+            )
+            return X, y
+
         X = df[feature_columns].copy()
         y = df['target_win'].copy()
 
@@ -199,7 +306,8 @@ class DataPreparation:
             self,
             filepath: Path,
             train_ratio: float = 0.8,
-            scale: bool = True
+            scale: bool = True,
+            cache: Optional[ArtifactCache] = None
     ) -> dict:
         """
         Complete data preparation pipeline.
@@ -208,6 +316,9 @@ class DataPreparation:
             filepath: Path to feature CSV
             train_ratio: Train/test split ratio
             scale: Whether to scale features
+            cache: Reuse the prepared split and fitted scaler when the file,
+                options and this module's code are unchanged (the cache
+                key is kept in self.data_key for downstream artifacts)
 
         Returns:
             Dictionary with prepared data:
@@ -216,9 +327,36 @@ class DataPreparation:
                 'X_test': Test features,
                 'y_train': Training targets,
                 'y_test': Test targets,
-                'feature_columns': List of feature names
+                'feature_columns': List of feature names,
+                'train_race_ids': Race ID per training row (CV grouping),
+                'train_meet_ids': Meet ID per training row (CV ordering)
             }
         """
+        self.data_key = ArtifactCache.key(
+            data=file_fingerprint(filepath),
+            code=code_version(sys.modules[__name__]),
+            train_ratio=train_ratio,
+            scale=scale,
+            lean=self.lean,
+            feature_set=sorted(self.feature_set) if self.feature_set is not None else None
+        )
+
+        if cache is not None:
+            cached = cache.get('split', self.data_key)
+            if cached is not None:
+                self.scaler = cached['scaler']
+                self.feature_columns = cached['data']['feature_columns']
+                return cached['data']
+
+        data = self._prepare_ml_data(filepath, train_ratio, scale)
+
+        if cache is not None:
+            cache.put('split', self.data_key, {'data': data, 'scaler': self.scaler})
+
+        return data
+
+    def _prepare_ml_data(self, filepath: Path, train_ratio: float, scale: bool) -> dict:
+        """Uncached prepare_ml_data."""
         # Load data
         df = self.load_data(filepath)
 
@@ -243,15 +381,26 @@ class DataPreparation:
         if scale:
             X_train, X_test = self.scale_features(X_train, X_test, fit=True)
 
+        self.memory_report = {
+            'feature_matrix_mb': (X_train.memory_usage().sum() + X_test.memory_usage().sum()) / 1024 ** 2,
+            'peak_rss_mb': peak_memory_mb(),
+        }
+
         logger.info(f"Data preparation complete")
         logger.info(f"  Features: {len(feature_columns)}")
         logger.info(f"  Training samples: {len(X_train)}")
         logger.info(f"  Test samples: {len(X_test)}")
+        logger.info(f"  Feature matrices: {self.memory_report['feature_matrix_mb']:.1f} MB")
+        if self.memory_report['peak_rss_mb'] is not None:
+            logger.info(f"  Peak memory: {self.memory_report['peak_rss_mb']:.1f} MB")
 
         return {
             'X_train': X_train,
             'X_test': X_test,
             'y_train': y_train,
             'y_test': y_test,
-            'feature_columns': feature_columns
+            'feature_columns': feature_columns,
+            # Copies, so the (lean) source frame can be freed
+            'train_race_ids': train_df['race_id'].to_numpy(copy=True),
+            'train_meet_ids': train_df['meet_id'].to_numpy(copy=True)
         }
\ No newline at end of file
@@ -3,9 +3,14 @@ import numpy as np
 import pandas as pd
 from pathlib import Path
 import joblib
+from joblib import Parallel, delayed
+from sklearn.base import clone
 from sklearn.ensemble import VotingClassifier
+from sklearn.linear_model import LogisticRegression
+from src.ml.cross_validation import WalkForwardSplit
 from src.ml.data_preparation import DataPreparation
 from src.ml.evaluation import ModelEvaluator
+from src.ml.model_artifacts import load_model_file
 from src.utils.logger import setup_logging
 import logging
 
@@ -87,8 +92,189 @@ class EnsembleModel:
         logger.info(f"Saved ensemble to {filepath}")
 
 
-def load_tuned_models(models_dir: Path) -> dict:
-    """Load tuned models from disk."""
+class StackingEnsemble:
+    """
+    Stacking ensemble over already-tuned base models.
+
+    Base models are not re-fitted for inference: the tuned models from
+    load_tuned_models are used as-is. Out-of-fold predictions for the
+    meta-learner come from walk-forward folds (so every OOF prediction
+    is made by a model trained only on earlier races) and are cached on
+    disk per base model, keyed by a hash of the data and parameters.
+    Training the ensemble is then just fitting a logistic regression on
+    a few columns.
+    """
+
+    def __init__(
+            self,
+            models_dict: dict,
+            cache_dir: Path = Path("models/ensemble/oof"),
+            n_splits: int = 5,
+            n_jobs: int = -1
+    ):
+        """
+        Initialize stacking ensemble.
+
+        Args:
+            models_dict: Dictionary of {name: fitted model}
+            cache_dir: Directory for cached out-of-fold predictions
+            n_splits: Walk-forward folds used for out-of-fold predictions
+            n_jobs: Parallel jobs for out-of-fold fitting
+        """
+        self.models_dict = models_dict
+        self.model_names = list(models_dict.keys())
+        self.cache_dir = Path(cache_dir)
+        self.splitter = WalkForwardSplit(n_splits=n_splits)
+        self.n_jobs = n_jobs
+
+        self.meta_learner = LogisticRegression(max_iter=1000)
+        self.evaluator = ModelEvaluator()
+
+    def _oof_for_model(self, name: str, X: np.ndarray, y: np.ndarray, splits: list) -> np.ndarray:
+        """
+        Out-of-fold probabilities for one base model (cached on disk).
+
+        Rows in the first walk-forward block are never validated and stay NaN.
+        """
+        model = self.models_dict[name]
+        fingerprint = joblib.hash((X, y, splits, type(model).__name__, model.get_params()))
+        cache_path = self.cache_dir / f"{name.lower().replace(' ', '_')}_oof.npz"
+
+        if cache_path.exists():
+            cached = np.load(cache_path)
+            if str(cached['fingerprint']) == fingerprint:
+                logger.info(f"Using cached out-of-fold predictions for {name}")
+                return cached['oof']
+
+        logger.info(f"Computing out-of-fold predictions for {name} ({len(splits)} folds)")
+
+        base = clone(model)
+        if self.n_jobs != 1 and 'n_jobs' in base.get_params():
+            base.set_params(n_jobs=1)
+
+        fold_probas = Parallel(n_jobs=self.n_jobs)(
+            delayed(_fit_predict_fold)(base, X, y, train_idx, val_idx)
+            for train_idx, val_idx in splits
+        )
+
+        oof = np.full(len(y), np.nan)
+        for (_, val_idx), proba in zip(splits, fold_probas):
+            oof[val_idx] = proba
+
+        self.cache_dir.mkdir(exist_ok=True, parents=True)
+        np.savez(cache_path, oof=oof, fingerprint=fingerprint)
+
+        return oof
+
+    def compute_oof_predictions(self, X_train, y_train, groups=None, order=None) -> np.ndarray:
+        """
+        Out-of-fold probability matrix, one column per base model.
+
+        Args:
+            X_train: Training features
+            y_train: Training targets
+            groups: Race ID per row
+            order: Chronological key per row
+
+        Returns:
+            Array of shape (n_rows, n_models), NaN where no fold covers a row
+        """
+        X = np.ascontiguousarray(np.asarray(X_train, dtype=np.float64))
+        y = np.asarray(y_train)
+        splits = list(self.splitter.split(X, y, groups=groups, order=order))
+
+        return np.column_stack([
+            self._oof_for_model(name, X, y, splits) for name in self.model_names
+        ])
+
+    def train(self, X_train, y_train, groups=None, order=None):
+        """
+        Train the meta-learner on out-of-fold base predictions.
+
+        Args:
+            X_train: Training features
+            y_train: Training targets
+            groups: Race ID per row (walk-forward grouping)
+            order: Chronological key per row
+        """
+        logger.info("Training stacking ensemble...")
+        logger.info(f"  Models: {self.model_names}")
+
+        oof = self.compute_oof_predictions(X_train, y_train, groups, order)
+        covered = ~np.isnan(oof).any(axis=1)
+
+        self.meta_learner.fit(oof[covered], np.asarray(y_train)[covered])
+
+        weights = dict(zip(self.model_names, np.round(self.meta_learner.coef_[0], 3)))
+        logger.info(f"  Meta-learner rows: {covered.sum()}, weights: {weights}")
+        logger.info("✓ Stacking ensemble trained")
+
+    def base_predictions(self, X) -> np.ndarray:
+        """
+        Base model probabilities on one shared matrix, evaluated in parallel.
+
+        Threads are used so the matrix is shared rather than copied; tree
+        and linear predictors release the GIL, so latency is bounded by the
+        slowest base model.
+        """
+        X = np.ascontiguousarray(np.asarray(X, dtype=np.float64))
+
+        probas = Parallel(n_jobs=len(self.model_names), prefer='threads')(
+            delayed(self.models_dict[name].predict_proba)(X) for name in self.model_names
+        )
+
+        return np.column_stack([p[:, 1] for p in probas])
+
+    def predict_proba(self, X):
+        """Predict probabilities."""
+        return self.meta_learner.predict_proba(self.base_predictions(X))[:, 1]
+
+    def predict(self, X):
+        """Predict class labels."""
+        return (self.predict_proba(X) >= 0.5).astype(int)
+
+    def evaluate(self, X_test, y_test):
+        """Evaluate ensemble."""
+        y_pred_proba = self.predict_proba(X_test)
+        y_pred = (y_pred_proba >= 0.5).astype(int)
+
+        metrics = self.evaluator.evaluate_binary_classifier(
+            y_test, y_pred, y_pred_proba,
+            model_name="Ensemble (Stacking)"
+        )
+
+        self.evaluator.print_classification_report(
+            y_test, y_pred,
+            model_name="Ensemble"
+        )
+
+        return metrics
+
+    def save_model(self, filepath: Path):
+        """Save stacking ensemble (base models and meta-learner)."""
+        joblib.dump({
+            'models': self.models_dict,
+            'meta_learner': self.meta_learner,
+        }, filepath)
+        logger.info(f"Saved stacking ensemble to {filepath}")
+
+
+def _fit_predict_fold(estimator, X, y, train_idx, val_idx) -> np.ndarray:
+    """Fit a fresh copy on one fold's training rows and predict its validation rows."""
+    model = clone(estimator)
+    model.fit(X[train_idx], y[train_idx])
+    return model.predict_proba(X[val_idx])[:, 1]
+
+
+def load_tuned_models(models_dir: Path, compact: bool = False) -> dict:
+    """
+    Load tuned models from disk.
+
+    Args:
+        models_dir: Directory with *_tuned.pkl files
+        compact: Prefer memory-mapped compact artifacts (predict-only;
+            not usable where models are cloned and re-fitted)
+    """
     models = {}
 
     model_files = {
@@ -100,7 +286,7 @@ def load_tuned_models(models_dir: Path) -> dict:
     for name, filename in model_files.items():
         filepath = models_dir / filename
         if filepath.exists():
-            models[name] = joblib.load(filepath)
+            models[name] = load_model_file(filepath) if compact else joblib.load(filepath)
             logger.info(f"Loaded {name} from {filepath}")
         else:
             logger.warning(f"Model file not found: {filepath}")
@@ -139,9 +325,13 @@ def run_ensemble():
         scale=True
     )
 
-    # Create and train ensemble
-    ensemble = EnsembleModel(models, voting='soft')
-    ensemble.train(data['X_train'], data['y_train'])
+    # Train the meta-learner on (cached) out-of-fold base predictions
+    ensemble = StackingEnsemble(models)
+    ensemble.train(
+        data['X_train'], data['y_train'],
+        groups=data.get('train_race_ids'),
+        order=data.get('train_meet_ids')
+    )
 
     # Evaluate ensemble
     ensemble_metrics = ensemble.evaluate(data['X_test'], data['y_test'])
@@ -174,7 +364,7 @@ def run_ensemble():
     # Save ensemble
     output_dir = Path("models/ensemble")
     output_dir.mkdir(exist_ok=True, parents=True)
-    ensemble.save_model(output_dir / "voting_ensemble.pkl")
+    ensemble.save_model(output_dir / "stacking_ensemble.pkl")
 
     # Save comparison
     comparison_df.to_csv("data/processed/ensemble_comparison.csv")
@@ -183,7 +373,7 @@ def run_ensemble():
     print("✓ ENSEMBLE MODEL COMPLETE")
     print("=" * 80)
     print(f"Ensemble ROC-AUC: {ensemble_metrics['roc_auc']:.4f}")
-    print("\nSaved to: models/ensemble/voting_ensemble.pkl")
+    print("\nSaved to: models/ensemble/stacking_ensemble.pkl")
     print("Comparison saved to: data/processed/ensemble_comparison.csv")
     print("=" * 80)
 
@@ -0,0 +1,336 @@
+"""Feature pruning by predictive contribution and compute cost."""
+import argparse
+import json
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import roc_auc_score
+import logging
+
+from src.features.feature_builder import FEATURE_GROUPS, FEATURE_SET_PATH
+from src.ml.data_preparation import DataPreparation
+
+logger = logging.getLogger(__name__)
+
+FEATURES_PATH = Path("data/processed/features_complete.csv")
+
+
+def group_columns(feature_columns: List[str]) -> Dict[str, List[str]]:
+    """
+    Map each feature group to its columns present in the data.
+
+    Args:
+        feature_columns: Feature columns of the prepared data
+
+    Returns:
+        Dictionary of {group: [columns]} (groups with no columns omitted)
+    """
+    present = set(feature_columns)
+    groups = {
+        group: [name for name in names if name in present]
+        for group, names in FEATURE_GROUPS.items()
+    }
+    return {group: columns for group, columns in groups.items() if columns}
+
+
+def permutation_group_importance(
+        model,
+        X: pd.DataFrame,
+        y: np.ndarray,
+        groups: Dict[str, List[str]],
+        n_repeats: int = 5,
+        random_state: int = 42
+) -> Dict[str, dict]:
+    """
+    ROC-AUC lost when a whole feature group is shuffled.
+
+    Columns of a group are permuted together (one row permutation per
+    repeat), so correlated features within a group cannot stand in for
+    each other the way they do under per-feature permutation.
+
+    Args:
+        model: Fitted classifier with predict_proba
+        X: Validation features
+        y: Validation targets
+        groups: Dictionary of {group: [columns]}
+        n_repeats: Shuffles per group
+        random_state: Random seed
+
+    Returns:
+        Dictionary of {group: {'auc_drop', 'auc_drop_std'}}
+    """
+    rng = np.random.default_rng(random_state)
+    baseline = roc_auc_score(y, model.predict_proba(X)[:, 1])
+
+    results = {}
+    for group, columns in groups.items():
+        col_idx = [X.columns.get_loc(col) for col in columns]
+        drops = []
+
+        for _ in range(n_repeats):
+            X_perm = X.values.copy()
+            perm = rng.permutation(len(X_perm))
+            X_perm[:, col_idx] = X_perm[perm][:, col_idx]
+
+            X_perm = pd.DataFrame(X_perm, columns=X.columns, index=X.index)
+            score = roc_auc_score(y, model.predict_proba(X_perm)[:, 1])
+            drops.append(baseline - score)
+
+        results[group] = {
+            'auc_drop': float(np.mean(drops)),
+            'auc_drop_std': float(np.std(drops)),
+        }
+        logger.info(f"  {group:8s} ROC-AUC drop {np.mean(drops):+.4f} (±{np.std(drops):.4f})")
+
+    return results
+
+
+def measure_group_costs(start_date: date, end_date: date) -> Dict[str, float]:
+    """
+    Time each feature calculator on a real build.
+
+    Args:
+        start_date: First day to build
+        end_date: Last day to build (inclusive)
+
+    Returns:
+        Dictionary of {group: seconds per runner}
+    """
+    from src.db.session import get_db_context
+    from src.features.feature_builder import FeatureBuilder
+
+    with get_db_context() as db:
+        builder = FeatureBuilder(db)
+        builder.build_features_for_date_range(start_date, end_date)
+        return builder.get_group_costs()
+
+
+class FeatureSelector:
+    """
+    Choose which feature groups are worth computing.
+
+    A group's contribution is the ROC-AUC lost on a validation slice (the
+    most recent training races) when its columns are shuffled - the test
+    split is never touched, so it stays an unbiased estimate for models
+    trained on the pruned set; its cost is the time its
+    calculator takes per runner in FeatureBuilder. A group is kept when
+
+        auc_drop >= min_auc_drop + cost_penalty * seconds_per_runner
+
+    so expensive (query-heavy) groups have to earn more to stay. Within
+    kept groups, features the model never splits on are dropped as well.
+    """
+
+    def __init__(
+            self,
+            min_auc_drop: float = 0.001,
+            cost_penalty: float = 0.1,
+            n_repeats: int = 5,
+            validation_fraction: float = 0.2,
+            random_state: int = 42
+    ):
+        """
+        Initialize selector.
+
+        Args:
+            min_auc_drop: ROC-AUC a free group must contribute to be kept
+            cost_penalty: Extra ROC-AUC required per second of compute per runner
+            n_repeats: Permutation repeats per group
+            validation_fraction: Share of the newest training races scored on
+            random_state: Random seed
+        """
+        self.min_auc_drop = min_auc_drop
+        self.cost_penalty = cost_penalty
+        self.n_repeats = n_repeats
+        self.validation_fraction = validation_fraction
+        self.random_state = random_state
+
+    def validation_split(self, data: dict):
+        """
+        Split the (time-ordered) training rows into fit and validation sets.
+
+        The newest validation_fraction of training races are held out;
+        a race is never split.
+
+        Args:
+            data: Output of DataPreparation.prepare_ml_data
+
+        Returns:
+            Tuple of (X_fit, y_fit, X_val, y_val)
+        """
+        race_ids = np.asarray(data['train_race_ids'])
+        unique_races = pd.unique(race_ids)
+        n_val = max(1, int(len(unique_races) * self.validation_fraction))
+        val_mask = np.isin(race_ids, unique_races[-n_val:])
+
+        X, y = data['X_train'], np.asarray(data['y_train'])
+        return X[~val_mask], y[~val_mask], X[val_mask], y[val_mask]
+
+    def fit_reference_model(self, X_train: pd.DataFrame, y_train) -> RandomForestClassifier:
+        """Fit the Random Forest used to score contributions."""
+        model = RandomForestClassifier(
+            n_estimators=200,
+            max_depth=10,
+            min_samples_leaf=2,
+            class_weight='balanced',
+            random_state=self.random_state,
+            n_jobs=-1
+        )
+        model.fit(X_train, y_train)
+        return model
+
+    def select(
+            self,
+            data: dict,
+            costs: Optional[Dict[str, float]] = None
+    ) -> dict:
+        """
+        Score every group and build the pruned feature set.
+
+        Args:
+            data: Output of DataPreparation.prepare_ml_data
+            costs: Seconds per runner per group (None = contribution only)
+
+        Returns:
+            Feature set report (see save_feature_set)
+        """
+        costs = costs or {}
+        groups = group_columns(data['feature_columns'])
+
+        X_fit, y_fit, X_val, y_val = self.validation_split(data)
+
+        logger.info(f"Fitting reference model on {len(X_fit)} rows ({len(X_val)} validation)...")
+        model = self.fit_reference_model(X_fit, y_fit)
+
+        baseline_auc = roc_auc_score(y_val, model.predict_proba(X_val)[:, 1])
+        logger.info(f"Baseline validation ROC-AUC: {baseline_auc:.4f}")
+
+        importance = permutation_group_importance(
+            model, X_val, y_val, groups,
+            n_repeats=self.n_repeats,
+            random_state=self.random_state
+        )
+        gain = dict(zip(data['feature_columns'], model.feature_importances_))
+
+        report = {}
+        features = []
+        dropped_features = []
+
+        for group, columns in groups.items():
+            cost = costs.get(group, 0.0)
+            required = self.min_auc_drop + self.cost_penalty * cost
+            keep = importance[group]['auc_drop'] >= required
+
+            report[group] = {
+                **importance[group],
+                'gain': float(sum(gain[col] for col in columns)),
+                'seconds_per_runner': float(cost),
+                'required_auc_drop': float(required),
+                'n_features': len(columns),
+                'kept': bool(keep),
+            }
+
+            if keep:
+                features.extend(col for col in columns if gain[col] > 0.0)
+                dropped_features.extend(col for col in columns if gain[col] == 0.0)
+
+        # Features outside any group are never pruned
+        grouped = {col for columns in groups.values() for col in columns}
+        features.extend(col for col in data['feature_columns'] if col not in grouped)
+
+        return {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'baseline_roc_auc': float(baseline_auc),
+            'features': features,
+            'dropped_groups': [group for group, info in report.items() if not info['kept']],
+            'dropped_features': dropped_features,
+            'groups': report,
+        }
+
+
+def save_feature_set(selection: dict, filepath: Path = FEATURE_SET_PATH):
+    """
+    Write a feature set for FeatureBuilder / DataPreparation.
+
+    Args:
+        selection: Output of FeatureSelector.select
+        filepath: Output JSON (read back with load_feature_set)
+    """
+    filepath = Path(filepath)
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(filepath, 'w') as f:
+        json.dump(selection, f, indent=2)
+
+    logger.info(f"Saved feature set ({len(selection['features'])} features) to {filepath}")
+
+
+def print_selection(selection: dict):
+    """Print per-group contribution, cost and decision."""
+    print("\n" + "=" * 80)
+    print("FEATURE GROUP SELECTION")
+    print("=" * 80)
+    print(f"Baseline validation ROC-AUC: {selection['baseline_roc_auc']:.4f}\n")
+    print(f"{'Group':10s} {'Features':>8s} {'AUC drop':>10s} {'Required':>10s} "
+          f"{'Gain':>8s} {'ms/runner':>10s}  Decision")
+    print("-" * 80)
+
+    for group, info in selection['groups'].items():
+        print(f"{group:10s} {info['n_features']:8d} {info['auc_drop']:+10.4f} "
+              f"{info['required_auc_drop']:10.4f} {info['gain']:8.4f} "
+              f"{info['seconds_per_runner'] * 1000:10.2f}  {'keep' if info['kept'] else 'DROP'}")
+
+    print("-" * 80)
+    print(f"Kept features:    {len(selection['features'])}")
+    print(f"Dropped groups:   {', '.join(selection['dropped_groups']) or 'none'}")
+    print(f"Dropped features: {len(selection['dropped_features'])}")
+    print("=" * 80)
+
+
+def main():
+    """Main entry point."""
+    from src.utils.logger import setup_logging
+
+    parser = argparse.ArgumentParser(description="Prune feature groups by contribution and compute cost")
+    parser.add_argument("--data", type=str, default=str(FEATURES_PATH), help="Feature CSV")
+    parser.add_argument("--output", type=str, default=str(FEATURE_SET_PATH), help="Feature set JSON")
+    parser.add_argument(
+        "--cost-start",
+        type=str,
+        help="First day of the timed feature build (YYYY-MM-DD, omit to skip cost measurement)"
+    )
+    parser.add_argument("--cost-end", type=str, help="Last day of the timed feature build (default: --cost-start)")
+    parser.add_argument("--min-auc-drop", type=float, default=0.001, help="ROC-AUC a free group must contribute")
+    parser.add_argument("--cost-penalty", type=float, default=0.1, help="Extra ROC-AUC required per second/runner")
+    parser.add_argument("--repeats", type=int, default=5, help="Permutation repeats per group")
+    parser.add_argument("--validation-fraction", type=float, default=0.2,
+                        help="Share of the newest training races to score groups on")
+
+    args = parser.parse_args()
+    setup_logging("feature_selection")
+
+    costs = None
+    if args.cost_start:
+        start = date.fromisoformat(args.cost_start)
+        end = date.fromisoformat(args.cost_end) if args.cost_end else start
+        costs = measure_group_costs(start, end)
+
+    data = DataPreparation().prepare_ml_data(Path(args.data), train_ratio=0.8, scale=True)
+
+    selector = FeatureSelector(
+        min_auc_drop=args.min_auc_drop,
+        cost_penalty=args.cost_penalty,
+        n_repeats=args.repeats,
+        validation_fraction=args.validation_fraction
+    )
+    selection = selector.select(data, costs)
+
+    print_selection(selection)
+    save_feature_set(selection, Path(args.output))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,25 @@
 """Hyperparameter tuning for all models."""
+import argparse
+import sys
+import time
 from pathlib import Path
-from sklearn.model_selection import GridSearchCV, RandomizedSearchCV
+from typing import Iterable, Optional
+from sklearn.base import clone
+from sklearn.model_selection import ParameterGrid, ParameterSampler
 from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import RandomForestClassifier
 import xgboost as xgb
 import numpy as np
 import pandas as pd
-import joblib
+from imblearn.over_sampling import SMOTE
+from src.ml import cross_validation
+from src.ml.artifact_cache import ArtifactCache, code_version
+from src.ml.cross_validation import (
+    WalkForwardSplit, FoldCache, walk_forward_search, successive_halving_search
+)
 from src.ml.data_preparation import DataPreparation
+from src.ml.model_artifacts import save_model_file
+from src.ml.model_registry import ModelRegistry
 from src.ml.evaluation import ModelEvaluator
 from src.utils.logger import setup_logging
 import logging
@@ -18,23 +30,165 @@ logger = logging.getLogger(__name__)
 class HyperparameterTuner:
     """Hyperparameter tuning for all models."""
 
-    def __init__(self, data, use_randomized: bool = False, n_iter: int = 50):
+    def __init__(
+            self,
+            data,
+            use_randomized: bool = False,
+            n_iter: int = 50,
+            n_splits: int = 5,
+            window: str = 'expanding',
+            use_smote: bool = False,
+            n_jobs: int = -1,
+            use_halving: bool = False,
+            halving_eta: int = 3,
+            cache: Optional[ArtifactCache] = None,
+            data_key: Optional[str] = None
+    ):
         """
         Initialize tuner.
 
         Args:
             data: Prepared data dictionary
-            use_randomized: Use RandomizedSearchCV instead of GridSearchCV
+            use_randomized: Sample n_iter candidates instead of the full grid
             n_iter: Number of iterations for randomized search
+            n_splits: Number of walk-forward folds
+            window: 'expanding' or 'sliding' training window
+            use_smote: Apply SMOTE to each fold's training rows
+            n_jobs: Parallel (candidate, fold) fits (-1 = all cores)
+            use_halving: Successive halving over tree count and sample size
+            halving_eta: Keep the best 1/eta candidates at each halving rung
+            cache: Reuse search results for unchanged data, grids and code
+            data_key: Prepared split key (DataPreparation.data_key), required with cache
         """
         self.data = data
         self.use_randomized = use_randomized
         self.n_iter = n_iter
+        self.use_smote = use_smote
+        self.n_jobs = n_jobs
+        self.use_halving = use_halving
+        self.halving_eta = halving_eta
         self.evaluator = ModelEvaluator()
+        self.cache = cache if data_key is not None else None
+        self.data_key = data_key
+
+        self.splitter = WalkForwardSplit(n_splits=n_splits, window=window)
+        self._folds = None
 
         self.best_models = {}
         self.best_params = {}
         self.cv_results = {}
+        self.tuning_times = {}
+        self.test_metrics = {}
+
+    def get_folds(self) -> FoldCache:
+        """
+        Get the preprocessed walk-forward folds, building them on first use.
+
+        Folds are grouped by race and ordered by meet, and are shared by
+        every model and candidate, so scaling and SMOTE run once per fold.
+        """
+        if self._folds is None:
+            self._folds = FoldCache(
+                self.data['X_train'],
+                self.data['y_train'],
+                self.splitter,
+                groups=self.data.get('train_race_ids'),
+                order=self.data.get('train_meet_ids'),
+                use_smote=self.use_smote
+            )
+
+        return self._folds
+
+    def _search(
+            self,
+            model_name: str,
+            estimator,
+            param_grid: dict,
+            early_stopping_rounds: Optional[int] = None
+    ):
+        """
+        Run walk-forward search for one model and refit the best candidate.
+
+        Args:
+            model_name: Display name used as the results key
+            estimator: Unfitted base estimator
+            param_grid: Parameter grid (sampled when use_randomized)
+            early_stopping_rounds: Boosting early stopping for halving search
+
+        Returns:
+            Tuple of (best_estimator, best_params)
+        """
+        start = time.perf_counter()
+
+        if self.use_randomized:
+            candidates = list(ParameterSampler(param_grid, n_iter=self.n_iter, random_state=42))
+        else:
+            candidates = list(ParameterGrid(param_grid))
+
+        cache_key = None
+        if self.cache is not None:
+            cache_key = ArtifactCache.key(
+                data=self.data_key,
+                code=code_version(sys.modules[__name__], cross_validation),
+                estimator=type(estimator).__name__,
+                estimator_params=estimator.get_params(),
+                candidates=candidates,
+                splitter=vars(self.splitter),
+                use_smote=self.use_smote,
+                use_halving=self.use_halving,
+                halving_eta=self.halving_eta,
+                early_stopping_rounds=early_stopping_rounds
+            )
+            cached = self.cache.get('tuning', cache_key)
+            if cached is not None:
+                return self._record(model_name, cached['estimator'], cached['results'], start)
+
+        results = self._run_search(estimator, candidates, early_stopping_rounds)
+
+        # Refit on the full training set, with the same resampling as the folds
+        X_train, y_train = self.data['X_train'], self.data['y_train']
+        if self.use_smote:
+            X_train, y_train = SMOTE(random_state=42).fit_resample(X_train, y_train)
+
+        best_estimator = clone(estimator).set_params(**results['best_params'])
+        best_estimator.fit(X_train, y_train)
+
+        if cache_key is not None:
+            self.cache.put('tuning', cache_key, {'estimator': best_estimator, 'results': results})
+
+        return self._record(model_name, best_estimator, results, start)
+
+    def _run_search(self, estimator, candidates: list, early_stopping_rounds: Optional[int]) -> dict:
+        """Evaluate candidates on the walk-forward folds."""
+        folds = self.get_folds()
+        logger.info(f"Evaluating {len(candidates)} candidates on {len(folds)} walk-forward folds")
+
+        if self.use_halving:
+            results = successive_halving_search(
+                estimator, candidates, folds,
+                eta=self.halving_eta,
+                early_stopping_rounds=early_stopping_rounds,
+                n_jobs=self.n_jobs
+            )
+            logger.info(f"Successive halving used {results['n_fits']} fits "
+                        f"(full search: {len(candidates) * len(folds)})")
+        else:
+            results = walk_forward_search(estimator, candidates, folds, n_jobs=self.n_jobs)
+
+        return results
+
+    def _record(self, model_name: str, best_estimator, results: dict, start: float):
+        """Store a model's search outcome."""
+        self.best_models[model_name] = best_estimator
+        self.best_params[model_name] = results['best_params']
+        self.cv_results[model_name] = results
+        self.tuning_times[model_name] = time.perf_counter() - start
+
+        logger.info(f"Best parameters: {results['best_params']}")
+        logger.info(f"Best CV ROC-AUC: {results['best_score']:.4f}")
+        logger.info(f"Tuning wall time: {self.tuning_times[model_name]:.1f}s")
+
+        return best_estimator, results['best_params']
 
     def tune_logistic_regression(self):
         """
@@ -61,27 +215,7 @@ class HyperparameterTuner:
         # Base model
         lr = LogisticRegression(random_state=42)
 
-        # Search
-        if self.use_randomized:
-            search = RandomizedSearchCV(
-                lr, param_grid, n_iter=self.n_iter,
-                cv=5, scoring='roc_auc', n_jobs=-1, verbose=1, random_state=42
-            )
-        else:
-            search = GridSearchCV(
-                lr, param_grid, cv=5, scoring='roc_auc', n_jobs=-1, verbose=1
-            )
-
-        search.fit(self.data['X_train'], self.data['y_train'])
-
-        self.best_models['Logistic Regression'] = search.best_estimator_
-        self.best_params['Logistic Regression'] = search.best_params_
-        self.cv_results['Logistic Regression'] = search.cv_results_
-
-        logger.info(f"Best parameters: {search.best_params_}")
-        logger.info(f"Best CV ROC-AUC: {search.best_score_:.4f}")
-
-        return search.best_estimator_, search.best_params_
+        return self._search('Logistic Regression', lr, param_grid)
 
     def tune_random_forest(self):
         """
@@ -122,27 +256,7 @@ class HyperparameterTuner:
         # Base model
         rf = RandomForestClassifier(random_state=42, n_jobs=-1)
 
-        # Search
-        if self.use_randomized:
-            search = RandomizedSearchCV(
-                rf, param_grid, n_iter=self.n_iter,
-                cv=5, scoring='roc_auc', n_jobs=-1, verbose=1, random_state=42
-            )
-        else:
-            search = GridSearchCV(
-                rf, param_grid, cv=5, scoring='roc_auc', n_jobs=-1, verbose=1
-            )
-
-        search.fit(self.data['X_train'], self.data['y_train'])
-
-        self.best_models['Random Forest'] = search.best_estimator_
-        self.best_params['Random Forest'] = search.best_params_
-        self.cv_results['Random Forest'] = search.cv_results_
-
-        logger.info(f"Best parameters: {search.best_params_}")
-        logger.info(f"Best CV ROC-AUC: {search.best_score_:.4f}")
-
-        return search.best_estimator_, search.best_params_
+        return self._search('Random Forest', rf, param_grid)
 
     def tune_xgboost(self):
         """
@@ -189,27 +303,7 @@ class HyperparameterTuner:
             n_jobs=-1
         )
 
-        # Search
-        if self.use_randomized:
-            search = RandomizedSearchCV(
-                xgb_model, param_grid, n_iter=self.n_iter,
-                cv=5, scoring='roc_auc', n_jobs=-1, verbose=1, random_state=42
-            )
-        else:
-            search = GridSearchCV(
-                xgb_model, param_grid, cv=5, scoring='roc_auc', n_jobs=-1, verbose=1
-            )
-
-        search.fit(self.data['X_train'], self.data['y_train'])
-
-        self.best_models['XGBoost'] = search.best_estimator_
-        self.best_params['XGBoost'] = search.best_params_
-        self.cv_results['XGBoost'] = search.cv_results_
-
-        logger.info(f"Best parameters: {search.best_params_}")
-        logger.info(f"Best CV ROC-AUC: {search.best_score_:.4f}")
-
-        return search.best_estimator_, search.best_params_
+        return self._search('XGBoost', xgb_model, param_grid, early_stopping_rounds=20)
 
     def tune_all_models(self):
         """Tune all three models."""
@@ -236,6 +330,8 @@ class HyperparameterTuner:
 
             results[model_name] = metrics
 
+        self.test_metrics = results
+
         # Compare
         comparison_df = self.evaluator.compare_models(results)
 
@@ -249,10 +345,38 @@ class HyperparameterTuner:
             for param, value in params.items():
                 print(f"  {param:20s}: {value}")
 
+        print("\n" + "=" * 80)
+        print("TUNING WALL TIME")
+        print("=" * 80)
+
+        for model_name, seconds in self.tuning_times.items():
+            print(f"  {model_name:20s}: {seconds:.1f}s")
+
         print("\n" + "=" * 80)
 
         return self.best_models, self.best_params, comparison_df
 
+    def register_tuned_models(self, registry: ModelRegistry, scaler=None, data_path: Path = None):
+        """
+        Register tuned models as new registry versions.
+
+        Args:
+            registry: Model registry
+            scaler: Scaler the training features were scaled with
+            data_path: Feature file the models were trained on
+        """
+        for model_name, model in self.best_models.items():
+            registry.register(
+                model_name.lower().replace(' ', '_'),
+                model,
+                feature_columns=self.data['feature_columns'],
+                metrics=self.test_metrics.get(model_name),
+                scaler=scaler,
+                data_path=data_path,
+                params=self.best_params.get(model_name),
+                notes='hyperparameter tuning'
+            )
+
     def save_tuned_models(self, output_dir: Path):
         """Save tuned models to disk."""
         output_dir.mkdir(exist_ok=True, parents=True)
@@ -262,7 +386,7 @@ class HyperparameterTuner:
             filename = model_name.lower().replace(' ', '_') + '_tuned.pkl'
             filepath = output_dir / filename
 
-            joblib.dump(model, filepath)
+            save_model_file(model, filepath)
             logger.info(f"Saved {model_name} to {filepath}")
 
         # Save parameters as JSON
@@ -278,30 +402,49 @@ class HyperparameterTuner:
         logger.info(f"Saved hyperparameters to {params_path}")
 
 
-def run_hyperparameter_tuning(use_randomized: bool = False):
+def run_hyperparameter_tuning(
+        use_randomized: bool = False,
+        use_halving: bool = False,
+        lean: bool = False,
+        use_cache: bool = True,
+        feature_set: Optional[Iterable[str]] = None
+):
     """
     Run hyperparameter tuning pipeline.
 
     Args:
-        use_randomized: Use RandomizedSearchCV (faster) vs GridSearchCV (exhaustive)
+        use_randomized: Sample candidates (faster) vs full grid (exhaustive)
+        use_halving: Successive-halving search (a fraction of the CPU time)
+        lean: Opt-in float32 memory-lean data preparation (see DataPreparation);
+            the backtester and refresher rebuild scalers in float64, which
+            only matches the default exactly
+        use_cache: Reuse prepared data and search results from data/cache
+        feature_set: Train on these features only (None = all, see resolve_feature_set)
     """
     setup_logging("hyperparameter_tuning")
+    cache = ArtifactCache() if use_cache else None
 
     # Prepare data
     logger.info("Loading data...")
-    data_prep = DataPreparation()
+    data_prep = DataPreparation(feature_set=feature_set, lean=lean)
+    data_path = Path("data/processed/features_complete.csv")
     data = data_prep.prepare_ml_data(
-        Path("data/processed/features_complete.csv"),
+        data_path,
         train_ratio=0.8,
-        scale=True
+        scale=True,
+        cache=cache
     )
 
     # Tune models
-    tuner = HyperparameterTuner(data, use_randomized=use_randomized, n_iter=50)
+    tuner = HyperparameterTuner(
+        data, use_randomized=use_randomized, n_iter=50, use_halving=use_halving,
+        cache=cache, data_key=data_prep.data_key
+    )
     best_models, best_params, comparison_df = tuner.tune_all_models()
 
     # Save models
     tuner.save_tuned_models(Path("models/tuned"))
+    tuner.register_tuned_models(ModelRegistry(), scaler=data_prep.scaler, data_path=data_path)
 
     # Save comparison
     comparison_df.to_csv("data/processed/tuned_models_comparison.csv")
@@ -316,7 +459,32 @@ def run_hyperparameter_tuning(use_randomized: bool = False):
     return best_models, best_params
 
 
+def main():
+    """Main entry point."""
+    from src.features.feature_builder import resolve_feature_set
+
+    parser = argparse.ArgumentParser(description="Tune Random Forest and XGBoost hyperparameters")
+    parser.add_argument("--feature-set", type=str,
+                        help="Feature set JSON (default: models/feature_set.json if it exists)")
+    parser.add_argument("--all-features", action="store_true", help="Train on every feature, ignoring any feature set")
+    parser.add_argument("--lean", action="store_true", help="float32 memory-lean data preparation")
+    # Randomized is recommended for a first pass; --no-randomized runs the full grid
+    parser.add_argument("--randomized", action=argparse.BooleanOptionalAction, default=True,
+                        help="Sample candidates instead of searching the full grid (default: on)")
+    parser.add_argument("--halving", action="store_true",
+                        help="Successive-halving search (a fraction of the CPU time)")
+
+    args = parser.parse_args()
+
+    run_hyperparameter_tuning(
+        use_randomized=args.randomized,
+        use_halving=args.halving,
+        lean=args.lean,
+        feature_set=resolve_feature_set(
+            Path(args.feature_set) if args.feature_set else None, args.all_features
+        )
+    )
+
+
 if __name__ == "__main__":
-    # Use randomized=True for faster tuning, False for exhaustive search
-    # Randomized is recommended for first pass
-    run_hyperparameter_tuning(use_randomized=True)
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,403 @@
+"""Incremental daily refresh of the tuned tree models."""
+import argparse
+import copy
+import json
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Optional, Tuple
+import numpy as np
+import pandas as pd
+import joblib
+import xgboost as xgb
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import roc_auc_score
+import logging
+
+from src.ml.data_preparation import DataPreparation
+from src.ml.model_registry import ModelRegistry, SCALER_FILE
+
+logger = logging.getLogger(__name__)
+
+FEATURES_PATH = Path("data/processed/features_complete.csv")
+TUNED_DIR = Path("models/tuned")
+REFRESH_STATE_FILE = 'refresh.json'
+
+
+class ModelRefresher:
+    """
+    Update a registered XGBoost or Random Forest model with recent days only.
+
+    XGBoost continues boosting from the saved booster for a few extra
+    rounds; Random Forest grows extra trees with warm_start (optionally
+    dropping the oldest trees to cap the forest size). The candidate is
+    compared with the active registry version on a holdout of the most
+    recent new races and, if it scores at least as well, is registered as
+    a new version and promoted - so the ML service and the backtests pick
+    it up, and `model_registry rollback` undoes it.
+
+    Refresh state (last trained day, last evaluated day, holdout score,
+    training medians used to impute missing values, history) is kept in
+    <registry>/<name>/refresh.json. Every refreshed version is registered
+    with the scaler of the version it extends, so old and new trees always
+    see identically prepared inputs.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            registry: Optional[ModelRegistry] = None,
+            extra_rounds: int = 50,
+            extra_trees: int = 50,
+            max_trees: Optional[int] = None,
+            holdout_fraction: float = 0.3,
+            min_improvement: float = 0.0
+    ):
+        """
+        Initialize refresher.
+
+        Args:
+            name: Registry model name, e.g. 'random_forest'
+            registry: Model registry (default: models/registry)
+            extra_rounds: Boosting rounds added to XGBoost per refresh
+            extra_trees: Trees added to Random Forest per refresh
+            max_trees: Keep at most this many (newest) forest trees
+            holdout_fraction: Share of the newest races held out for comparison
+            min_improvement: Required ROC-AUC gain over the current model
+        """
+        self.name = name
+        self.registry = registry or ModelRegistry()
+        self.state_path = self.registry.root / name / REFRESH_STATE_FILE
+
+        self.extra_rounds = extra_rounds
+        self.extra_trees = extra_trees
+        self.max_trees = max_trees
+        self.holdout_fraction = holdout_fraction
+        self.min_improvement = min_improvement
+
+        self.state = self._load_state()
+
+        if self.registry.active_version(name) is None:
+            self._register_baseline()
+
+        # The full pickle, not the compact serving artifact - refreshing
+        # continues training the estimator itself
+        self.version = self.registry.active_version(name)
+        self.model = joblib.load(self.registry.model_path(name, self.version))
+        self.feature_columns = self.registry.get_metadata(name, self.version)['feature_columns']
+
+        scaler_path = self.registry.version_dir(name, self.version) / SCALER_FILE
+        scaler = joblib.load(scaler_path) if scaler_path.exists() else None
+        self.scaler, self.medians = self._load_preprocessing(scaler)
+
+    def _load_state(self) -> dict:
+        """Load refresh state (empty for a never-refreshed model)."""
+        if self.state_path.exists():
+            with open(self.state_path) as f:
+                return json.load(f)
+
+        return {
+            'trained_through': None,
+            'evaluated_through': None,
+            'holdout_roc_auc': None,
+            'medians': None,
+            'history': []
+        }
+
+    def _register_baseline(self):
+        """
+        Register the tuned pickle as the first version of an unregistered model.
+
+        The tuned models were trained on prepare_ml_data output (with the
+        default feature set), so the same pipeline reproduces their scaler
+        exactly.
+        """
+        model_path = TUNED_DIR / f"{self.name}_tuned.pkl"
+        if not model_path.exists():
+            raise FileNotFoundError(f"{self.name} is not registered and {model_path} does not exist")
+
+        logger.info(f"{self.name} is not registered - registering {model_path} as its baseline")
+        from src.features.feature_builder import resolve_feature_set
+
+        data_prep = DataPreparation(feature_set=resolve_feature_set())
+        data = data_prep.prepare_ml_data(FEATURES_PATH, train_ratio=0.8, scale=True)
+        self._save_medians(data_prep, data)
+
+        # The first version of a model becomes active on registration
+        self.registry.register(
+            self.name,
+            joblib.load(model_path),
+            feature_columns=data_prep.feature_columns,
+            scaler=data_prep.scaler,
+            data_path=FEATURES_PATH,
+            notes=f'baseline for incremental refresh ({model_path.name})'
+        )
+
+    def _load_preprocessing(self, scaler):
+        """
+        Get the active version's scaler and training medians, recreating
+        whichever is missing from the training split.
+
+        Args:
+            scaler: Scaler registered with the active version (or None)
+
+        Returns:
+            Tuple of (scaler, medians Series indexed by feature column)
+        """
+        if scaler is None or self.state.get('medians') is None:
+            logger.info(f"Rebuilding training statistics of {self.name} from {FEATURES_PATH}")
+            data_prep = DataPreparation(feature_set=self.feature_columns)
+            data = data_prep.prepare_ml_data(FEATURES_PATH, train_ratio=0.8, scale=True)
+            self._save_medians(data_prep, data)
+            scaler = scaler or data_prep.scaler
+
+        medians = pd.Series(self.state['medians']).reindex(self.feature_columns)
+        return scaler, medians
+
+    def _save_medians(self, data_prep: DataPreparation, data: dict):
+        """Store the medians of the unscaled training rows the model was fit on."""
+        medians = np.median(data_prep.scaler.inverse_transform(data['X_train']), axis=0)
+        self.state['medians'] = {
+            col: float(value) for col, value in zip(data_prep.feature_columns, medians)
+        }
+        self._save_state()
+
+    def prepare(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Scale new rows and split them into update and holdout sets by race.
+
+        Args:
+            df: Feature rows for the new days (FeatureBuilder output)
+
+        Returns:
+            Tuple of (X_update, y_update, X_holdout, y_holdout)
+        """
+        df = df[df['target_win'] >= 0]
+        df = df.sort_values(['meet_id', 'race_id'])
+
+        X = df.reindex(columns=self.feature_columns)
+        # Training medians, not the new days' own (small-batch) medians
+        X = X.fillna(self.medians).fillna(0.0)
+        X = self.scaler.transform(X)
+        y = df['target_win'].values.astype(int)
+
+        # Hold out the most recent races (never split a race)
+        race_ids = df['race_id'].values
+        unique_races = pd.unique(race_ids)
+        n_holdout = max(1, int(len(unique_races) * self.holdout_fraction))
+        holdout_mask = np.isin(race_ids, unique_races[-n_holdout:])
+
+        return X[~holdout_mask], y[~holdout_mask], X[holdout_mask], y[holdout_mask]
+
+    def build_candidate(self, X: np.ndarray, y: np.ndarray):
+        """
+        Extend a copy of the current model with the new rows.
+
+        Args:
+            X: Scaled update features
+            y: Update targets
+
+        Returns:
+            Candidate model
+        """
+        candidate = copy.deepcopy(self.model)
+
+        if isinstance(candidate, xgb.XGBClassifier):
+            candidate.set_params(n_estimators=self.extra_rounds)
+            candidate.fit(X, y, xgb_model=self.model.get_booster())
+
+        elif isinstance(candidate, RandomForestClassifier):
+            candidate.set_params(
+                warm_start=True,
+                n_estimators=len(candidate.estimators_) + self.extra_trees
+            )
+            candidate.fit(X, y)
+
+            if self.max_trees and len(candidate.estimators_) > self.max_trees:
+                candidate.estimators_ = candidate.estimators_[-self.max_trees:]
+                candidate.n_estimators = self.max_trees
+
+        else:
+            raise TypeError(f"Incremental refresh not supported for {type(candidate).__name__}")
+
+        return candidate
+
+    def refresh(self, df: pd.DataFrame, through: date) -> dict:
+        """
+        Build, compare and (if better) promote a refreshed model.
+
+        Args:
+            df: Feature rows for the days since trained_through
+            through: Last day included in df
+
+        Returns:
+            Dictionary describing the refresh outcome
+        """
+        start = time.perf_counter()
+
+        X_update, y_update, X_holdout, y_holdout = self.prepare(df)
+
+        outcome = {
+            'model': self.name,
+            'base_version': self.version,
+            'through': through.isoformat(),
+            'update_rows': int(len(y_update)),
+            'holdout_rows': int(len(y_holdout)),
+            'promoted': False,
+        }
+
+        if len(np.unique(y_update)) < 2 or len(np.unique(y_holdout)) < 2:
+            outcome['reason'] = 'new data lacks winners or losers'
+            logger.warning(f"Skipping refresh of {self.name}: {outcome['reason']}")
+            return outcome
+
+        candidate = self.build_candidate(X_update, y_update)
+
+        current_auc = roc_auc_score(y_holdout, self.model.predict_proba(X_holdout)[:, 1])
+        candidate_auc = roc_auc_score(y_holdout, candidate.predict_proba(X_holdout)[:, 1])
+
+        outcome['current_roc_auc'] = float(current_auc)
+        outcome['candidate_roc_auc'] = float(candidate_auc)
+
+        if candidate_auc >= current_auc + self.min_improvement:
+            self._promote(candidate, candidate_auc, through)
+            outcome['promoted'] = True
+            outcome['version'] = self.version
+        else:
+            outcome['reason'] = 'candidate did not beat current model on holdout'
+
+        # Rejected days count as seen, so the next run starts after them
+        # instead of re-training on an ever-growing window
+        self.state['evaluated_through'] = through.isoformat()
+
+        outcome['seconds'] = round(time.perf_counter() - start, 2)
+
+        self.state['history'].append({
+            **outcome,
+            'refreshed_at': datetime.now().isoformat(timespec='seconds')
+        })
+        self._save_state()
+
+        logger.info(
+            f"{self.name}: current {current_auc:.4f} vs candidate {candidate_auc:.4f} "
+            f"-> {'promoted' if outcome['promoted'] else 'kept current'} ({outcome['seconds']}s)"
+        )
+        return outcome
+
+    def _promote(self, candidate, holdout_auc: float, through: date):
+        """Register the candidate as a new version and make it active."""
+        version = self.registry.register(
+            self.name,
+            candidate,
+            feature_columns=self.feature_columns,
+            metrics={'roc_auc': holdout_auc},
+            scaler=self.scaler,
+            params=candidate.get_params(),
+            notes=f'incremental refresh of v{self.version} through {through.isoformat()}'
+        )
+        self.registry.promote(self.name, version)
+
+        logger.info(f"Promoted {self.name} v{version} (previous: v{self.version})")
+
+        self.model = candidate
+        self.version = version
+        self.state['trained_through'] = through.isoformat()
+        self.state['holdout_roc_auc'] = float(holdout_auc)
+
+    def last_refreshed_day(self) -> Optional[date]:
+        """
+        Last day a refresh trained or evaluated on.
+
+        Returns:
+            Later of trained_through and evaluated_through (None if never refreshed)
+        """
+        days = [
+            date.fromisoformat(self.state[key])
+            for key in ('trained_through', 'evaluated_through')
+            if self.state.get(key)
+        ]
+        return max(days) if days else None
+
+    def _save_state(self):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.state_path, 'w') as f:
+            json.dump(self.state, f, indent=2)
+
+
+def build_new_day_features(start_date: date, end_date: date) -> pd.DataFrame:
+    """
+    Build feature rows for the days to refresh on.
+
+    Uses the pre-aggregated entity stats, so only the new days' runners
+    are touched.
+
+    Args:
+        start_date: First new day
+        end_date: Last new day (inclusive)
+
+    Returns:
+        Feature DataFrame
+    """
+    from src.db.session import get_db_context
+    from src.features.feature_builder import FeatureBuilder
+
+    with get_db_context() as db:
+        builder = FeatureBuilder(db, use_summary_stats=True)
+        return builder.build_features_for_date_range(start_date, end_date, only_with_results=True)
+
+
+def main():
+    """Main entry point."""
+    from src.utils.logger import setup_logging
+
+    parser = argparse.ArgumentParser(description="Incrementally refresh tuned models with new days")
+    parser.add_argument(
+        "--name",
+        type=str,
+        action="append",
+        help="Registry model to refresh. Repeatable (default: random_forest and xgboost)"
+    )
+    parser.add_argument(
+        "--since",
+        type=str,
+        help="First day to train on (YYYY-MM-DD, default: day after the last refresh)"
+    )
+    parser.add_argument(
+        "--through",
+        type=str,
+        help="Last day to train on (YYYY-MM-DD, default: yesterday)"
+    )
+
+    args = parser.parse_args()
+    setup_logging("incremental_refresh")
+
+    names = args.name or ['random_forest', 'xgboost']
+    through = date.fromisoformat(args.through) if args.through else date.today() - timedelta(days=1)
+
+    features_cache = {}
+
+    for name in names:
+        refresher = ModelRefresher(name)
+
+        if args.since:
+            since = date.fromisoformat(args.since)
+        elif refresher.last_refreshed_day():
+            since = refresher.last_refreshed_day() + timedelta(days=1)
+        else:
+            raise SystemExit(f"{name} has no refresh history - pass --since")
+
+        if since > through:
+            print(f"✓ {name} already trained through {through}")
+            continue
+
+        # Models refreshed over the same days share one feature build
+        if since not in features_cache:
+            features_cache[since] = build_new_day_features(since, through)
+
+        outcome = refresher.refresh(features_cache[since], through)
+        status = f"promoted v{outcome['version']}" if outcome['promoted'] else f"kept ({outcome.get('reason')})"
+        print(f"✓ {name}: {status}")
+
+
+if __name__ == "__main__":
+    main()
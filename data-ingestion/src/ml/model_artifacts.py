@@ -0,0 +1,332 @@
+"""Compact, memory-mappable model artifacts."""
+import json
+from pathlib import Path
+from typing import Optional, Union
+import numpy as np
+import joblib
+import logging
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_SUFFIX = '.artifact'
+META_FILE = 'meta.json'
+
+# Flat forest arrays stored as individual .npy files
+FOREST_ARRAYS = ['left', 'right', 'feature', 'threshold', 'value', 'roots', 'feature_importances']
+
+# Rows traversed per chunk (bounds the (trees x rows) node index matrix)
+PREDICT_CHUNK_ROWS = 4096
+
+
+def artifact_path_for(model_path: Path) -> Path:
+    """Artifact directory stored next to a pickle, e.g. rf_tuned.pkl -> rf_tuned.artifact."""
+    return Path(model_path).with_suffix(ARTIFACT_SUFFIX)
+
+
+def _float32_floor(threshold: np.ndarray) -> np.ndarray:
+    """
+    Largest float32 not above each float64 threshold.
+
+    sklearn compares float32 inputs against float64 thresholds, so for any
+    float32 x, x <= t holds exactly when x <= floor32(t). Plain rounding
+    could round a threshold up onto the next feature value and send it
+    down the wrong branch.
+    """
+    t32 = threshold.astype(np.float32)
+    too_high = t32.astype(np.float64) > threshold
+    t32[too_high] = np.nextafter(t32[too_high], np.float32(-np.inf))
+    return t32
+
+
+class CompactForest:
+    """
+    Random Forest predictor over flat, memory-mapped tree arrays.
+
+    All trees are concatenated into single node arrays (children,
+    split feature, threshold, leaf class probabilities) so a loaded
+    forest is a handful of contiguous buffers. Loaded with mmap, the
+    pages live in the OS page cache and are shared by every worker
+    process instead of being copied onto each worker's heap.
+    """
+
+    def __init__(self, arrays: dict, meta: dict):
+        """
+        Initialize from loaded arrays.
+
+        Args:
+            arrays: Flat forest arrays (see FOREST_ARRAYS)
+            meta: Artifact metadata
+        """
+        self.left = arrays['left']
+        self.right = arrays['right']
+        self.feature = arrays['feature']
+        self.threshold = arrays['threshold']
+        self.value = arrays['value']
+        self.roots = arrays['roots']
+        self.feature_importances_ = arrays['feature_importances']
+
+        self.classes_ = np.array(meta['classes'])
+        self.n_features_in_ = meta['n_features']
+        self.n_estimators = meta['n_trees']
+        self.max_depth = meta['max_depth']
+
+    @classmethod
+    def from_sklearn(cls, forest, float32_thresholds: bool = True) -> dict:
+        """
+        Flatten a fitted RandomForestClassifier into forest arrays.
+
+        Leaves point to themselves, so traversal can run a fixed number
+        of steps for every tree at once.
+
+        Args:
+            forest: Fitted RandomForestClassifier
+            float32_thresholds: Store thresholds as float32 (exact for float32 input)
+
+        Returns:
+            Dictionary of arrays plus 'max_depth'
+        """
+        lefts, rights, features, thresholds, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(n_nodes) + offset
+            is_leaf = tree.children_left == -1
+
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left + offset))
+            rights.append(np.where(is_leaf, node_ids, tree.children_right + offset))
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+
+            # Leaf class probabilities, normalized as DecisionTreeClassifier.predict_proba does
+            proba = tree.value[:, 0, :].astype(np.float64)
+            normalizer = proba.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(proba / normalizer)
+
+            roots.append(offset)
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+
+        threshold = np.concatenate(thresholds)
+
+        return {
+            'left': np.concatenate(lefts).astype(np.int32),
+            'right': np.concatenate(rights).astype(np.int32),
+            'feature': np.concatenate(features).astype(np.int32),
+            'threshold': _float32_floor(threshold) if float32_thresholds else threshold,
+            'value': np.concatenate(values),
+            'roots': np.array(roots, dtype=np.int32),
+            'feature_importances': np.asarray(forest.feature_importances_, dtype=np.float64),
+            'max_depth': max_depth,
+        }
+
+    def _leaf_indices(self, X: np.ndarray) -> np.ndarray:
+        """Leaf node of every (tree, row) pair."""
+        rows = np.arange(X.shape[0])
+        node = np.repeat(self.roots[:, None], X.shape[0], axis=1)
+
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+
+        return node
+
+    def predict_proba(self, X) -> np.ndarray:
+        """
+        Predict class probabilities (same as RandomForestClassifier.predict_proba).
+
+        Args:
+            X: Features
+
+        Returns:
+            Array of shape (n_rows, n_classes)
+        """
+        # sklearn trees compare float32 inputs
+        X = np.asarray(X, dtype=np.float32)
+        proba = np.zeros((X.shape[0], self.value.shape[1]))
+
+        for start in range(0, X.shape[0], PREDICT_CHUNK_ROWS):
+            chunk = slice(start, start + PREDICT_CHUNK_ROWS)
+            leaves = self._leaf_indices(X[chunk])
+
+            # Accumulate tree by tree, in the same order as sklearn
+            for tree_leaves in leaves:
+                proba[chunk] += self.value[tree_leaves]
+
+        proba /= self.n_estimators
+        return proba
+
+    def predict(self, X) -> np.ndarray:
+        """Predict class labels."""
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def save_artifact(
+        model,
+        path: Path,
+        float32_thresholds: bool = True,
+        source_path: Optional[Path] = None
+) -> Path:
+    """
+    Save a model as a compact artifact directory.
+
+    Random Forests are flattened into uncompressed .npy arrays (np.save
+    pads headers so data is aligned); XGBoost models use the native UBJSON
+    format; anything else falls back to a joblib pickle.
+
+    Args:
+        model: Fitted model
+        path: Artifact directory
+        float32_thresholds: Downcast forest split thresholds to float32
+        source_path: Pickle the artifact was made from; its hash is recorded
+            so load_model_file can tell when the pickle was replaced
+
+    Returns:
+        Artifact directory
+    """
+    from sklearn.ensemble import RandomForestClassifier
+    from src.ml.model_registry import hash_file
+
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+
+    if isinstance(model, RandomForestClassifier):
+        arrays = CompactForest.from_sklearn(model, float32_thresholds)
+        for name in FOREST_ARRAYS:
+            np.save(path / f"{name}.npy", np.ascontiguousarray(arrays[name]))
+
+        meta = {
+            'kind': 'compact_forest',
+            'classes': model.classes_.tolist(),
+            'n_features': int(model.n_features_in_),
+            'n_trees': len(model.estimators_),
+            'max_depth': int(arrays['max_depth']),
+            'threshold_dtype': str(arrays['threshold'].dtype),
+        }
+
+    elif type(model).__name__ == 'XGBClassifier':
+        model.save_model(path / 'model.ubj')
+        meta = {'kind': 'xgboost'}
+
+    else:
+        joblib.dump(model, path / 'model.pkl')
+        meta = {'kind': 'pickle'}
+
+    meta['model_type'] = type(model).__name__
+    if source_path is not None:
+        meta['source_sha256'] = hash_file(source_path)
+    with open(path / META_FILE, 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    logger.info(f"Saved {meta['kind']} artifact to {path}")
+    return path
+
+
+def load_artifact(path: Path, mmap: bool = True):
+    """
+    Load a model artifact.
+
+    Args:
+        path: Artifact directory
+        mmap: Memory-map forest arrays read-only instead of reading them
+
+    Returns:
+        Model exposing predict / predict_proba
+    """
+    path = Path(path)
+    with open(path / META_FILE) as f:
+        meta = json.load(f)
+
+    if meta['kind'] == 'compact_forest':
+        mmap_mode = 'r' if mmap else None
+        arrays = {
+            name: np.load(path / f"{name}.npy", mmap_mode=mmap_mode)
+            for name in FOREST_ARRAYS
+        }
+        model = CompactForest(arrays, meta)
+
+    elif meta['kind'] == 'xgboost':
+        import xgboost as xgb
+
+        model = xgb.XGBClassifier()
+        model.load_model(path / 'model.ubj')
+
+    else:
+        model = joblib.load(path / 'model.pkl')
+
+    logger.info(f"Loaded {meta['kind']} artifact from {path}")
+    return model
+
+
+def save_model_file(model, model_path: Union[str, Path]) -> Path:
+    """
+    Save a model as a pickle plus its compact artifact.
+
+    Args:
+        model: Fitted model
+        model_path: Pickle path (the artifact is written next to it)
+
+    Returns:
+        Pickle path
+    """
+    model_path = Path(model_path)
+    joblib.dump(model, model_path)
+    save_artifact(model, artifact_path_for(model_path), source_path=model_path)
+    return model_path
+
+
+def artifact_matches(model_path: Union[str, Path]) -> bool:
+    """
+    Whether the artifact next to a pickle was made from that pickle.
+
+    Artifacts record the hash of their source pickle (save_model_file);
+    older artifacts without one are trusted unless the pickle is newer.
+
+    Args:
+        model_path: Pickle path
+
+    Returns:
+        True if the artifact exists and is current
+    """
+    from src.ml.artifact_cache import file_fingerprint
+
+    model_path = Path(model_path)
+    meta_path = artifact_path_for(model_path) / META_FILE
+    if not meta_path.exists():
+        return False
+    if not model_path.exists():
+        return True
+
+    with open(meta_path) as f:
+        source_hash = json.load(f).get('source_sha256')
+
+    if source_hash is not None:
+        return source_hash == file_fingerprint(model_path)
+    return meta_path.stat().st_mtime_ns >= model_path.stat().st_mtime_ns
+
+
+def load_model_file(model_path: Union[str, Path], mmap: bool = True):
+    """
+    Load a model, preferring its compact artifact over the pickle.
+
+    An artifact left over from a pickle that has since been replaced
+    (see artifact_matches) is ignored.
+
+    Args:
+        model_path: Pickle path (the artifact is looked up next to it)
+        mmap: Memory-map artifact arrays
+
+    Returns:
+        Loaded model
+    """
+    artifact_path = artifact_path_for(Path(model_path))
+    if artifact_matches(model_path):
+        return load_artifact(artifact_path, mmap=mmap)
+
+    if (artifact_path / META_FILE).exists():
+        logger.warning(f"Ignoring stale artifact {artifact_path} - {model_path} was replaced")
+
+    return joblib.load(model_path)
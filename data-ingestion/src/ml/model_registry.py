@@ -0,0 +1,328 @@
+"""File-based model registry with versioned artifacts."""
+import argparse
+import hashlib
+import json
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+import joblib
+import logging
+
+from src.ml.model_artifacts import save_model_file, load_model_file
+
+logger = logging.getLogger(__name__)
+
+REGISTRY_DIR = Path("models/registry")
+INDEX_FILE = 'registry.json'
+METADATA_FILE = 'metadata.json'
+MODEL_FILE = 'model.pkl'
+SCALER_FILE = 'scaler.pkl'
+
+
+def hash_file(filepath: Path, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's contents (identifies the training data)."""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ModelRegistry:
+    """
+    Versioned models on local disk.
+
+    Layout:
+        <root>/registry.json                  active / shadow version per model
+        <root>/<name>/v<N>/model.pkl          pickled model
+        <root>/<name>/v<N>/model.artifact/    compact memory-mappable copy
+        <root>/<name>/v<N>/scaler.pkl         scaler the model was trained with
+        <root>/<name>/v<N>/metadata.json      metrics, feature schema, data hash
+
+    Versions are immutable once registered; promote, rollback and shadow
+    only rewrite registry.json, so backtests and the ML service resolve
+    the same files.
+    """
+
+    def __init__(self, root: Path = REGISTRY_DIR):
+        """
+        Initialize registry.
+
+        Args:
+            root: Registry directory
+        """
+        self.root = Path(root)
+        self.index_path = self.root / INDEX_FILE
+
+    def _load_index(self) -> dict:
+        if self.index_path.exists():
+            with open(self.index_path) as f:
+                return json.load(f)
+        return {'models': {}}
+
+    def _save_index(self, index: dict):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f, indent=2)
+        tmp_path.replace(self.index_path)
+
+    def version_dir(self, name: str, version: int) -> Path:
+        """Directory holding one model version."""
+        return self.root / name / f"v{version}"
+
+    def list_versions(self, name: str) -> List[int]:
+        """Registered versions of a model, oldest first."""
+        model_dir = self.root / name
+        if not model_dir.exists():
+            return []
+        return sorted(
+            int(p.name[1:]) for p in model_dir.iterdir()
+            if p.is_dir() and p.name.startswith('v') and p.name[1:].isdigit()
+        )
+
+    def register(
+            self,
+            name: str,
+            model,
+            feature_columns: List[str],
+            metrics: Optional[Dict[str, float]] = None,
+            scaler=None,
+            data_path: Optional[Path] = None,
+            params: Optional[dict] = None,
+            notes: str = ''
+    ) -> int:
+        """
+        Register a new model version.
+
+        The first version of a model becomes active automatically; later
+        versions must be promoted explicitly.
+
+        Args:
+            name: Model name, e.g. 'random_forest'
+            model: Fitted model
+            feature_columns: Ordered feature schema the model expects
+            metrics: Evaluation metrics
+            scaler: Fitted scaler for the feature columns
+            data_path: Training data file (hashed for lineage)
+            params: Hyperparameters
+            notes: Free-form description
+
+        Returns:
+            New version number
+        """
+        versions = self.list_versions(name)
+        version = versions[-1] + 1 if versions else 1
+
+        version_dir = self.version_dir(name, version)
+        version_dir.mkdir(parents=True)
+
+        model_path = version_dir / MODEL_FILE
+        save_model_file(model, model_path)
+
+        if scaler is not None:
+            joblib.dump(scaler, version_dir / SCALER_FILE)
+
+        metadata = {
+            'name': name,
+            'version': version,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'model_type': type(model).__name__,
+            'feature_columns': list(feature_columns),
+            'metrics': {k: float(v) for k, v in (metrics or {}).items()},
+            'params': {k: str(v) for k, v in (params or {}).items()},
+            'data_path': str(data_path) if data_path else None,
+            'data_hash': hash_file(data_path) if data_path else None,
+            'has_scaler': scaler is not None,
+            'notes': notes,
+        }
+        with open(version_dir / METADATA_FILE, 'w') as f:
+            json.dump(metadata, f, indent=2)
+
+        index = self._load_index()
+        entry = index['models'].setdefault(name, {'active': None, 'shadow': None, 'history': []})
+        if entry['active'] is None:
+            entry['active'] = version
+            entry['history'].append(version)
+        self._save_index(index)
+
+        logger.info(f"Registered {name} v{version}" + (" (active)" if entry['active'] == version else ""))
+        return version
+
+    def get_metadata(self, name: str, version: int) -> dict:
+        """Metadata of one version."""
+        with open(self.version_dir(name, version) / METADATA_FILE) as f:
+            return json.load(f)
+
+    def active_version(self, name: str) -> Optional[int]:
+        """Active version of a model (None if not registered)."""
+        return self._load_index()['models'].get(name, {}).get('active')
+
+    def shadow_version(self, name: str) -> Optional[int]:
+        """Shadow version of a model (None if not set)."""
+        return self._load_index()['models'].get(name, {}).get('shadow')
+
+    def model_path(self, name: str, version: Optional[int] = None) -> Path:
+        """Pickle path of a version (default: active)."""
+        version = version or self.active_version(name)
+        if version is None:
+            raise ValueError(f"No active version of {name}")
+        return self.version_dir(name, version) / MODEL_FILE
+
+    def load(self, name: str, version: Optional[int] = None, mmap: bool = True) -> dict:
+        """
+        Load a version's model, scaler and metadata.
+
+        Args:
+            name: Model name
+            version: Version (default: active)
+            mmap: Memory-map compact artifact arrays
+
+        Returns:
+            Dictionary with 'model', 'scaler' (or None), 'metadata'
+        """
+        version = version or self.active_version(name)
+        if version is None:
+            raise ValueError(f"No active version of {name}")
+
+        version_dir = self.version_dir(name, version)
+        scaler_path = version_dir / SCALER_FILE
+
+        return {
+            'model': load_model_file(version_dir / MODEL_FILE, mmap=mmap),
+            'scaler': joblib.load(scaler_path) if scaler_path.exists() else None,
+            'metadata': self.get_metadata(name, version),
+        }
+
+    def promote(self, name: str, version: int):
+        """Make a version active (remembering the previous one for rollback)."""
+        if version not in self.list_versions(name):
+            raise ValueError(f"{name} v{version} is not registered")
+
+        index = self._load_index()
+        entry = index['models'].setdefault(name, {'active': None, 'shadow': None, 'history': []})
+        entry['active'] = version
+        entry['history'].append(version)
+        if entry['shadow'] == version:
+            entry['shadow'] = None
+        self._save_index(index)
+
+        logger.info(f"Promoted {name} v{version}")
+
+    def rollback(self, name: str) -> int:
+        """
+        Reactivate the previously active version.
+
+        Returns:
+            Version now active
+        """
+        index = self._load_index()
+        entry = index['models'].get(name)
+        if not entry or len(entry['history']) < 2:
+            raise ValueError(f"No earlier version of {name} to roll back to")
+
+        entry['history'].pop()
+        entry['active'] = entry['history'][-1]
+        self._save_index(index)
+
+        logger.info(f"Rolled back {name} to v{entry['active']}")
+        return entry['active']
+
+    def set_shadow(self, name: str, version: Optional[int]):
+        """Set (or clear, with None) the version scored in shadow mode."""
+        if version is not None and version not in self.list_versions(name):
+            raise ValueError(f"{name} v{version} is not registered")
+
+        index = self._load_index()
+        entry = index['models'].setdefault(name, {'active': None, 'shadow': None, 'history': []})
+        entry['shadow'] = version
+        self._save_index(index)
+
+        logger.info(f"Shadow for {name}: {f'v{version}' if version else 'none'}")
+
+    def remove(self, name: str, version: int):
+        """Delete an inactive version."""
+        index = self._load_index()
+        entry = index['models'].get(name, {})
+        if version in (entry.get('active'), entry.get('shadow')):
+            raise ValueError(f"{name} v{version} is active or shadow")
+
+        shutil.rmtree(self.version_dir(name, version))
+        if entry:
+            entry['history'] = [v for v in entry['history'] if v != version]
+            self._save_index(index)
+
+
+def resolve_model_path(name: str, fallback: Path, registry: Optional[ModelRegistry] = None) -> Path:
+    """
+    Path of a model's active registry version, or fallback if not registered.
+
+    Args:
+        name: Registry model name
+        fallback: Path used when the registry has no active version
+        registry: Registry (default: models/registry)
+
+    Returns:
+        Model pickle path
+    """
+    registry = registry or ModelRegistry()
+    version = registry.active_version(name)
+
+    if version is None:
+        return fallback
+
+    logger.info(f"Using {name} v{version} from registry")
+    return registry.model_path(name, version)
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Manage the local model registry")
+    parser.add_argument("--root", type=str, default=str(REGISTRY_DIR), help="Registry directory")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = subparsers.add_parser("list", help="List versions of a model")
+    list_parser.add_argument("name")
+
+    promote_parser = subparsers.add_parser("promote", help="Make a version active")
+    promote_parser.add_argument("name")
+    promote_parser.add_argument("version", type=int)
+
+    rollback_parser = subparsers.add_parser("rollback", help="Reactivate the previous version")
+    rollback_parser.add_argument("name")
+
+    shadow_parser = subparsers.add_parser("shadow", help="Set the shadow version (0 clears it)")
+    shadow_parser.add_argument("name")
+    shadow_parser.add_argument("version", type=int)
+
+    args = parser.parse_args()
+    registry = ModelRegistry(Path(args.root))
+
+    if args.command == "list":
+        active = registry.active_version(args.name)
+        shadow = registry.shadow_version(args.name)
+
+        for version in registry.list_versions(args.name):
+            meta = registry.get_metadata(args.name, version)
+            marker = "*" if version == active else ("s" if version == shadow else " ")
+            roc_auc = meta['metrics'].get('roc_auc')
+            score = f"{roc_auc:.4f}" if roc_auc is not None else "   n/a"
+            print(f"{marker} v{version:<4d} {meta['created_at']}  {meta['model_type']:24s} "
+                  f"ROC-AUC {score}  data {str(meta['data_hash'])[:12]}")
+
+    elif args.command == "promote":
+        registry.promote(args.name, args.version)
+        print(f"✓ {args.name} v{args.version} is active")
+
+    elif args.command == "rollback":
+        version = registry.rollback(args.name)
+        print(f"✓ {args.name} rolled back to v{version}")
+
+    elif args.command == "shadow":
+        registry.set_shadow(args.name, args.version or None)
+        print(f"✓ Shadow for {args.name}: {f'v{args.version}' if args.version else 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,11 +4,11 @@ import numpy as np
 import pandas as pd
 import xgboost as xgb
 from imblearn.over_sampling import SMOTE
-import joblib
 import logging
 
 from src.ml.data_preparation import DataPreparation
 from src.ml.evaluation import ModelEvaluator
+from src.ml.model_artifacts import save_model_file, load_model_file
 
 logger = logging.getLogger(__name__)
 
@@ -150,13 +150,18 @@ class XGBoostModel:
         return importance_df.head(top_n)
 
     def save_model(self, filepath: Path):
-        """Save model to disk."""
-        joblib.dump(self.model, filepath)
+        """Save model to disk (pickle plus compact memory-mappable artifact)."""
+        save_model_file(self.model, filepath)
         logger.info(f"Saved model to {filepath}")
 
-    def load_model(self, filepath: Path):
-        """Load model from disk."""
-        self.model = joblib.load(filepath)
+    def load_model(self, filepath: Path, mmap: bool = True):
+        """
+        Load model from disk.
+
+        Uses the compact artifact when present (predict-only for Random
+        Forest), otherwise the pickle.
+        """
+        self.model = load_model_file(filepath, mmap=mmap)
         logger.info(f"Loaded model from {filepath}")
 
 
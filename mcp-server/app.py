@@ -20,8 +20,7 @@ logger = logging.getLogger(__name__)
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from src.rag.vector_store import VectorStore
-from src.rag.retriever import RaceRetriever
+from src.rag.resources import get_resources
 from src.chat.llm_handler import LLMHandler
 from src.chat.racing_expert import RacingExpert
 
@@ -29,9 +28,12 @@ from src.chat.racing_expert import RacingExpert
 app = Flask(__name__)
 CORS(app)
 
-# Initialize components (lazy - loaded on first request)
-vector_store = VectorStore()
-retriever = RaceRetriever(vector_store)
+# Initialize components - embedding model and vector store are loaded once
+# per process and shared by chat, search, embedding and MCP tools
+resources = get_resources()
+resources.warm_up()
+vector_store = resources.vector_store
+retriever = resources.retriever
 llm_handler = LLMHandler()
 racing_expert = RacingExpert(retriever, llm_handler)
 
@@ -113,13 +115,23 @@ def search():
 def embed_races():
     """
     Embed race data into vector store.
-    Admin endpoint - call once to initialize or update.
+    Admin endpoint - incremental, so call after every results load.
+
+    Request (all optional):
+    {
+        "since": "2026-02-01",  // only check races on or after this date
+        "force": false          // re-encode races even if unchanged
+    }
     """
+    from datetime import date
     from src.rag.embedder import RaceEmbedder
-    embedder = RaceEmbedder(vector_store)
+    embedder = RaceEmbedder(vector_store, resources.model)
+
+    data = request.get_json(silent=True) or {}
 
     try:
-        count = embedder.embed_all_races()
+        since = date.fromisoformat(data['since']) if data.get('since') else None
+        count = embedder.embed_all_races(since=since, force=bool(data.get('force', False)))
         return jsonify({
             'status': 'success',
             'races_embedded': count
@@ -134,7 +146,7 @@ def reset_and_embed():
     """Reset vector store and re-embed all races."""
     vector_store.reset()
     from src.rag.embedder import RaceEmbedder
-    embedder = RaceEmbedder(vector_store)
+    embedder = RaceEmbedder(vector_store, resources.model)
     try:
         count = embedder.embed_all_races()
         return jsonify({'status': 'success', 'races_embedded': count})
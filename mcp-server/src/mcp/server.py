@@ -60,6 +60,13 @@ class MCPServer:
                 'parameters': {
                     'track_code': 'Track code e.g. AQU (required)'
                 }
+            },
+            {
+                'name': 'get_database_stats',
+                'description': 'Get record counts, averages, date range and results completion',
+                'parameters': {
+                    'live': 'Recompute instead of reading the cached snapshot (optional, default false)'
+                }
             }
         ]
 
@@ -71,6 +78,7 @@ class MCPServer:
             'get_predictions': self._get_predictions,
             'search_historical_races': self._search_historical_races,
             'get_track_stats': self._get_track_stats,
+            'get_database_stats': self._get_database_stats,
         }
 
         if tool_name not in tools:
@@ -141,8 +149,7 @@ class MCPServer:
 
     def _search_historical_races(self, params: dict) -> dict:
         """Semantic search through race history."""
-        from src.rag.vector_store import VectorStore
-        from src.rag.retriever import RaceRetriever
+        from src.rag.resources import get_resources
 
         query = params.get('query')
         if not query:
@@ -151,9 +158,7 @@ class MCPServer:
         limit = int(params.get('limit', 5))
 
         try:
-            vs = VectorStore()
-            retriever = RaceRetriever(vs)
-            results = retriever.search(query, limit=limit)
+            results = get_resources().retriever.search(query, limit=limit)
 
             return {
                 'query': query,
@@ -190,4 +195,21 @@ class MCPServer:
                 'note': 'Detailed stats available after more data is collected'
             }
         except Exception as e:
-            return {'error': f"Could not fetch track stats: {e}"}
\ No newline at end of file
+            return {'error': f"Could not fetch track stats: {e}"}
+
+    def _get_database_stats(self, params: dict) -> dict:
+        """Get database statistics."""
+        from src.db.queries import get_database_stats
+
+        live = str(params.get('live', 'false')).lower() == 'true'
+
+        try:
+            stats = get_database_stats(use_cache=not live)
+
+            for key in ('first_meet_date', 'last_meet_date', 'refreshed_at'):
+                if stats[key] is not None:
+                    stats[key] = stats[key].isoformat()
+
+            return stats
+        except Exception as e:
+            return {'error': f"Could not fetch database stats: {e}"}
@@ -1,8 +1,11 @@
 """Converts race data to vector embeddings."""
 import sys
 import importlib
+import hashlib
+import json
+from datetime import date
 from pathlib import Path
-from sentence_transformers import SentenceTransformer
+from sqlalchemy.orm import joinedload, selectinload
 import logging
 
 logger = logging.getLogger(__name__)
@@ -24,26 +27,29 @@ if 'src.db' in sys.modules:
     del sys.modules['src.db']
 
 from src.db.session import get_db_context
-from src.db.models import Race, Meet, Track, Runner, Horse, Jockey, Trainer
+from src.db.models import Race, Meet, Runner
 from src.db.models import RaceResult, RunnerResult
 from src.rag.vector_store import VectorStore
+from src.rag.resources import MODEL_NAME, get_resources
 
-MODEL_NAME = 'all-MiniLM-L6-v2'
+# Races loaded and written to the vector store per page
+PAGE_SIZE = 1000
+
+# Documents per forward pass of the embedding model
+ENCODE_BATCH_SIZE = 128
 
 
 class RaceEmbedder:
     """Embeds race data into vector store for semantic search."""
 
-    def __init__(self, vector_store: VectorStore):
+    def __init__(self, vector_store: VectorStore, model=None):
         self.vector_store = vector_store
-        self.model = None
+        self.model = model
 
     def _load_model(self):
-        """Lazy load the embedding model."""
+        """Use the process-wide model unless one was passed in."""
         if self.model is None:
-            logger.info(f"Loading embedding model: {MODEL_NAME}")
-            self.model = SentenceTransformer(MODEL_NAME)
-            logger.info("✓ Embedding model loaded")
+            self.model = get_resources().model
 
     def race_to_text(self, race, meet, runners, results=None) -> str:
         """
@@ -107,118 +113,155 @@ class RaceEmbedder:
 
         return "\n".join(lines)
 
-    def embed_all_races(self) -> int:
-        """Embed all races from database into vector store."""
+    def race_metadata(self, race, meet) -> dict:
+        """Metadata stored alongside each race document for filtering."""
+        track_name = meet.track.track_name if meet.track else 'Unknown'
+        return {
+            'race_id': race.id,
+            'race_number': race.race_number or 0,
+            'track': track_name,
+            'date': str(meet.date),
+            'surface': race.surface or '',
+            'race_type': str(race.race_type or ''),
+            'has_results': bool(race.has_results),
+            'purse': race.purse or 0
+        }
+
+    def _load_race_page(self, db, race_ids: list, first_date, last_date) -> list:
+        """
+        Load a page of races with everything race_to_text reads.
+
+        Meet and track are joined in; runners (unscratched only), their
+        horses and jockeys, and result runners and horses are each fetched
+        with one IN query for the whole page instead of one per race. The
+        runner queries are bounded by the page's dates so Postgres prunes
+        them to the matching race_date partitions.
+        """
+        in_page = Runner.race_date.between(first_date, last_date)
+
+        races = db.query(Race).filter(Race.id.in_(race_ids)).options(
+            joinedload(Race.meet).joinedload(Meet.track),
+            selectinload(Race.runners.and_(Runner.is_scratched == False, in_page)).options(
+                selectinload(Runner.horse),
+                selectinload(Runner.jockey)
+            ),
+            selectinload(Race.result)
+            .selectinload(RaceResult.runner_results.and_(
+                RunnerResult.race_date.between(first_date, last_date)
+            ))
+            .selectinload(RunnerResult.runner)
+            .selectinload(Runner.horse)
+        ).all()
+
+        # Keep the chronological order of race_ids
+        by_id = {race.id: race for race in races}
+        return [by_id[race_id] for race_id in race_ids if race_id in by_id]
+
+    @staticmethod
+    def content_hash(document: str, metadata: dict) -> str:
+        """
+        Fingerprint of everything stored for a race.
+
+        Includes the model name so switching models re-embeds everything.
+        """
+        payload = json.dumps([MODEL_NAME, document, metadata], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def embed_all_races(self, page_size: int = PAGE_SIZE, since: date = None,
+                        force: bool = False) -> int:
+        """
+        Bring the vector store up to date with the database.
+
+        Races are processed a page at a time: one set of eager-loading
+        queries, one batched encode and one vector store upsert per page.
+        Each race's document is hashed and compared with the hash stored
+        in its metadata, so only new races and races whose text changed
+        (results in, scratches, odds) are re-encoded. A full run (no
+        since) also removes races that are no longer in the database.
+
+        Args:
+            page_size: Races loaded, encoded and written together
+            since: Only consider races on or after this date
+            force: Re-encode every race even if unchanged
+
+        Returns:
+            Number of races (re-)embedded
+        """
         self._load_model()
 
         embedded_count = 0
+        unchanged_count = 0
+        seen_ids = set()
 
         with get_db_context() as db:
-            races = db.query(Race).join(Meet).order_by(Meet.date).all()
-            logger.info(f"Embedding {len(races)} races...")
-
-            batch_docs = []
-            batch_embeddings = []
-            batch_metadatas = []
-            batch_ids = []
-            batch_size = 50
-
-            for race in races:
-                try:
-                    meet = db.query(Meet).filter(Meet.id == race.meet_id).first()
-                    if not meet:
-                        continue
-
-                    # Load track
-                    if meet.track is None:
-                        from src.db.models import Track
-                        meet.track = db.query(Track).filter(
-                            Track.id == meet.track_id
-                        ).first()
-
-                    # Load runners
-                    runners = db.query(Runner).filter(
-                        Runner.race_id == race.id,
-                        Runner.is_scratched == False
-                    ).all()
-
-                    # Load horse/jockey for each runner
-                    for r in runners:
-                        if r.horse_id:
-                            r.horse = db.query(Horse).filter(
-                                Horse.id == r.horse_id
-                            ).first()
-                        if r.jockey_id:
-                            r.jockey = db.query(Jockey).filter(
-                                Jockey.id == r.jockey_id
-                            ).first()
-
-                    # Load results
-                    results = []
-                    if race.has_results:
-                        race_result = db.query(RaceResult).filter(
-                            RaceResult.race_id == race.id
-                        ).first()
-                        if race_result:
-                            rr_list = db.query(RunnerResult).filter(
-                                RunnerResult.race_result_id == race_result.id
-                            ).all()
-                            for rr in rr_list:
-                                rr.runner = db.query(Runner).filter(
-                                    Runner.id == rr.runner_id
-                                ).first()
-                                if rr.runner and rr.runner.horse_id:
-                                    rr.runner.horse = db.query(Horse).filter(
-                                        Horse.id == rr.runner.horse_id
-                                    ).first()
-                            results = rr_list
-
-                    # Convert to text
-                    doc_text = self.race_to_text(race, meet, runners, results)
-
-                    # Create embedding
-                    embedding = self.model.encode(doc_text).tolist()
-
-                    # Metadata for filtering
-                    track_name = meet.track.track_name if meet.track else 'Unknown'
-                    metadata = {
-                        'race_id': race.id,
-                        'race_number': race.race_number or 0,
-                        'track': track_name,
-                        'date': str(meet.date),
-                        'surface': race.surface or '',
-                        'race_type': str(race.race_type or ''),
-                        'has_results': bool(race.has_results),
-                        'purse': race.purse or 0
-                    }
-
-                    batch_docs.append(doc_text)
-                    batch_embeddings.append(embedding)
-                    batch_metadatas.append(metadata)
-                    batch_ids.append(f"race_{race.id}")
-
-                    # Add in batches
-                    if len(batch_ids) >= batch_size:
-                        self.vector_store.add_races(
-                            batch_docs, batch_embeddings,
-                            batch_metadatas, batch_ids
-                        )
-                        embedded_count += len(batch_ids)
-                        logger.info(f"  Embedded {embedded_count}/{len(races)} races...")
-                        batch_docs, batch_embeddings = [], []
-                        batch_metadatas, batch_ids = [], []
-
-                except Exception as e:
-                    logger.warning(f"Failed to embed race {race.id}: {e}")
-                    continue
-
-            # Add remaining
-            if batch_ids:
-                self.vector_store.add_races(
-                    batch_docs, batch_embeddings,
-                    batch_metadatas, batch_ids
+            query = db.query(Race.id, Meet.date).join(Meet)
+            if since:
+                query = query.filter(Meet.date >= since)
+            race_dates = query.order_by(Meet.date, Race.id).all()
+            logger.info(f"Checking {len(race_dates)} races...")
+
+            for page_start in range(0, len(race_dates), page_size):
+                page = race_dates[page_start:page_start + page_size]
+                races = self._load_race_page(
+                    db, [race_id for race_id, _ in page], page[0][1], page[-1][1]
                 )
-                embedded_count += len(batch_ids)
 
-        logger.info(f"✓ Embedded {embedded_count} races total")
-        return embedded_count
\ No newline at end of file
+                docs, metadatas, ids = [], [], []
+                for race in races:
+                    try:
+                        meet = race.meet
+                        if not meet:
+                            continue
+
+                        results = []
+                        if race.has_results and race.result:
+                            results = race.result.runner_results
+
+                        doc_text = self.race_to_text(race, meet, race.runners, results)
+                        metadata = self.race_metadata(race, meet)
+                        metadata['content_hash'] = self.content_hash(doc_text, metadata)
+
+                        docs.append(doc_text)
+                        metadatas.append(metadata)
+                        ids.append(f"race_{race.id}")
+
+                    except Exception as e:
+                        logger.warning(f"Failed to embed race {race.id}: {e}")
+                        continue
+
+                seen_ids.update(ids)
+
+                if not force:
+                    stored = self.vector_store.get_content_hashes(ids)
+                    changed = [
+                        i for i, (race_key, metadata) in enumerate(zip(ids, metadatas))
+                        if stored.get(race_key) != metadata['content_hash']
+                    ]
+                    unchanged_count += len(ids) - len(changed)
+                    docs = [docs[i] for i in changed]
+                    metadatas = [metadatas[i] for i in changed]
+                    ids = [ids[i] for i in changed]
+
+                if ids:
+                    embeddings = self.model.encode(
+                        docs,
+                        batch_size=ENCODE_BATCH_SIZE,
+                        convert_to_numpy=True,
+                        show_progress_bar=False
+                    )
+                    self.vector_store.upsert_races(docs, embeddings.tolist(), metadatas, ids)
+                    embedded_count += len(ids)
+
+                logger.info(f"  Checked {min(page_start + page_size, len(race_dates))}/"
+                            f"{len(race_dates)} races ({embedded_count} embedded)...")
+
+                # Drop the page's objects so memory stays flat over the full index
+                db.expunge_all()
+
+        if since is None:
+            stale_ids = set(self.vector_store.get_ids()) - seen_ids
+            if stale_ids:
+                self.vector_store.delete_races(sorted(stale_ids))
+
+        logger.info(f"✓ Embedded {embedded_count} races ({unchanged_count} unchanged)")
+        return embedded_count
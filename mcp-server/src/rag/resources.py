@@ -0,0 +1,89 @@
+"""Process-wide embedding model and vector store shared by every request."""
+import threading
+import time
+from sentence_transformers import SentenceTransformer
+from src.rag.vector_store import VectorStore
+import logging
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = 'all-MiniLM-L6-v2'
+
+
+class RAGResources:
+    """
+    Lazily loaded, shared RAG components.
+
+    The embedding model and ChromaDB client are expensive to create
+    (model weights from disk, collection open), so one instance of each
+    is held for the life of the process and handed to the chat, search,
+    embedding and MCP tool paths. Call warm_up at startup so no request
+    pays the load cost.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._model = None
+        self._vector_store = None
+        self._retriever = None
+
+    @property
+    def model(self) -> SentenceTransformer:
+        """Shared sentence-transformer model."""
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    logger.info(f"Loading embedding model: {MODEL_NAME}")
+                    self._model = SentenceTransformer(MODEL_NAME)
+                    logger.info("✓ Embedding model loaded")
+        return self._model
+
+    @property
+    def vector_store(self) -> VectorStore:
+        """Shared ChromaDB vector store."""
+        if self._vector_store is None:
+            with self._lock:
+                if self._vector_store is None:
+                    self._vector_store = VectorStore()
+        return self._vector_store
+
+    @property
+    def retriever(self):
+        """Shared retriever over the shared store and model."""
+        if self._retriever is None:
+            from src.rag.retriever import RaceRetriever
+            vector_store, model = self.vector_store, self.model
+            with self._lock:
+                if self._retriever is None:
+                    self._retriever = RaceRetriever(vector_store, model)
+        return self._retriever
+
+    def warm_up(self):
+        """Load the model and open the store now instead of on first request."""
+        start = time.time()
+        self.vector_store
+        # First encode allocates the model's buffers - do it here too
+        self.model.encode("warm up")
+        self.retriever
+        logger.info(f"✓ RAG resources ready in {time.time() - start:.1f}s")
+
+
+_resources = None
+_resources_lock = threading.Lock()
+
+
+def get_resources() -> RAGResources:
+    """
+    Get the process-wide RAG resources, creating the registry if needed.
+
+    Returns:
+        Shared RAGResources
+    """
+    global _resources
+
+    if _resources is None:
+        with _resources_lock:
+            if _resources is None:
+                _resources = RAGResources()
+
+    return _resources
@@ -1,22 +1,23 @@
 """Semantic search retriever for race data."""
 from sentence_transformers import SentenceTransformer
 from src.rag.vector_store import VectorStore
+from src.rag.resources import get_resources
 import logging
 
 logger = logging.getLogger(__name__)
-MODEL_NAME = 'all-MiniLM-L6-v2'
 
 
 class RaceRetriever:
     """Retrieves relevant race context for LLM queries."""
 
-    def __init__(self, vector_store: VectorStore):
+    def __init__(self, vector_store: VectorStore, model: SentenceTransformer = None):
         self.vector_store = vector_store
-        self.model = None
+        self.model = model
 
     def _load_model(self):
+        """Use the process-wide model unless one was passed in."""
         if self.model is None:
-            self.model = SentenceTransformer(MODEL_NAME)
+            self.model = get_resources().model
 
     def search(self, query: str, limit: int = 5,
                track: str = None, date: str = None) -> list:
@@ -71,6 +71,36 @@ class VectorStore:
         )
         logger.info(f"Added {len(ids)} races to vector store")
 
+    def upsert_races(self, documents: list, embeddings: list,
+                     metadatas: list, ids: list):
+        """Insert new race documents and overwrite existing ones by id."""
+        self.collection.upsert(
+            documents=documents,
+            embeddings=embeddings,
+            metadatas=metadatas,
+            ids=ids
+        )
+        logger.info(f"Upserted {len(ids)} races to vector store")
+
+    def get_content_hashes(self, ids: list) -> dict:
+        """Stored content hash per race id (ids not yet indexed are absent)."""
+        if not ids:
+            return {}
+        stored = self.collection.get(ids=ids, include=['metadatas'])
+        return {
+            race_key: (metadata or {}).get('content_hash')
+            for race_key, metadata in zip(stored['ids'], stored['metadatas'])
+        }
+
+    def get_ids(self) -> list:
+        """Ids of every indexed race."""
+        return self.collection.get(include=[])['ids']
+
+    def delete_races(self, ids: list):
+        """Remove race documents by id."""
+        self.collection.delete(ids=ids)
+        logger.info(f"Deleted {len(ids)} races from vector store")
+
     def query(self, query_embeddings: list, n_results: int = 5,
               where: dict = None) -> dict:
         """Query vector store for similar races."""
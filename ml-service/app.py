@@ -116,7 +116,7 @@ def predict_race_from_db(race_id):
             'race_id': race_id,
             'runner_count': len(predictions),
             'predictions': predictions,
-            'model': 'RandomForest',
+            'model': predictor.model_version,
             'features': 'full_pipeline',
             'note': 'Predictions using complete 55-feature ML pipeline'
         })
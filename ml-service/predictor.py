@@ -1,11 +1,11 @@
 """ML Predictor - loads model and generates real feature-based predictions."""
-import joblib
 import pandas as pd
 import numpy as np
 import sys
 from pathlib import Path
 from sklearn.preprocessing import StandardScaler
 from sqlalchemy import create_engine, text
+import json
 import logging
 import os
 
@@ -21,6 +21,13 @@ _MODEL_TUNED = _DATA_INGESTION / "models/tuned/random_forest_tuned.pkl"
 _MODEL_FALLBACK = _DATA_INGESTION / "models/random_forest.pkl"
 MODEL_PATH = _MODEL_TUNED if _MODEL_TUNED.exists() else _MODEL_FALLBACK
 FEATURES_PATH = _DATA_INGESTION / "data/processed/features_complete.csv"
+# Pruned feature set the training scripts use by default when present
+FEATURE_SET_PATH = _DATA_INGESTION / "models/feature_set.json"
+
+# Model registry: the active version wins over MODEL_PATH when present
+REGISTRY_DIR = _DATA_INGESTION / "models/registry"
+MODEL_NAME = os.environ.get("MODEL_NAME", "random_forest")
+SHADOW_SCORING = os.environ.get("SHADOW_SCORING", "true").lower() == "true"
 
 # Database URL for feature pipeline (default matches docker-compose postgres)
 DB_URL = os.environ.get(
@@ -37,34 +44,77 @@ class HorseRacingPredictor:
         self.feature_columns = None
         self.is_loaded = False
         self.engine = None
+        self.model_version = None
+        self.shadow = None
+
+    def _fit_scaler_from_features(self):
+        """Derive feature columns and fit the scaler from the training CSV."""
+        logger.info(f"Loading features from {FEATURES_PATH}")
+        df = pd.read_csv(FEATURES_PATH)
+
+        exclude_cols = [
+            'runner_id', 'race_id', 'meet_id', 'race_date',
+            'target_win', 'target_finish_position'
+        ]
+        feature_columns = [
+            col for col in df.columns
+            if col not in exclude_cols
+            and df[col].dtype in ['float64', 'int64']
+        ]
+        if FEATURE_SET_PATH.exists():
+            with open(FEATURE_SET_PATH) as f:
+                feature_set = set(json.load(f)['features'])
+            feature_columns = [col for col in feature_columns if col in feature_set]
+
+        # Fit scaler on training portion only
+        df_complete = df[df['target_win'] >= 0].copy()
+        df_sorted = df_complete.sort_values('race_id')
+        split_idx = int(len(df_sorted) * 0.8)
+        train_df = df_sorted.iloc[:split_idx]
+
+        scaler = StandardScaler()
+        scaler.fit(train_df[feature_columns])
+        return scaler, feature_columns
 
     def load(self):
-        """Load model, fit scaler, connect to database."""
+        """Load model (registry active version if any), scaler, connect to database."""
         try:
-            # Load model
-            logger.info(f"Loading model from {MODEL_PATH}")
-            self.model = joblib.load(MODEL_PATH)
-
-            # Load training data to fit scaler
-            logger.info(f"Loading features from {FEATURES_PATH}")
-            df = pd.read_csv(FEATURES_PATH)
-
-            exclude_cols = [
-                'runner_id', 'race_id', 'meet_id',
-                'target_win', 'target_finish_position'
-            ]
-            self.feature_columns = [
-                col for col in df.columns
-                if col not in exclude_cols
-                and df[col].dtype in ['float64', 'int64']
-            ]
-
-            # Fit scaler on training portion only
-            df_complete = df[df['target_win'] >= 0].copy()
-            df_sorted = df_complete.sort_values('race_id')
-            split_idx = int(len(df_sorted) * 0.8)
-            train_df = df_sorted.iloc[:split_idx]
-            self.scaler.fit(train_df[self.feature_columns])
+            if str(_DATA_INGESTION) not in sys.path:
+                sys.path.insert(0, str(_DATA_INGESTION))
+            from src.ml.model_artifacts import load_model_file
+            from src.ml.model_registry import ModelRegistry
+
+            registry = ModelRegistry(REGISTRY_DIR)
+            active_version = registry.active_version(MODEL_NAME)
+
+            if active_version is not None:
+                logger.info(f"Loading {MODEL_NAME} v{active_version} from registry")
+                loaded = registry.load(MODEL_NAME, active_version)
+                self.model = loaded['model']
+                self.feature_columns = loaded['metadata']['feature_columns']
+                self.scaler = loaded['scaler']
+                self.model_version = f"{MODEL_NAME} v{active_version}"
+
+                if self.scaler is None:
+                    self.scaler, _ = self._fit_scaler_from_features()
+            else:
+                # Compact artifact (memory-mapped, shared between workers) if present
+                logger.info(f"Loading model from {MODEL_PATH}")
+                self.model = load_model_file(MODEL_PATH)
+                self.scaler, self.feature_columns = self._fit_scaler_from_features()
+                self.model_version = MODEL_PATH.name
+
+            # Optional shadow model, scored on the same feature rows
+            shadow_version = registry.shadow_version(MODEL_NAME) if SHADOW_SCORING else None
+            if shadow_version is not None:
+                shadow = registry.load(MODEL_NAME, shadow_version)
+                self.shadow = {
+                    'model': shadow['model'],
+                    'scaler': shadow['scaler'] or self.scaler,
+                    'feature_columns': shadow['metadata']['feature_columns'],
+                    'version': f"{MODEL_NAME} v{shadow_version}",
+                }
+                logger.info(f"Shadow scoring enabled with {self.shadow['version']}")
 
             # Connect to database (optional: needed for GET /predict/race/<id> only)
             try:
@@ -78,7 +128,7 @@ class HorseRacingPredictor:
                 self.engine = None
 
             self.is_loaded = True
-            logger.info(f"✓ Model loaded with {len(self.feature_columns)} features (model: {MODEL_PATH.name})")
+            logger.info(f"✓ Model loaded with {len(self.feature_columns)} features (model: {self.model_version})")
 
         except Exception as e:
             logger.error(f"Failed to load: {e}")
@@ -94,19 +144,15 @@ class HorseRacingPredictor:
 
         from src.db.session import get_db_context
         from src.features.feature_builder import FeatureBuilder
-        from src.db.models import Race, Meet
 
         with get_db_context() as db:
-            # Get race
-            race = db.query(Race).filter(Race.id == race_id).first()
-            if not race:
-                raise ValueError(f"Race {race_id} not found")
-
-            meet = db.query(Meet).filter(Meet.id == race.meet_id).first()
+            # Build only the features the served (and shadow) models use
+            feature_set = set(self.feature_columns)
+            if self.shadow:
+                feature_set.update(self.shadow['feature_columns'])
 
-            # Build features
-            builder = FeatureBuilder(db)
-            race_features = builder.build_features_for_race(race, meet)
+            builder = FeatureBuilder(db, feature_set=feature_set)
+            race_features = builder.build_features_for_race_id(race_id)
 
             return race_features
 
@@ -156,6 +202,7 @@ class HorseRacingPredictor:
             # Scale and predict
             X_scaled = self.scaler.transform(X)
             probabilities = self.model.predict_proba(X_scaled)[:, 1]
+            self._score_shadow(df, race_id, runner_ids, probabilities)
 
             # Normalize within race
             total_prob = probabilities.sum()
@@ -207,6 +254,7 @@ class HorseRacingPredictor:
         X = pd.DataFrame(rows, columns=self.feature_columns).fillna(0.0)
         X_scaled = self.scaler.transform(X)
         probabilities = self.model.predict_proba(X_scaled)[:, 1]
+        self._score_shadow(pd.DataFrame(runners), None, runner_ids, probabilities)
 
         total_prob = probabilities.sum()
         normalized_probs = probabilities / total_prob if total_prob > 0 \
@@ -229,6 +277,32 @@ class HorseRacingPredictor:
 
         return results
 
+    def _score_shadow(self, features: pd.DataFrame, race_id, runner_ids: list, probabilities: np.ndarray):
+        """
+        Score the shadow model on the already-built feature rows and log both.
+
+        Never affects the response: failures are logged and swallowed.
+        """
+        if self.shadow is None:
+            return
+
+        try:
+            X = features.reindex(columns=self.shadow['feature_columns']).fillna(0.0)
+            X_scaled = self.shadow['scaler'].transform(X)
+            shadow_probs = self.shadow['model'].predict_proba(X_scaled)[:, 1]
+
+            logger.info(json.dumps({
+                'event': 'shadow_score',
+                'race_id': race_id,
+                'active': self.model_version,
+                'shadow': self.shadow['version'],
+                'runner_ids': [int(r) if r is not None else None for r in runner_ids],
+                'active_probs': [round(float(p), 4) for p in probabilities],
+                'shadow_probs': [round(float(p), 4) for p in shadow_probs],
+            }))
+        except Exception as e:
+            logger.warning(f"Shadow scoring failed: {e}")
+
     def health_check(self) -> dict:
         """Return health status."""
         return {
@@ -236,6 +310,8 @@ class HorseRacingPredictor:
             'model_loaded': self.is_loaded,
             'feature_count': len(self.feature_columns) if self.feature_columns else 0,
             'model_type': type(self.model).__name__ if self.model else None,
+            'model_version': self.model_version,
+            'shadow_version': self.shadow['version'] if self.shadow else None,
             'database_connected': self.engine is not None
         }
 